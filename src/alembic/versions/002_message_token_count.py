@@ -0,0 +1,20 @@
+"""message token count
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-04-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('token_count', sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('messages', 'token_count')
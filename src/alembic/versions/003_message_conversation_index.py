@@ -0,0 +1,19 @@
+"""message conversation index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-04-09 09:00:00.000000
+
+"""
+from alembic import op
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
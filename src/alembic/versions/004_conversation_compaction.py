@@ -0,0 +1,20 @@
+"""conversation compaction
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-04-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('compacted_through', sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('conversations', 'compacted_through')
@@ -0,0 +1,25 @@
+"""history pagination indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-04-23 09:00:00.000000
+
+"""
+from alembic import op
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_conversations_user_id_created_at_id', 'conversations', ['user_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_messages_conversation_id_created_at', 'messages', ['conversation_id', 'created_at']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_created_at', table_name='messages')
+    op.drop_index('ix_conversations_user_id_created_at_id', table_name='conversations')
@@ -0,0 +1,30 @@
+"""conversation archive tier
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-30 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'conversation_archives',
+        sa.Column('conversation_id', sa.Integer(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id']),
+        sa.PrimaryKeyConstraint('conversation_id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('conversation_archives')
+    op.drop_column('conversations', 'archived_at')
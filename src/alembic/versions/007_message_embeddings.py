@@ -0,0 +1,33 @@
+"""message embeddings for semantic search
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-05-07 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'message_embeddings',
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('conversation_id', sa.Integer(), nullable=False),
+        sa.Column('snippet', sa.String(length=200), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id']),
+        sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index('ix_message_embeddings_user_id', 'message_embeddings', ['user_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_message_embeddings_user_id', table_name='message_embeddings')
+    op.drop_table('message_embeddings')
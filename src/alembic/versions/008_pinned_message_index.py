@@ -0,0 +1,23 @@
+"""pinned message index
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-05-14 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_messages_conversation_id_id_pinned', 'messages', ['conversation_id', 'id'],
+        postgresql_where=sa.text("role IN ('system', 'summary')")
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_id_pinned', table_name='messages')
@@ -0,0 +1,340 @@
+"""Open-loop load tests of the generation routes.
+
+    python -m src.cli.benchmark [--scenario text stream image conversation] [--arrival poisson|burst|constant]
+                                [--rate 20] [--duration 30] [--url http://localhost:8000]
+                                [--output results.json] [--baseline baseline.json --tolerance 0.1]
+
+Requests are sent on a fixed arrival schedule whether or not earlier ones
+have finished, so queueing shows up in the latencies instead of slowing the
+load down. Without ``--url`` the app is driven in-process with a
+deterministic stub model (``--token-latency`` seconds per generated token),
+so results reflect the server and not the weights. The conversation
+scenario stores messages, so it needs the database in either mode.
+
+Time to first token is reported for the stream scenario only, which reads
+``/generate/text/stream`` as it arrives; the other routes send their body
+in one piece, so for them it would equal the total latency.
+
+Results are printed as JSON. With ``--baseline`` each scenario is compared
+against a stored result and the exit status is 1 if latency grew or
+throughput fell by more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+SCENARIOS = ("text", "stream", "image", "conversation")
+# Compared against a baseline; higher is worse for all but throughput
+LATENCY_METRICS = ("latency_p50", "latency_p95", "latency_p99", "ttft_p50", "ttft_p95", "ttft_p99")
+
+@dataclass
+class Sample:
+    status: int
+    latency: float
+    # Only for streamed responses
+    ttft: Optional[float] = None
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    offered_rate: float
+    duration: float
+    samples: List[Sample] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        ok = [sample for sample in self.samples if sample.status < 400]
+        latencies = sorted(sample.latency for sample in ok)
+        ttfts = sorted(sample.ttft for sample in ok if sample.ttft is not None)
+        result = {
+            "scenario": self.scenario,
+            "offered_rate": self.offered_rate,
+            "requests": len(self.samples) + self.errors,
+            "errors": self.errors + len(self.samples) - len(ok),
+            "throughput": round(len(ok) / self.duration, 3) if self.duration else 0.0,
+        }
+        for name, values in (("latency", latencies), ("ttft", ttfts)):
+            if name == "ttft" and not values:
+                continue
+            for quantile in (50, 95, 99):
+                result[f"{name}_p{quantile}"] = round(percentile(values, quantile), 6)
+        return result
+
+def percentile(values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, math.ceil(quantile / 100 * len(values)) - 1))
+    return values[rank]
+
+def poisson_arrivals(rate: float, duration: float, rng: random.Random) -> List[float]:
+    offsets, now = [], rng.expovariate(rate)
+    while now < duration:
+        offsets.append(now)
+        now += rng.expovariate(rate)
+    return offsets
+
+def burst_arrivals(rate: float, duration: float, burst_size: int) -> List[float]:
+    """``burst_size`` simultaneous requests, spaced so the mean rate is ``rate``"""
+    period = burst_size / rate
+    return [start * period for start in range(int(duration / period)) for _ in range(burst_size)]
+
+def constant_arrivals(rate: float, duration: float) -> List[float]:
+    return [i / rate for i in range(int(duration * rate))]
+
+async def timed_request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    streamed: bool = False,
+    **kwargs
+) -> Sample:
+    """Time a request; with ``streamed`` also time the first non-empty body chunk"""
+    started = time.perf_counter()
+    ttft = None
+    async with client.stream(method, url, **kwargs) as response:
+        async for chunk in response.aiter_raw():
+            if streamed and ttft is None and chunk:
+                ttft = time.perf_counter() - started
+    latency = time.perf_counter() - started
+    return Sample(status=response.status_code, latency=latency, ttft=ttft)
+
+def _prompt(rng: random.Random, words: int) -> str:
+    return " ".join(f"word{rng.randrange(1000)}" for _ in range(words))
+
+async def _conversation_request(client: httpx.AsyncClient, prompt: str, max_length: int) -> Sample:
+    created = await client.post(
+        "/conversations/", json={"title": "benchmark", "model_type": "text", "model_name": "gpt-neo-125m"}
+    )
+    created.raise_for_status()
+    return await timed_request(
+        client, "POST", f"/conversations/{created.json()['id']}/generate",
+        json={"content": prompt, "max_length": max_length}
+    )
+
+def request_factory(scenario: str, prompt_words: int, max_length: int, rng: random.Random) -> Callable[[httpx.AsyncClient], Any]:
+    if scenario == "text":
+        return lambda client: timed_request(
+            client, "POST", "/htmx/generate/text/",
+            data={"prompt": _prompt(rng, prompt_words), "max_length": max_length}
+        )
+    if scenario == "stream":
+        return lambda client: timed_request(
+            client, "POST", "/generate/text/stream", streamed=True,
+            data={"prompt": _prompt(rng, prompt_words), "max_length": max_length}
+        )
+    if scenario == "image":
+        return lambda client: timed_request(
+            client, "POST", "/htmx/generate/image/",
+            data={"prompt": _prompt(rng, prompt_words), "resolution": "512x512"}
+        )
+    return lambda client: _conversation_request(client, _prompt(rng, prompt_words), max_length)
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: str,
+    arrivals: List[float],
+    offered_rate: float,
+    prompt_words: int = 32,
+    max_length: int = 64,
+    seed: int = 0
+) -> ScenarioResult:
+    """Send one request per arrival offset, without waiting for earlier ones"""
+    make_request = request_factory(scenario, prompt_words, max_length, random.Random(seed))
+    result = ScenarioResult(scenario=scenario, offered_rate=offered_rate, duration=0.0)
+    started = time.perf_counter()
+
+    async def send(offset: float) -> None:
+        await asyncio.sleep(max(0.0, offset - (time.perf_counter() - started)))
+        try:
+            result.samples.append(await make_request(client))
+        except Exception:
+            result.errors += 1
+
+    await asyncio.gather(*(send(offset) for offset in arrivals))
+    result.duration = time.perf_counter() - started
+    return result
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance``, as readable lines"""
+    regressions = []
+    for name in LATENCY_METRICS:
+        if baseline.get(name) and name in current and current[name] > baseline[name] * (1 + tolerance):
+            regressions.append(f"{current['scenario']}: {name} {baseline[name]:.4f}s -> {current[name]:.4f}s")
+    if baseline.get("throughput") and current["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"{current['scenario']}: throughput {baseline['throughput']:.2f}/s -> {current['throughput']:.2f}/s"
+        )
+    if current["errors"] > baseline.get("errors", 0):
+        regressions.append(f"{current['scenario']}: errors {baseline.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+class _QueuedBody(httpx.AsyncByteStream):
+    def __init__(self, chunks: asyncio.Queue, app_task: asyncio.Task, disconnected: asyncio.Event):
+        self.chunks = chunks
+        self.app_task = app_task
+        self.disconnected = disconnected
+
+    async def __aiter__(self):
+        while True:
+            chunk = await self.chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.disconnected.set()
+        try:
+            await self.app_task
+        except Exception:
+            pass
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """Like ``httpx.ASGITransport``, but hands body chunks to the client as the app sends them.
+
+    ``httpx.ASGITransport`` returns only once the app has finished, which
+    would make every in-process first-token time equal to the total latency.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": ("127.0.0.1", 0),
+            "root_path": "",
+        }
+        chunks: asyncio.Queue = asyncio.Queue()
+        started = asyncio.get_running_loop().create_future()
+        disconnected = asyncio.Event()
+        request_sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and not started.done():
+                started.set_result(message)
+            elif message["type"] == "http.response.body":
+                chunks.put_nowait(message.get("body", b""))
+                if not message.get("more_body", False):
+                    chunks.put_nowait(None)
+
+        def finished(task: asyncio.Task) -> None:
+            chunks.put_nowait(None)
+            if not started.done():
+                error = None if task.cancelled() else task.exception()
+                started.set_exception(error or RuntimeError("The app sent no response"))
+
+        app_task = asyncio.create_task(self.app(scope, receive, send))
+        app_task.add_done_callback(finished)
+        start = await started
+        return httpx.Response(
+            start["status"], headers=start.get("headers", []), stream=_QueuedBody(chunks, app_task, disconnected)
+        )
+
+def in_process_client(scenario: str, factory: Any) -> httpx.AsyncClient:
+    """A client for the app in this process, serving ``scenario`` from stub models"""
+    from websrc.main import app
+    from websrc.config.settings import settings
+    from src.services.container import container
+    from src.models.enum import ImageModelName
+
+    if scenario == "image":
+        settings.MODEL_TYPE, settings.MODEL_NAME = "image", ImageModelName.list()[0]
+    else:
+        settings.MODEL_TYPE, settings.MODEL_NAME = "text", "gpt-neo-125m"
+    container._factory = factory
+    container._llm_service = None
+    return httpx.AsyncClient(transport=StreamingASGITransport(app), base_url="http://benchmark", timeout=None)
+
+def arrivals_for(args: argparse.Namespace, rng: random.Random) -> List[float]:
+    if args.arrival == "poisson":
+        return poisson_arrivals(args.rate, args.duration, rng)
+    if args.arrival == "burst":
+        return burst_arrivals(args.rate, args.duration, args.burst_size)
+    return constant_arrivals(args.rate, args.duration)
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from src.services.stub_model import StubModelFactory
+
+    factory = StubModelFactory(
+        token_latency=args.token_latency,
+        prefill_latency=args.prefill_latency,
+        output_tokens=args.max_length,
+        image_latency=args.image_latency
+    )
+    summaries = []
+    for scenario in args.scenario:
+        client = (
+            httpx.AsyncClient(base_url=args.url, timeout=None) if args.url
+            else in_process_client(scenario, factory)
+        )
+        async with client:
+            result = await run_scenario(
+                client, scenario, arrivals_for(args, random.Random(args.seed)), args.rate,
+                prompt_words=args.prompt_words, max_length=args.max_length, seed=args.seed
+            )
+        summaries.append(result.summary())
+    return summaries
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Open-loop load test of the generation routes")
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=["text"])
+    parser.add_argument("--arrival", choices=("poisson", "burst", "constant"), default="poisson")
+    parser.add_argument("--rate", type=float, default=20.0, help="Mean requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of arrivals per scenario")
+    parser.add_argument("--burst-size", type=int, default=10, help="Requests per burst with --arrival burst")
+    parser.add_argument("--prompt-words", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=64, help="Tokens generated per request")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Stub model seconds per generated token")
+    parser.add_argument("--prefill-latency", type=float, default=0.0002, help="Stub model seconds per prompt token")
+    parser.add_argument("--image-latency", type=float, default=0.5, help="Stub model seconds per image")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Benchmark a running server instead of the app in-process")
+    parser.add_argument("--output", help="Also write the results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    summaries = asyncio.run(main(args))
+    print(json.dumps(summaries, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summaries, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {summary["scenario"]: summary for summary in json.load(f)}
+        regressions = [
+            line for summary in summaries if summary["scenario"] in baseline
+            for line in compare(summary, baseline[summary["scenario"]], args.tolerance)
+        ]
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
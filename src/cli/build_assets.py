@@ -0,0 +1,60 @@
+"""Precompress static assets at build time.
+
+    python -m src.cli.build_assets [--directory websrc/static] [--min-size 256]
+
+Writes ``<file>.gz`` (and ``<file>.br`` when the ``brotli`` package is
+installed) next to every compressible file, at the highest compression
+level, so the server sends them as they are instead of compressing each
+response. Files smaller than ``--min-size`` and variants that are already
+up to date are skipped.
+"""
+import argparse
+import gzip
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+COMPRESSIBLE = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors: Dict[str, Callable[[bytes], bytes]] = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return compressors
+    compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+def build(directory: str, min_size: int = 256) -> List[str]:
+    """Paths of the variants written"""
+    written = []
+    compressors = _compressors()
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            source = os.path.join(root, name)
+            if os.path.getsize(source) < min_size:
+                continue
+            data = None
+            for suffix, compress in compressors.items():
+                target = source + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                    continue
+                if data is None:
+                    with open(source, "rb") as f:
+                        data = f.read()
+                with open(target, "wb") as f:
+                    f.write(compress(data))
+                written.append(target)
+    return written
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompress static assets")
+    parser.add_argument("--directory", default="websrc/static")
+    parser.add_argument("--min-size", type=int, default=256, help="Leave smaller files uncompressed")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(json.dumps({"written": build(args.directory, args.min_size)}, indent=2))
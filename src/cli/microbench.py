@@ -0,0 +1,146 @@
+"""Per-request framework overhead, one step at a time.
+
+    python -m src.cli.microbench [--repeat 5] [--output overhead.json] [--baseline overhead.json --tolerance 0.25]
+
+Times the work every request pays for besides the model: request model
+validation, template rendering, response formatting, the logging
+decorator and gzip. Each step is run in a loop and reported as the best
+per-call time in microseconds over ``--repeat`` rounds, which is the
+least noisy estimate on a shared machine. Steps are also summed along the
+generation and page request paths; tests/api/test_overhead.py holds those
+totals to a budget when run with ``pytest -m benchmark``.
+"""
+import argparse
+import gzip
+import json
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+PROMPT = "Summarise the following paragraph in two sentences. " * 8
+
+def _request():
+    from starlette.requests import Request
+    return Request({
+        "type": "http", "method": "GET", "path": "/home", "headers": [], "query_string": b"",
+        "scheme": "http", "server": ("bench", 80), "root_path": "", "router": None, "app": None,
+    })
+
+def _validate_text_request() -> Callable[[], Any]:
+    from websrc.models.pydantic import TextGenerationRequest
+    return lambda: TextGenerationRequest(prompt=PROMPT, max_length=256, parameters={"temperature": 0.7})
+
+def _validate_web_model_config() -> Callable[[], Any]:
+    from websrc.models.pydantic import ModelConfig
+    return lambda: ModelConfig(model_type="text", model_name="gpt-neo-125m")
+
+def _validate_core_model_config() -> Callable[[], Any]:
+    from src.models.pydantic import ModelConfig
+    return lambda: ModelConfig(model_type="text", model_name="gpt-neo-125m")
+
+def _render(template: str, **context: Any) -> Callable[[], Callable[[], Any]]:
+    def setup() -> Callable[[], Any]:
+        from websrc.api.routes.frontend import templates
+        request = _request()
+        return lambda: templates.TemplateResponse(template, {"request": request, **context}).body
+    return setup
+
+def _text_model_names() -> List[str]:
+    from websrc.models.pydantic import TextModelName
+    return [name.value for name in TextModelName]
+
+def _format_generation_response() -> Callable[[], Any]:
+    from fastapi.responses import JSONResponse
+    from websrc.api.routes.generation import GenerationResponse
+    text = PROMPT * 4
+    return lambda: JSONResponse(GenerationResponse.success(text, metadata={"prompt_length": len(PROMPT)})).body
+
+def _instrument() -> Callable[[], Any]:
+    from websrc.config.logging_config import instrument
+
+    # As configured: without LOG_INSTRUMENTATION this is the bare function
+    @instrument
+    def handler(value: int) -> int:
+        return value
+    return lambda: handler(1)
+
+def _serve_home_cached() -> Callable[[], Any]:
+    from websrc.api.routes.frontend import pages
+    request = _request()
+    context = {"text_model_names": _text_model_names()}
+    pages.get("index.html", context)
+    return lambda: pages.response(request, "index.html", context).body
+
+def _gzip_home_page() -> Callable[[], Any]:
+    # GZipMiddleware compresses at level 9 for every response over its minimum size
+    body = _render("index.html", text_model_names=_text_model_names())()()
+    return lambda: gzip.compress(body, compresslevel=9)
+
+STEPS: Dict[str, Callable[[], Callable[[], Any]]] = {
+    "validate_text_request": _validate_text_request,
+    "validate_model_config_web": _validate_web_model_config,
+    "validate_model_config_core": _validate_core_model_config,
+    "render_landing": _render("landing.html"),
+    "render_home": lambda: _render("index.html", text_model_names=_text_model_names())(),
+    "render_settings": lambda: _render("settings.html", text_model_names=_text_model_names())(),
+    "render_api": _render("api.html"),
+    "format_generation_response": _format_generation_response,
+    "instrument_decorator": _instrument,
+    "gzip_home_page": _gzip_home_page,
+    "serve_home_cached": _serve_home_cached,
+}
+
+# Steps one request of each kind goes through
+REQUEST_PATHS: Dict[str, List[str]] = {
+    "generation": [
+        "validate_text_request", "validate_model_config_web", "format_generation_response", "instrument_decorator"
+    ],
+    # Pages are rendered and compressed once; render_* and gzip_home_page are the cache-miss cost
+    "page": ["serve_home_cached", "instrument_decorator"],
+}
+
+def time_step(operation: Callable[[], Any], repeat: int) -> float:
+    """Best per-call time in microseconds"""
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+def run(steps: Optional[List[str]] = None, repeat: int = 5) -> Dict[str, Any]:
+    timings = {name: round(time_step(STEPS[name](), repeat), 3) for name in (steps or STEPS)}
+    paths = {
+        name: round(sum(timings[step] for step in path), 3)
+        for name, path in REQUEST_PATHS.items() if all(step in timings for step in path)
+    }
+    return {"steps_us": timings, "requests_us": paths}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for section in ("steps_us", "requests_us"):
+        for name, value in current[section].items():
+            before = baseline.get(section, {}).get(name)
+            if before and value > before * (1 + tolerance):
+                regressions.append(f"{name}: {before:.1f}us -> {value:.1f}us")
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-request framework overhead microbenchmarks")
+    parser.add_argument("--step", nargs="+", choices=list(STEPS), help="Only time these steps")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write the results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.step, args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
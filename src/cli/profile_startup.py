@@ -0,0 +1,90 @@
+"""Break down where application start-up time goes.
+
+    python -m src.cli.profile_startup [--top 15] [--run-startup]
+
+Imports the app in a fresh interpreter under ``-X importtime`` and reports
+the slowest modules and the cost per top-level package. ``--run-startup``
+also imports the app in this process and runs its startup and shutdown
+hooks, reporting each startup phase; that needs the database to be reachable.
+"""
+import argparse
+import asyncio
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+APP_MODULE = "websrc.main"
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def import_profile(module: str = APP_MODULE) -> List[ImportTiming]:
+    """Per-module import times of ``module`` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append(ImportTiming(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Self time in microseconds summed per top-level package, largest first"""
+    totals: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def print_import_report(timings: List[ImportTiming], top: int) -> None:
+    total = next((t.cumulative_us for t in reversed(timings) if t.depth == 0 and t.module == APP_MODULE), 0)
+    print(f"Import of {APP_MODULE}: {total / 1000:.1f}ms ({len(timings)} modules)\n")
+    print("Slowest packages (self time):")
+    for package, self_us in list(by_package(timings).items())[:top]:
+        print(f"  {self_us / 1000:8.1f}ms  {package}")
+    print("\nSlowest modules (self time):")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]:
+        print(f"  {timing.self_us / 1000:8.1f}ms  {timing.module}")
+
+async def run_startup() -> None:
+    started = time.perf_counter()
+    from websrc.main import app
+    from websrc.api.utility.startup import startup_timer
+    print(f"\nIn-process import: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    started = time.perf_counter()
+    try:
+        for handler in app.router.on_startup:
+            await handler()
+    finally:
+        print(f"Startup hooks: {(time.perf_counter() - started) * 1000:.1f}ms")
+        for phase in startup_timer.report():
+            print(f"  {phase['ms']:8.1f}ms  {phase['phase']}")
+        for handler in app.router.on_shutdown:
+            await handler()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import-time and startup-time breakdown of the server")
+    parser.add_argument("--top", type=int, default=15, help="Rows per section")
+    parser.add_argument("--run-startup", action="store_true", help="Also run the startup hooks and time each phase")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    print_import_report(import_profile(), args.top)
+    if args.run_startup:
+        asyncio.run(run_startup())
@@ -0,0 +1,146 @@
+"""Replay captured traffic against a server and compare latency distributions.
+
+    python -m src.cli.replay traffic.ndjson [traffic.ndjson.1.gz ...] --url http://localhost:8000
+                             [--speed 2] [--limit 10000] [--output replay.json]
+
+Reads capture files written with ``CAPTURE_ENABLED`` (gzipped rotations
+included) and sends one request per record at its original offset divided
+by ``--speed``, without waiting for earlier requests, so the captured
+burstiness is kept. Prompts are synthetic text of the captured token
+length; parameters are replayed as captured. Routes with path parameters
+are replayed only for ``{conversation_id}``, for which a conversation is
+created first; other records are counted as skipped.
+
+The report gives, per route, the captured and replayed p50/p95/p99 latency
+and the replayed/captured ratio of each.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.cli.benchmark import Sample, timed_request, percentile
+
+_PATH_PARAMETER = re.compile(r"\{(\w+)\}")
+
+def read_capture(paths: List[str]) -> List[Dict[str, Any]]:
+    """Records from every file, oldest arrival first"""
+    records = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return sorted(records, key=lambda record: record["t"])
+
+def synthetic_prompt(tokens: int, seed: int) -> str:
+    return " ".join(f"w{(seed + i) % 997}" for i in range(max(1, tokens)))
+
+def build_request(record: Dict[str, Any], seed: int) -> Optional[Dict[str, Any]]:
+    """Keyword arguments for ``httpx.AsyncClient.stream``, or None when the record cannot be replayed"""
+    method, _, path = record["route"].partition(" ")
+    fields: Dict[str, Any] = dict(record.get("params", {}))
+    if "prompt_field" in record:
+        fields[record["prompt_field"]] = synthetic_prompt(record.get("prompt_tokens", 1), seed)
+    request: Dict[str, Any] = {"method": method, "url": path}
+    if record.get("enc") == "json":
+        request["json"] = fields
+    elif record.get("enc") == "form":
+        request["data"] = fields
+    elif method == "GET" and fields:
+        request["params"] = fields
+    parameters = set(_PATH_PARAMETER.findall(path))
+    if parameters - {"conversation_id"}:
+        return None
+    return request
+
+async def _send(client: httpx.AsyncClient, request: Dict[str, Any]) -> Sample:
+    request = dict(request)
+    if "{conversation_id}" in request["url"]:
+        created = await client.post(
+            "/conversations/", json={"title": "replay", "model_type": "text", "model_name": "gpt-neo-125m"}
+        )
+        created.raise_for_status()
+        request["url"] = request["url"].replace("{conversation_id}", str(created.json()["id"]))
+    return await timed_request(client, request.pop("method"), request.pop("url"), **request)
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: List[Dict[str, Any]],
+    speed: float = 1.0
+) -> Dict[str, Any]:
+    """Send every replayable record on the captured schedule compressed by ``speed``"""
+    replayed: Dict[str, List[float]] = {}
+    captured: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    skipped = 0
+    first = records[0]["t"] if records else 0.0
+    started = time.perf_counter()
+
+    async def send(record: Dict[str, Any], request: Dict[str, Any]) -> None:
+        await asyncio.sleep(max(0.0, (record["t"] - first) / speed - (time.perf_counter() - started)))
+        try:
+            sample = await _send(client, request)
+        except Exception:
+            sample = None
+        if sample is None or sample.status >= 400:
+            errors[record["route"]] = errors.get(record["route"], 0) + 1
+        else:
+            replayed.setdefault(record["route"], []).append(sample.latency)
+
+    tasks = []
+    for seed, record in enumerate(records):
+        request = build_request(record, seed)
+        if request is None:
+            skipped += 1
+            continue
+        if record.get("status", 200) < 400:
+            captured.setdefault(record["route"], []).append(record["latency"])
+        tasks.append(send(record, request))
+    await asyncio.gather(*tasks)
+    return {
+        "speed": speed,
+        "records": len(records),
+        "skipped": skipped,
+        "duration": round(time.perf_counter() - started, 3),
+        "routes": {
+            route: compare_latencies(captured.get(route, []), replayed.get(route, []), errors.get(route, 0))
+            for route in sorted(set(captured) | set(replayed) | set(errors))
+        },
+    }
+
+def compare_latencies(captured: List[float], replayed: List[float], errors: int) -> Dict[str, Any]:
+    captured, replayed = sorted(captured), sorted(replayed)
+    report: Dict[str, Any] = {"captured": len(captured), "replayed": len(replayed), "errors": errors}
+    for quantile in (50, 95, 99):
+        before, after = percentile(captured, quantile), percentile(replayed, quantile)
+        report[f"captured_p{quantile}"] = round(before, 6)
+        report[f"replayed_p{quantile}"] = round(after, 6)
+        report[f"ratio_p{quantile}"] = round(after / before, 3) if before else None
+    return report
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay captured traffic and compare latency distributions")
+    parser.add_argument("captures", nargs="+", help="Capture files, gzipped rotations included")
+    parser.add_argument("--url", required=True, help="Server to replay against")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay N times faster than captured")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--output", help="Also write the report to this file")
+    return parser.parse_args(argv)
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    records = read_capture(args.captures)[:args.limit]
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        return await replay(client, records, args.speed)
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
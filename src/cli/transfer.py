@@ -0,0 +1,63 @@
+"""Export or import conversations from the command line.
+
+    python -m src.cli.transfer export --output conversations.ndjson [--user-id 1]
+    python -m src.cli.transfer import conversations.ndjson
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO, Optional
+
+from src.db.session import AsyncSessionLocal, engine
+from src.services.transfer import ConversationTransfer
+
+CHUNK_SIZE = 1 << 20
+
+async def _read_chunks(stream: BinaryIO) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, stream.read, CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+async def export(output: BinaryIO, user_id: Optional[int] = None) -> None:
+    transfer = ConversationTransfer(AsyncSessionLocal)
+    async for chunk in transfer.export_ndjson(user_id=user_id):
+        output.write(chunk)
+    output.flush()
+
+async def import_(source: BinaryIO) -> None:
+    transfer = ConversationTransfer(AsyncSessionLocal)
+    counts = await transfer.import_ndjson(_read_chunks(source))
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()), file=sys.stderr)
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "export":
+            if args.output == "-":
+                await export(sys.stdout.buffer, args.user_id)
+            else:
+                with open(args.output, "wb") as output:
+                    await export(output, args.user_id)
+        else:
+            if args.input == "-":
+                await import_(sys.stdin.buffer)
+            else:
+                with open(args.input, "rb") as source:
+                    await import_(source)
+    finally:
+        await engine.dispose()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk export/import of users, conversations and messages")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Stream tables to NDJSON")
+    export_parser.add_argument("--output", "-o", default="-", help="Output file, '-' for stdout")
+    export_parser.add_argument("--user-id", type=int, help="Only export this user's data")
+    import_parser = commands.add_parser("import", help="COPY an NDJSON export into the database")
+    import_parser.add_argument("input", nargs="?", default="-", help="Input file, '-' for stdin")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
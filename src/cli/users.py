@@ -0,0 +1,45 @@
+"""Issue API keys from the command line.
+
+    python -m src.cli.users issue-key alice
+
+Creates the user if needed and prints the new key once; only its SHA-256
+digest is stored, and the previous key stops working everywhere.
+"""
+import argparse
+import asyncio
+import secrets
+
+from sqlalchemy import select
+
+from src.db.session import AsyncSessionLocal, async_redis_client, engine
+from src.models.database import User
+from src.services.user_context import UserContextResolver, hash_api_key
+
+async def issue_key(username: str) -> str:
+    api_key = secrets.token_urlsafe(32)
+    async with AsyncSessionLocal() as session:
+        user = await session.scalar(select(User).where(User.username == username))
+        if user is None:
+            user = User(username=username)
+            session.add(user)
+        user.api_key = hash_api_key(api_key)
+        await session.commit()
+    await UserContextResolver(AsyncSessionLocal, async_redis_client).invalidate(user.id)
+    return api_key
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        print(await issue_key(args.username))
+    finally:
+        await async_redis_client.aclose()
+        await engine.dispose()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage API users")
+    commands = parser.add_subparsers(dest="command", required=True)
+    issue_parser = commands.add_parser("issue-key", help="Create or rotate a user's API key")
+    issue_parser.add_argument("username")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -1,34 +1,77 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from redis import Redis
+from functools import lru_cache
 from websrc.config.settings import settings
 
+# Engines, drivers and clients are created on first use so importing the app
+# does not pay for them; ``engine``, ``AsyncSessionLocal``, ``redis_client``
+# and ``async_redis_client`` stay importable as module attributes.
+
 # PostgreSQL
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=5,
-    max_overflow=10
-)
-
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+@lru_cache(maxsize=None)
+def get_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True
+    )
+
+@lru_cache(maxsize=None)
+def get_session_factory():
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
 
 # Redis
-redis_client = Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    decode_responses=True
-)
+@lru_cache(maxsize=None)
+def get_redis_client():
+    from redis import Redis
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        decode_responses=True
+    )
+
+@lru_cache(maxsize=None)
+def get_async_redis_client():
+    from redis.asyncio import Redis as AsyncRedis
+    return AsyncRedis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        decode_responses=True
+    )
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "AsyncSessionLocal": get_session_factory,
+    "redis_client": get_redis_client,
+    "async_redis_client": get_async_redis_client,
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
         finally:
             await session.close()
+
+async def dispose() -> None:
+    """Close whichever connections were opened"""
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+    if get_async_redis_client.cache_info().currsize:
+        await get_async_redis_client().aclose()
+    if get_redis_client.cache_info().currsize:
+        get_redis_client().close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Enum, Index, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -12,7 +12,7 @@ class User(Base):
     
     id = Column(Integer, primary_key=True)
     username = Column(String(50), unique=True, nullable=False)
-    api_key = Column(String(100), unique=True)
+    api_key = Column(String(100), unique=True)  # SHA-256 hex digest, see hash_api_key
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -28,24 +28,61 @@ class Conversation(Base):
     model_type = Column(Enum(ModelType))
     model_name = Column(String(50))
     created_at = Column(DateTime, default=datetime.utcnow)
+    compacted_through = Column(Integer)  # Last message id folded into a summary message
+    archived_at = Column(DateTime)  # Set while the messages live in conversation_archives
     
     # Relationships
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation")
 
+    __table_args__ = (
+        Index("ix_conversations_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 class Message(Base):
     __tablename__ = "messages"
     
     id = Column(Integer, primary_key=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
-    role = Column(String(20), nullable=False)  # 'user' or 'assistant'
+    role = Column(String(20), nullable=False)  # 'user', 'assistant', 'system' or 'summary'
     content = Column(Text, nullable=False)
+    token_count = Column(Integer)  # Computed once on insert
     created_at = Column(DateTime, default=datetime.utcnow)
     generation_info = Column(JSON)  # Renamed from metadata to generation_info
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
 
+    __table_args__ = (
+        Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+        # Pinned messages are few, so context assembly finds them without walking the conversation
+        Index(
+            "ix_messages_conversation_id_id_pinned", "conversation_id", "id",
+            postgresql_where=text("role IN ('system', 'summary')")
+        ),
+        # Last activity per conversation, for idle-conversation archival
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
+
+class ConversationArchive(Base):
+    __tablename__ = "conversation_archives"
+
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), primary_key=True)
+    message_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # zstd-compressed JSON array of message rows
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+class MessageEmbedding(Base):
+    __tablename__ = "message_embeddings"
+
+    # No foreign key to messages: embeddings outlive archival so cold history stays searchable
+    message_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    snippet = Column(String(200), nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float16, EMBEDDING_DIM values
+    created_at = Column(DateTime)  # Of the message
+
 class UserModelConfig(Base):
     __tablename__ = "user_model_configs"
     
@@ -37,8 +37,16 @@ class TextModelName(str, Enum):
     LLAMA_2_13B = "llama-2-13b"
     LLAMA_2_7B = "llama-2-7b"
 
+    @classmethod
+    def list(cls):
+        return [member.value for member in cls]
+
 class ImageModelName(str, Enum):
     STABLE_DIFFUSION_V1 = "stable-diffusion-v1"
     DALLE_MINI = "dalle-mini"
     MIDJOURNEY = "midjourney"
-    DALLE_2 = "dalle-2"
\ No newline at end of file
+    DALLE_2 = "dalle-2"
+
+    @classmethod
+    def list(cls):
+        return [member.value for member in cls]
\ No newline at end of file
@@ -1,20 +1,30 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Dict
+from typing import Any, Literal, Optional, Dict
 from src.models.enum import ModelType, TextModelName, ImageModelName
 
 class ModelConfig(BaseModel):
     model_type: ModelType
     model_name: str
+    parameters: Dict[str, Any] = Field(default_factory=dict)
 
     @field_validator('model_name')
     def validate_model_name(cls, v, info):
         model_type = info.data.get('model_type')
-        if model_type == "text" and v not in TextModelName.__members__:
+        if model_type == "text" and v not in TextModelName.list():
             raise ValueError(f"Invalid text model name: {v}")
-        if model_type == "image" and v not in ImageModelName.__members__:
+        if model_type == "image" and v not in ImageModelName.list():
             raise ValueError(f"Invalid image model name: {v}")
         return v
 
+class UserModelConfigUpdate(BaseModel):
+    model_type: ModelType
+    model_name: Optional[str] = Field(None, description="Omit to set defaults for every model of the type")
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator('model_name')
+    def validate_model_name(cls, v, info):
+        return v if v is None else ModelConfig.validate_model_name(v, info)
+
 class ConversationCreate(BaseModel):
     title: str
     model_type: ModelType
@@ -23,4 +33,16 @@ class ConversationCreate(BaseModel):
 class MessageCreate(BaseModel):
     role: str
     content: str
-    metadata: Optional[Dict] = None
\ No newline at end of file
+    metadata: Optional[Dict] = None
+
+class ConversationTurn(BaseModel):
+    content: str = Field(..., min_length=1, description="The new user turn; history is assembled server-side")
+    max_length: int = Field(1000, gt=0, description="Maximum number of tokens to generate")
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+
+class ChatFrame(BaseModel):
+    """A client frame on the conversation WebSocket"""
+    type: Literal["turn", "cancel", "ping"]
+    content: Optional[str] = Field(None, min_length=1)
+    max_length: int = Field(1000, gt=0)
+    parameters: Dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional
+import resource
+import time
+
+@dataclass
+class GenerationUsage:
+    """Resources one generation consumed; stored as ``generation_info["usage"]`` on its reply.
+
+    Times are in seconds. ``cpu_seconds`` is the CPU time of the model worker
+    thread, so it excludes request handling on the event loop.
+    ``peak_memory_delta_bytes`` is how far the generation raised the
+    process's peak resident set, which stays 0 unless it set a new high.
+    ``cache`` is "hit" or "miss" when the semantic response cache was
+    consulted; ``escalated`` is set when the router retried on a larger model.
+    """
+    model: Optional[str] = None
+    precision: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    queue_wait_seconds: float = 0.0
+    prefill_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    total_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_memory_delta_bytes: int = 0
+    cache: Optional[str] = None
+    escalated: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: round(value, 6) if isinstance(value, float) else value for key, value in asdict(self).items()}
+
+# Usage of the generation being served; None when nobody is accounting for it
+current_usage: ContextVar[Optional[GenerationUsage]] = ContextVar("generation_usage", default=None)
+
+# Fields whose percentiles /usage/stats reports
+COST_FIELDS = ("total_seconds", "cpu_seconds", "prompt_tokens", "completion_tokens")
+
+@contextmanager
+def track() -> Iterator[GenerationUsage]:
+    """Account for the generations made inside the block"""
+    usage = GenerationUsage()
+    token = current_usage.set(usage)
+    started = time.perf_counter()
+    try:
+        yield usage
+    finally:
+        usage.total_seconds = time.perf_counter() - started
+        try:
+            current_usage.reset(token)
+        except ValueError:
+            # An abandoned async generator is closed by the loop from another context
+            pass
+
+def update(**fields: Any) -> None:
+    usage = current_usage.get()
+    if usage is not None:
+        for name, value in fields.items():
+            setattr(usage, name, value)
+
+@contextmanager
+def timed(field: str) -> Iterator[None]:
+    """Add the block's duration to a ``*_seconds`` field of the current usage"""
+    usage = current_usage.get()
+    if usage is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(usage, field, getattr(usage, field) + time.perf_counter() - started)
+
+def _peak_rss_bytes() -> int:
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+@contextmanager
+def executor_work(usage: Optional[GenerationUsage], queue_wait: float) -> Iterator[None]:
+    """Charge a model worker thread's CPU time and memory growth to ``usage`` while it works"""
+    if usage is None:
+        yield
+        return
+    token = current_usage.set(usage)
+    cpu_started = time.thread_time()
+    peak_before = _peak_rss_bytes()
+    try:
+        yield
+    finally:
+        usage.queue_wait_seconds += queue_wait
+        usage.cpu_seconds += time.thread_time() - cpu_started
+        usage.peak_memory_delta_bytes = max(usage.peak_memory_delta_bytes, _peak_rss_bytes() - peak_before)
+        current_usage.reset(token)
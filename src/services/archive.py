@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+
+from sqlalchemy import delete, func, insert, select, update
+import zstandard
+
+from src.models.database import Conversation, ConversationArchive, Message
+from src.services.conversation_cache import ConversationCache
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+class ConversationArchiver(LoggerMixin):
+    """Moves idle conversations out of the hot ``messages`` table and back on access.
+
+    A conversation whose newest message is older than ``ARCHIVE_IDLE_DAYS`` has
+    all its messages packed into one zstd-compressed JSON blob in
+    ``conversation_archives`` and deleted from ``messages``, which keeps the hot
+    table and its indexes bounded by recent activity. Messages keep their ids,
+    so rehydrating is a plain re-insert and messages written while the
+    conversation was archived are unaffected.
+    """
+
+    def __init__(self, session_factory, cache: Optional[ConversationCache] = None):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.idle_after = timedelta(days=settings.ARCHIVE_IDLE_DAYS)
+        self.interval = settings.ARCHIVE_INTERVAL
+        self.batch_size = settings.ARCHIVE_BATCH_SIZE
+        self.compression_level = settings.ARCHIVE_COMPRESSION_LEVEL
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            self.logger.info(f"Conversation archival scheduled every {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Conversation archival pass failed: {e}", exc_info=True)
+
+    async def run_once(self) -> int:
+        """Archive one batch of idle conversations; returns how many were archived"""
+        cutoff = datetime.utcnow() - self.idle_after
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Message.conversation_id)
+                .join(Conversation, Conversation.id == Message.conversation_id)
+                .where(Conversation.archived_at.is_(None))
+                .group_by(Message.conversation_id)
+                .having(func.max(Message.created_at) < cutoff)
+                .limit(self.batch_size)
+            )
+            conversation_ids = list(result.scalars())
+        archived = 0
+        for conversation_id in conversation_ids:
+            if await self.archive(conversation_id, cutoff):
+                archived += 1
+        return archived
+
+    # Run in worker threads; zstd contexts are not thread-safe, so each call makes its own
+    def _pack(self, rows: List[Dict[str, Any]]) -> bytes:
+        compressor = zstandard.ZstdCompressor(level=self.compression_level)
+        return compressor.compress(json.dumps(rows, separators=(",", ":")).encode())
+
+    def _unpack(self, data: bytes) -> List[Dict[str, Any]]:
+        rows = json.loads(zstandard.ZstdDecompressor().decompress(data))
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"]) if row["created_at"] else None
+        return rows
+
+    async def archive(self, conversation_id: int, cutoff: Optional[datetime] = None) -> bool:
+        """Pack a conversation's messages into its archive row unless it saw activity after ``cutoff``"""
+        cutoff = cutoff or datetime.utcnow() - self.idle_after
+        async with self.session_factory() as session:
+            try:
+                archived_at = (await session.execute(
+                    select(Conversation.archived_at)
+                    .where(Conversation.id == conversation_id)
+                    .with_for_update()
+                )).scalar_one_or_none()
+                if archived_at is not None:
+                    return False
+                messages = (await session.execute(
+                    select(Message).where(Message.conversation_id == conversation_id).order_by(Message.id)
+                )).scalars().all()
+                if not messages or max(m.created_at for m in messages) >= cutoff:
+                    return False
+
+                rows = [
+                    {
+                        "id": m.id,
+                        "role": m.role,
+                        "content": m.content,
+                        "token_count": m.token_count,
+                        "created_at": m.created_at.isoformat() if m.created_at else None,
+                        "generation_info": m.generation_info,
+                    }
+                    for m in messages
+                ]
+                data = await asyncio.to_thread(self._pack, rows)
+                now = datetime.utcnow()
+                session.add(ConversationArchive(
+                    conversation_id=conversation_id,
+                    message_count=len(rows),
+                    data=data,
+                    archived_at=now
+                ))
+                await session.execute(
+                    delete(Message)
+                    .where(Message.conversation_id == conversation_id)
+                    .where(Message.id <= messages[-1].id)
+                )
+                await session.execute(
+                    update(Conversation).where(Conversation.id == conversation_id).values(archived_at=now)
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        if self.cache:
+            await self.cache.invalidate(conversation_id)
+        raw_size = sum(len(m.content) for m in messages)
+        self.logger.info(f"Archived {len(rows)} messages of conversation {conversation_id} ({raw_size} -> {len(data)} bytes)")
+        return True
+
+    async def ensure_hot(self, conversation: Conversation) -> bool:
+        """Rehydrate ``conversation`` if it is archived; returns whether it was.
+
+        Takes the row the caller already loaded, so a hot conversation costs no query.
+        """
+        if conversation.archived_at is None:
+            return False
+        return await self.rehydrate(conversation.id)
+
+    async def rehydrate(self, conversation_id: int) -> bool:
+        """Move an archived conversation's messages back into ``messages``"""
+        async with self.session_factory() as session:
+            try:
+                archived_at = (await session.execute(
+                    select(Conversation.archived_at)
+                    .where(Conversation.id == conversation_id)
+                    .with_for_update()
+                )).scalar_one_or_none()
+                # Another request may have rehydrated it while we waited for the lock
+                if archived_at is None:
+                    return False
+                archive = await session.get(ConversationArchive, conversation_id)
+                if archive is not None:
+                    rows = await asyncio.to_thread(self._unpack, archive.data)
+                    if rows:
+                        await session.execute(
+                            insert(Message),
+                            [{**row, "conversation_id": conversation_id} for row in rows]
+                        )
+                    await session.delete(archive)
+                await session.execute(
+                    update(Conversation).where(Conversation.id == conversation_id).values(archived_at=None)
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        if self.cache:
+            await self.cache.invalidate(conversation_id)
+        self.logger.info(f"Rehydrated conversation {conversation_id}")
+        return True
@@ -0,0 +1,106 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import threading
+
+from src.services import accounting
+from src.services.context import AssembledContext, ContextAssembler, ContextMessage
+from src.services.database import DatabaseService
+from src.services.llm_generate import LLMGenerate, ModelResources
+from src.services.user_context import UserContext
+from src.models.enum import ModelType
+from websrc.models.pydantic import TextGenerationRequest
+from websrc.config.logging_config import LoggerMixin
+
+class ChatSession(LoggerMixin):
+    """Conversation state held in memory for the lifetime of a chat connection.
+
+    History is read from storage once when the connection opens. After that,
+    each turn is assembled from the in-memory copy, so a turn costs no history
+    read; new messages are persisted through ``enqueue_message`` and appended
+    locally. The copy is kept in ``get_context_messages`` order and bounded by
+    the assembler's history limit.
+    """
+
+    def __init__(
+        self,
+        conversation_id: int,
+        db_service: DatabaseService,
+        assembler: ContextAssembler,
+        llm_service: LLMGenerate,
+        user: UserContext
+    ):
+        self.conversation_id = conversation_id
+        self.db_service = db_service
+        self.assembler = assembler
+        self.llm_service = llm_service
+        self.user = user
+        self.history: List[ContextMessage] = []
+        self.last_context: Optional[AssembledContext] = None
+
+    async def load(self) -> int:
+        self.history = await self.db_service.get_context_messages(
+            self.conversation_id, limit=self.assembler.history_limit
+        )
+        return len(self.history)
+
+    def _remember(self, message: ContextMessage) -> None:
+        pinned = [m for m in self.history if m.role in ContextAssembler.PINNED_ROLES]
+        turns = [m for m in self.history if m.role not in ContextAssembler.PINNED_ROLES]
+        self.history = (pinned + [message] + turns)[:self.assembler.history_limit]
+
+    async def _persist(self, message: ContextMessage, metadata: Optional[Dict[str, Any]] = None) -> None:
+        future = await self.db_service.enqueue_message(
+            conversation_id=self.conversation_id,
+            role=message.role,
+            content=message.content,
+            metadata=metadata,
+            token_count=message.token_count
+        )
+        # Fill in the id once written so later summaries can tell which turns they cover
+        future.add_done_callback(lambda f: setattr(message, "id", f.result()) if not f.exception() else None)
+        self._remember(message)
+
+    async def stream_turn(
+        self,
+        content: str,
+        max_length: int,
+        parameters: Dict[str, Any],
+        cancelled: threading.Event
+    ) -> AsyncIterator[str]:
+        """Store the user turn, then yield the reply as it is generated and store it when done.
+
+        A cancelled reply is stored as far as it got, flagged in its metadata
+        next to the generation's resource usage.
+        """
+        resources = self.llm_service.handler.resources if self.llm_service.handler else ModelResources()
+        context = self.assembler.build(self.history, content, max_length, resources.context_length)
+        self.last_context = context
+        await self._persist(ContextMessage(role="user", content=content, token_count=context.new_turn_tokens))
+
+        request = TextGenerationRequest(
+            prompt=context.prompt,
+            max_length=max_length,
+            parameters=parameters,
+            tenant=self.user.tenant,
+            model_parameters=self.user.model_parameters(ModelType.TEXT),
+            cacheable=False
+        )
+        pieces: List[str] = []
+        try:
+            with accounting.track() as usage:
+                async for piece in self.llm_service.stream_text_async(request, cancelled=cancelled):
+                    pieces.append(piece)
+                    yield piece
+        finally:
+            reply = "".join(pieces)
+            if reply:
+                metadata: Dict[str, Any] = {"usage": usage.as_dict()}
+                if cancelled.is_set():
+                    metadata["cancelled"] = True
+                await self._persist(
+                    ContextMessage(
+                        role="assistant",
+                        content=reply,
+                        token_count=self.assembler.tokenizer.count_tokens(reply)
+                    ),
+                    metadata=metadata
+                )
@@ -0,0 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
+from typing import Callable, List, Optional
+import asyncio
+import os
+import threading
+
+from src.services.context import ContextAssembler, ContextMessage
+from src.services.database import DatabaseService
+from src.services.llm_generate import LLMGenerate
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+def _lower_thread_priority() -> None:
+    """Run compaction threads at the lowest CPU priority where the OS allows it"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+class ConversationCompactor(LoggerMixin):
+    """Background job that folds old conversation turns into a summary message.
+
+    Conversations whose turns since the last compaction exceed the token
+    threshold have all but their newest turns summarized by a small model. The
+    summary is stored as a ``summary`` message, which context assembly pins in
+    place of the turns it replaces. Transcripts longer than the summary model's
+    context window are summarized in chunks, oldest first, each chunk together
+    with the summary so far. Work runs on a single low-priority thread and
+    waits while interactive generations are in flight.
+    """
+
+    SUMMARY_PROMPT = (
+        "Summarize the conversation below so it can replace the original turns. "
+        "Keep facts, decisions, names and open questions.\n\n{transcript}\n\nSummary:"
+    )
+
+    def __init__(self, db_service: DatabaseService, llm_service_provider: Callable[[], Optional[LLMGenerate]]):
+        self.db_service = db_service
+        self.llm_service_provider = llm_service_provider
+        self.token_threshold = settings.COMPACTION_TOKEN_THRESHOLD
+        self.keep_recent = settings.COMPACTION_KEEP_RECENT
+        self.interval = settings.COMPACTION_INTERVAL
+        self.batch_size = settings.COMPACTION_BATCH_SIZE
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="compaction",
+            initializer=_lower_thread_priority
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            self.logger.info(f"Conversation compaction scheduled every {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Conversation compaction pass failed: {e}", exc_info=True)
+
+    async def run_once(self) -> int:
+        """Compact one batch of candidate conversations; returns how many were compacted"""
+        conversation_ids = await self.db_service.get_compaction_candidates(
+            self.token_threshold, self.keep_recent, self.batch_size
+        )
+        compacted = 0
+        for conversation_id in conversation_ids:
+            if await self.compact(conversation_id):
+                compacted += 1
+        return compacted
+
+    async def _wait_for_idle(self, llm_service: LLMGenerate) -> None:
+        while llm_service.queue_depth > 0:
+            await asyncio.sleep(0.5)
+
+    async def compact(self, conversation_id: int) -> bool:
+        llm_service = self.llm_service_provider()
+        if llm_service is None:
+            return False
+
+        summary, turns = await self.db_service.get_compaction_state(conversation_id)
+        to_summarize = turns[:-self.keep_recent] if self.keep_recent else turns
+        if not to_summarize:
+            return False
+
+        handler = llm_service.get_text_handler(settings.COMPACTION_MODEL)
+        count_tokens = llm_service.get_tokenizer(settings.COMPACTION_MODEL).count_tokens
+        window = (
+            handler.resources.context_length - settings.COMPACTION_SUMMARY_MAX_LENGTH
+            - count_tokens(self.SUMMARY_PROMPT.format(transcript=""))
+        )
+        summary_text = summary.content if summary else None
+        remaining = to_summarize
+        while remaining:
+            budget = window - (count_tokens(self.format_transcript(summary_text, [])) + 1 if summary_text else 0)
+            chunk = self.fit_turns(remaining, budget, count_tokens)
+            prompt = self.SUMMARY_PROMPT.format(transcript=self.format_transcript(summary_text, chunk))
+            await self._wait_for_idle(llm_service)
+            summary_text = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                partial(handler.generate, prompt, max_length=settings.COMPACTION_SUMMARY_MAX_LENGTH)
+            )
+            remaining = remaining[len(chunk):]
+
+        compacted_through = to_summarize[-1].id
+        await self.db_service.add_message(
+            conversation_id=conversation_id,
+            role=ContextAssembler.SUMMARY_ROLE,
+            content=summary_text,
+            metadata={"compacted_through": compacted_through, "model": settings.COMPACTION_MODEL}
+        )
+        await self.db_service.mark_compacted(conversation_id, compacted_through)
+        self.logger.info(f"Compacted {len(to_summarize)} messages of conversation {conversation_id}")
+        return True
+
+    @staticmethod
+    def format_transcript(summary: Optional[str], turns: List[ContextMessage]) -> str:
+        lines = [f"Earlier summary: {summary}"] if summary else []
+        lines.extend(f"{turn.role}: {turn.content}" for turn in turns)
+        return "\n".join(lines)
+
+    @staticmethod
+    def fit_turns(turns: List[ContextMessage], budget: int, count_tokens: Callable[[str], int]) -> List[ContextMessage]:
+        """The oldest turns whose transcript fits in ``budget`` tokens; a first turn too long on its own is clipped"""
+        chunk: List[ContextMessage] = []
+        used = 0
+        for turn in turns:
+            # Each line after the first also costs its newline
+            tokens = count_tokens(f"{turn.role}: {turn.content}") + (1 if chunk else 0)
+            if used + tokens > budget:
+                break
+            chunk.append(turn)
+            used += tokens
+        if chunk or not turns:
+            return chunk
+        content = turns[0].content
+        while len(content) > 1 and count_tokens(f"{turns[0].role}: {content}") > budget:
+            content = content[:len(content) * 3 // 4]
+        return [replace(turns[0], content=content)]
@@ -1,16 +1,43 @@
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, TYPE_CHECKING
 from fastapi import Depends
 from src.services.llm_generate import LLMGenerate, ModelFactory
 from websrc.config.settings import settings
 from src.services.database import DatabaseService
-from src.db.session import AsyncSessionLocal
+from src.services.tokenizer import TokenizerService
+from src.services.context import ContextAssembler
+from src.services.conversation_cache import ConversationCache
+from src.services.compaction import ConversationCompactor
+from src.services.transfer import ConversationTransfer
+from src.services.archive import ConversationArchiver
+from src.services.user_context import UserContextResolver
+from src.services.warmup import ModelWarmup
+from src.services.loop_monitor import EventLoopMonitor
+from src.db import session as db
 import logging
+import threading
+
+if TYPE_CHECKING:
+    # Optional subsystems; imported on first use so they cost nothing while disabled
+    from src.services.embeddings import EmbeddingService
+    from src.services.search import MessageSearchIndex
+    from src.services.traffic_capture import TrafficRecorder
 
 class ServiceContainer:
     def __init__(self):
         self._factory: Optional[ModelFactory] = None
         self._llm_service: Optional[LLMGenerate] = None
+        # Warm-up builds the service in a worker thread while requests may ask for it too
+        self._llm_service_lock = threading.Lock()
         self._db_service: Optional[DatabaseService] = None
+        self._fallback_tokenizer: Optional[TokenizerService] = None
+        self._compactor: Optional[ConversationCompactor] = None
+        self._archiver: Optional[ConversationArchiver] = None
+        self._user_context_resolver: Optional[UserContextResolver] = None
+        self._embedding_service: Optional["EmbeddingService"] = None
+        self._search_index: Optional["MessageSearchIndex"] = None
+        self._warmup: Optional[ModelWarmup] = None
+        self._loop_monitor: Optional[EventLoopMonitor] = None
+        self._traffic_recorder: Optional["TrafficRecorder"] = None
         self.logger = logging.getLogger(__name__)
     
     @property
@@ -22,33 +49,113 @@ class ServiceContainer:
     @property
     def llm_service(self) -> Optional[LLMGenerate]:
         if not self._llm_service and settings.ENABLE_LLM_SERVICE:
-            self._llm_service = LLMGenerate(self.factory)
+            with self._llm_service_lock:
+                if not self._llm_service:
+                    response_cache = None
+                    if settings.SEMANTIC_CACHE_ENABLED:
+                        from src.services.semantic_cache import SemanticResponseCache
+                        response_cache = SemanticResponseCache(self.embedding_service)
+                    self._llm_service = LLMGenerate(self.factory, response_cache=response_cache)
         return self._llm_service
     
+    @property
+    def tokenizer_service(self) -> TokenizerService:
+        if self.llm_service:
+            return self.llm_service.get_tokenizer()
+        if not self._fallback_tokenizer:
+            self._fallback_tokenizer = TokenizerService(model_name=settings.MODEL_NAME)
+        return self._fallback_tokenizer
+
+    @property
+    def archiver(self) -> ConversationArchiver:
+        # Rehydration stays on even when ARCHIVE_ENABLED no longer schedules new archival
+        if not self._archiver:
+            self._archiver = ConversationArchiver(
+                db.AsyncSessionLocal,
+                cache=ConversationCache(db.async_redis_client) if settings.CONVERSATION_CACHE_ENABLED else None
+            )
+        return self._archiver
+
     @property
     def db_service(self) -> DatabaseService:
         if not self._db_service:
-            self._db_service = DatabaseService(AsyncSessionLocal)
+            self._db_service = DatabaseService(
+                db.AsyncSessionLocal,
+                token_counter=lambda text: self.tokenizer_service.count_tokens(text),
+                cache=self.archiver.cache,
+                write_behind=settings.DB_WRITE_BEHIND_ENABLED,
+                archiver=self.archiver
+            )
         return self._db_service
 
+    @property
+    def context_assembler(self) -> ContextAssembler:
+        return ContextAssembler(self.db_service, self.tokenizer_service)
+
+    @property
+    def transfer_service(self) -> ConversationTransfer:
+        return ConversationTransfer(db.AsyncSessionLocal)
+
+    @property
+    def user_context_resolver(self) -> UserContextResolver:
+        if not self._user_context_resolver:
+            self._user_context_resolver = UserContextResolver(db.AsyncSessionLocal, db.async_redis_client)
+        return self._user_context_resolver
+
+    @property
+    def embedding_service(self) -> "EmbeddingService":
+        if not self._embedding_service:
+            from src.services.embeddings import EmbeddingService
+            self._embedding_service = EmbeddingService()
+        return self._embedding_service
+
+    @property
+    def search_index(self) -> "MessageSearchIndex":
+        if not self._search_index:
+            from src.services.search import MessageSearchIndex
+            self._search_index = MessageSearchIndex(db.AsyncSessionLocal, self.embedding_service)
+        return self._search_index
+
+    @property
+    def warmup(self) -> ModelWarmup:
+        if not self._warmup:
+            self._warmup = ModelWarmup(lambda: self.llm_service)
+        return self._warmup
+
+    @property
+    def loop_monitor(self) -> EventLoopMonitor:
+        if not self._loop_monitor:
+            self._loop_monitor = EventLoopMonitor()
+        return self._loop_monitor
+
+    @property
+    def traffic_recorder(self) -> "TrafficRecorder":
+        if not self._traffic_recorder:
+            from src.services.traffic_capture import TrafficRecorder
+            self._traffic_recorder = TrafficRecorder(token_counter=lambda text: self.tokenizer_service.count_tokens(text))
+        return self._traffic_recorder
+
+    @property
+    def compactor(self) -> ConversationCompactor:
+        if not self._compactor:
+            self._compactor = ConversationCompactor(self.db_service, lambda: self.llm_service)
+        return self._compactor
+
     async def get_model_factory(self) -> ModelFactory:
         return self.factory
 
-    async def get_llm_generate_service(
-        self,
-        factory: ModelFactory = Depends(get_model_factory)
-    ) -> AsyncGenerator[Optional[LLMGenerate], None]:
+    async def get_llm_generate_service(self) -> AsyncGenerator[Optional[LLMGenerate], None]:
         try:
             yield self.llm_service
         except Exception as e:
             self.logger.error(f"LLM service error: {e}")
-            yield None
+            raise
 
     async def get_db_service(self) -> AsyncGenerator[DatabaseService, None]:
         try:
             yield self.db_service
         except Exception as e:
             self.logger.error(f"Database service error: {e}")
-            yield None
+            raise
 
 container = ServiceContainer() 
\ No newline at end of file
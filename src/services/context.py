@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from src.services.tokenizer import TokenizerService
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+@dataclass
+class ContextMessage:
+    """A conversation turn as seen by context assembly"""
+    role: str
+    content: str
+    token_count: Optional[int] = None
+    id: Optional[int] = None
+    compacted_through: Optional[int] = None  # Set on summary messages: last message id they replace
+
+@dataclass
+class AssembledContext:
+    """The prompt built for a conversation turn"""
+    prompt: str
+    prompt_tokens: int
+    new_turn_tokens: int
+    messages: List[ContextMessage] = field(default_factory=list)
+    truncated: int = 0
+
+class ContextAssembler(LoggerMixin):
+    """Build a prompt from stored conversation history that fits the model's context window.
+
+    System messages and the latest compaction summary are pinned; turns the
+    summary replaces are skipped and the rest are kept newest-first until the
+    token budget, which reserves room for the new turn and the requested
+    completion, runs out.
+    """
+    SUMMARY_ROLE = "summary"
+    PINNED_ROLES = ("system", SUMMARY_ROLE)
+
+    def __init__(self, db_service, tokenizer: TokenizerService, history_limit: Optional[int] = None):
+        self.db_service = db_service
+        self.tokenizer = tokenizer
+        self.history_limit = history_limit or settings.CONTEXT_HISTORY_LIMIT
+
+    async def assemble(
+        self,
+        conversation_id: int,
+        new_turn: str,
+        max_length: int,
+        context_length: int,
+    ) -> AssembledContext:
+        history = await self.db_service.get_context_messages(conversation_id, limit=self.history_limit)
+        return self.build(history, new_turn, max_length, context_length)
+
+    def build(
+        self,
+        history: Sequence[ContextMessage],
+        new_turn: str,
+        max_length: int,
+        context_length: int,
+    ) -> AssembledContext:
+        """Select turns from ``history`` and format the prompt.
+
+        ``history`` is ordered pinned messages first, then newest first, as
+        returned by ``DatabaseService.get_context_messages``.
+        """
+        new_message = ContextMessage(role="user", content=new_turn, token_count=self.tokenizer.count_tokens(new_turn))
+        budget = context_length - max_length - new_message.token_count
+        history = self._apply_summary(history)
+        self._fill_token_counts(history)
+
+        selected: List[ContextMessage] = []
+        dropped = 0
+        exhausted = False
+        for message in history:
+            pinned = message.role in self.PINNED_ROLES
+            if (pinned or not exhausted) and budget >= message.token_count:
+                selected.append(message)
+                budget -= message.token_count
+                continue
+            if pinned:
+                self.logger.warning(f"Pinned {message.role} message {message.id} does not fit the context window")
+            # Keep the history contiguous: once a turn is dropped, every older turn is dropped too
+            exhausted = exhausted or not pinned
+            dropped += 1
+
+        # History is newest-first, so among unsaved messages a later position means older
+        position = {id(message): index for index, message in enumerate(history)}
+        selected.sort(key=lambda message: (self._chronological(message), -position[id(message)]))
+        selected.append(new_message)
+        return AssembledContext(
+            prompt=self.format_prompt(selected),
+            prompt_tokens=sum(message.token_count for message in selected),
+            new_turn_tokens=new_message.token_count,
+            messages=selected,
+            truncated=dropped,
+        )
+
+    def _apply_summary(self, history: Sequence[ContextMessage]) -> List[ContextMessage]:
+        """Keep only the newest summary and drop the turns it replaces"""
+        summaries = [message for message in history if message.role == self.SUMMARY_ROLE]
+        if not summaries:
+            return list(history)
+        latest = max(summaries, key=self._chronological)
+        covered = latest.compacted_through or 0
+        return [
+            message for message in history
+            if message is latest
+            or (message.role != self.SUMMARY_ROLE and (
+                message.role in self.PINNED_ROLES or message.id is None or message.id > covered
+            ))
+        ]
+
+    def _chronological(self, message: ContextMessage):
+        """Pinned first, then by id; messages not yet written (no id) are the newest"""
+        return (message.role not in self.PINNED_ROLES, message.id is None, message.id or 0)
+
+    def _fill_token_counts(self, history: Sequence[ContextMessage]) -> None:
+        """Count tokens for rows stored before counts were recorded"""
+        missing = [message for message in history if message.token_count is None]
+        if missing:
+            counts = self.tokenizer.count_tokens_batch([message.content for message in missing])
+            for message, count in zip(missing, counts):
+                message.token_count = count
+
+    @staticmethod
+    def format_prompt(messages: Sequence[ContextMessage]) -> str:
+        lines = [f"{message.role}: {message.content}" for message in messages]
+        lines.append("assistant:")
+        return "\n".join(lines)
@@ -0,0 +1,132 @@
+from typing import List, Optional, Sequence
+import json
+
+from redis.exceptions import RedisError
+
+from src.services import metrics, tracing
+from src.services.context import ContextAssembler, ContextMessage
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+# Append only while the conversation is cached, so an expired tail is never rebuilt from a single message
+_APPEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+local size = tonumber(ARGV[2])
+if size > 0 then
+    redis.call('LTRIM', KEYS[2], -size, -1)
+end
+for i = 1, #KEYS do
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+class ConversationCache(LoggerMixin):
+    """Write-through Redis cache of the last N messages of active conversations.
+
+    Each conversation uses three keys: a marker that says the cached tail is
+    complete, the pinned (system and summary) messages and the newest other messages. All
+    of them expire after ``ttl`` seconds without reads or writes. Redis errors
+    are logged and reported as a miss so callers fall back to the database,
+    as are reads that want more history than a full tail holds.
+    """
+
+    def __init__(self, redis_client, size: Optional[int] = None, ttl: Optional[int] = None):
+        self.redis = redis_client
+        self.size = size or settings.CONVERSATION_CACHE_SIZE
+        self.ttl = ttl or settings.CONVERSATION_CACHE_TTL
+        self._append = self.redis.register_script(_APPEND_SCRIPT)
+
+    @staticmethod
+    def _keys(conversation_id: int) -> List[str]:
+        prefix = f"conversation:{conversation_id}"
+        return [f"{prefix}:cached", f"{prefix}:pinned", f"{prefix}:tail"]
+
+    @staticmethod
+    def _dump(message: ContextMessage) -> str:
+        return json.dumps({
+            "id": message.id,
+            "role": message.role,
+            "content": message.content,
+            "token_count": message.token_count,
+            "compacted_through": message.compacted_through,
+        })
+
+    @staticmethod
+    def _load(raw: str) -> ContextMessage:
+        return ContextMessage(**json.loads(raw))
+
+    async def get(self, conversation_id: int, limit: Optional[int] = None) -> Optional[List[ContextMessage]]:
+        """Pinned messages first, then the newest first, or None on a miss.
+
+        With ``limit``, a tail trimmed to ``size`` is a miss when ``limit`` asks
+        for more, since older messages may exist only in the database.
+        """
+        marker, pinned, tail = self._keys(conversation_id)
+        try:
+            with tracing.stage("cache.conversation_lookup"):
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.exists(marker)
+                    pipe.lrange(pinned, 0, -1)
+                    pipe.lrange(tail, 0, -1)
+                    for key in (marker, pinned, tail):
+                        pipe.expire(key, self.ttl)
+                    exists, pinned_raw, tail_raw, *_ = await pipe.execute()
+        except RedisError as e:
+            self.logger.warning(f"Conversation cache read failed for {conversation_id}: {e}")
+            metrics.cache_result("conversation", False)
+            return None
+        truncated = limit is not None and limit > self.size and len(tail_raw) >= self.size
+        metrics.cache_result("conversation", bool(exists) and not truncated)
+        if not exists or truncated:
+            return None
+        messages, seen = [], set()
+        for raw in list(pinned_raw) + list(reversed(tail_raw)):
+            message = self._load(raw)
+            # A message written while the tail was being repopulated can be cached twice
+            if message.id is not None and message.id in seen:
+                continue
+            seen.add(message.id)
+            messages.append(message)
+        return messages
+
+    async def populate(self, conversation_id: int, messages: Sequence[ContextMessage]) -> None:
+        """Replace the cached tail with ``messages`` ordered as ``DatabaseService.get_context_messages``"""
+        marker, pinned, tail = self._keys(conversation_id)
+        pinned_messages = [m for m in messages if m.role in ContextAssembler.PINNED_ROLES]
+        recent = [m for m in messages if m.role not in ContextAssembler.PINNED_ROLES][:self.size]
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(pinned, tail)
+                if pinned_messages:
+                    pipe.rpush(pinned, *[self._dump(m) for m in pinned_messages])
+                if recent:
+                    pipe.rpush(tail, *[self._dump(m) for m in reversed(recent)])
+                pipe.set(marker, 1)
+                for key in (marker, pinned, tail):
+                    pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            self.logger.warning(f"Conversation cache populate failed for {conversation_id}: {e}")
+
+    async def append(self, conversation_id: int, message: ContextMessage) -> None:
+        """Write-through for a newly stored message; a no-op if the conversation is not cached"""
+        marker, pinned, tail = self._keys(conversation_id)
+        is_pinned = message.role in ContextAssembler.PINNED_ROLES
+        try:
+            await self._append(
+                keys=[marker, pinned if is_pinned else tail, tail if is_pinned else pinned],
+                args=[self._dump(message), 0 if is_pinned else self.size, self.ttl],
+            )
+        except RedisError as e:
+            self.logger.warning(f"Conversation cache append failed for {conversation_id}: {e}")
+            await self.invalidate(conversation_id)
+
+    async def invalidate(self, conversation_id: int) -> None:
+        try:
+            await self.redis.delete(*self._keys(conversation_id))
+        except RedisError as e:
+            self.logger.warning(f"Conversation cache invalidate failed for {conversation_id}: {e}")
@@ -1,19 +1,52 @@
-from typing import Optional, List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Literal, Optional, List, Tuple
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from src.models.database import User, Conversation, Message
-from websrc.config.logging_config import LoggerMixin, log_async_function
+from sqlalchemy import select, func, literal, union_all, update, tuple_
+from datetime import datetime
+from src.models.database import User, Conversation, Message, UserModelConfig
+from websrc.config.logging_config import LoggerMixin, instrument
 from src.models.pydantic import ModelType
+from src.services.context import ContextAssembler, ContextMessage
+from src.services.conversation_cache import ConversationCache
+from src.services.write_buffer import MessageWriteBuffer
+from src.services.archive import ConversationArchiver
+from src.services import accounting, metrics, tracing
 
 class DatabaseService(LoggerMixin):
-    def __init__(self, session_factory):
+    def __init__(
+        self,
+        session_factory,
+        token_counter: Optional[Callable[[str], int]] = None,
+        cache: Optional[ConversationCache] = None,
+        write_behind: bool = False,
+        archiver: Optional[ConversationArchiver] = None
+    ):
         self.session_factory = session_factory
-        
-    async def get_session(self) -> AsyncSession:
+        self.token_counter = token_counter
+        self.cache = cache
+        self.archiver = archiver
+        self.write_buffer = (
+            MessageWriteBuffer(session_factory, on_flushed=self._on_messages_flushed) if write_behind else None
+        )
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """A pooled session scoped to the block; rolled back on error and always returned to the pool"""
         async with self.session_factory() as session:
-            return session
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def close(self) -> None:
+        """Flush buffered writes; call on shutdown"""
+        if self.write_buffer:
+            await self.write_buffer.stop()
             
-    @log_async_function
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
     async def create_conversation(
         self,
         user_id: int,
@@ -21,7 +54,7 @@ class DatabaseService(LoggerMixin):
         model_type: ModelType,
         model_name: str
     ) -> Conversation:
-        async with await self.get_session() as session:
+        async with self.get_session() as session:
             conversation = Conversation(
                 user_id=user_id,
                 title=title,
@@ -32,21 +65,324 @@ class DatabaseService(LoggerMixin):
             await session.commit()
             return conversation
             
-    @log_async_function
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def get_conversation(self, conversation_id: int) -> Optional[Conversation]:
+        async with self.get_session() as session:
+            return await session.get(Conversation, conversation_id)
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    @tracing.traced("db.persist")
     async def add_message(
         self,
         conversation_id: int,
         role: str,
         content: str,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        token_count: Optional[int] = None
     ) -> Message:
-        async with await self.get_session() as session:
-            message = Message(
-                conversation_id=conversation_id,
-                role=role,
-                content=content,
-                generation_info=metadata
-            )
+        values = self._message_values(conversation_id, role, content, metadata, token_count)
+        async with self.get_session() as session:
+            message = Message(**values)
             session.add(message)
             await session.commit()
-            return message
+        await self._cache_message({**values, "id": message.id})
+        return message
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    @tracing.traced("db.persist")
+    async def enqueue_message(
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        metadata: Optional[dict] = None,
+        token_count: Optional[int] = None
+    ) -> asyncio.Future:
+        """Persist a message without waiting for the commit when write-behind is enabled.
+
+        Returns a future that resolves to the message id once the row is written.
+        Without write-behind this is ``add_message`` with an already resolved future.
+        """
+        if not self.write_buffer:
+            message = await self.add_message(conversation_id, role, content, metadata, token_count)
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(message.id)
+            return future
+        return self.write_buffer.enqueue(self._message_values(conversation_id, role, content, metadata, token_count))
+
+    def _message_values(
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        metadata: Optional[dict],
+        token_count: Optional[int]
+    ) -> Dict[str, Any]:
+        if token_count is None and self.token_counter is not None:
+            token_count = self.token_counter(content)
+        return {
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "token_count": token_count,
+            "generation_info": metadata,
+        }
+
+    @staticmethod
+    def _context_message(values: Dict[str, Any]) -> ContextMessage:
+        return ContextMessage(
+            id=values.get("id"),
+            role=values["role"],
+            content=values["content"],
+            token_count=values["token_count"],
+            compacted_through=(values["generation_info"] or {}).get("compacted_through")
+        )
+
+    async def _cache_message(self, values: Dict[str, Any]) -> None:
+        if self.cache:
+            await self.cache.append(values["conversation_id"], self._context_message(values))
+
+    async def ensure_hot(self, conversation: Conversation) -> None:
+        """Rehydrate an archived conversation before its messages are read.
+
+        Readers call this with the conversation row they already looked up.
+        Writes skip it: archived messages keep their ids, so new rows can land
+        in the hot table while the older ones are still archived.
+        """
+        if self.archiver:
+            await self.archiver.ensure_hot(conversation)
+
+    async def _on_messages_flushed(self, rows: List[Dict[str, Any]]) -> None:
+        for values in rows:
+            await self._cache_message(values)
+
+    def _with_pending(self, conversation_id: int, messages: List[ContextMessage]) -> List[ContextMessage]:
+        """Add messages still in the write-behind buffer, keeping pinned-first, newest-first order"""
+        pending = self.write_buffer.pending_for(conversation_id) if self.write_buffer else []
+        if not pending:
+            return messages
+        pending_messages = [self._context_message(values) for values in reversed(pending)]
+        is_pinned = lambda message: message.role in ContextAssembler.PINNED_ROLES
+        return (
+            [m for m in messages if is_pinned(m)] + [m for m in pending_messages if is_pinned(m)]
+            + [m for m in pending_messages if not is_pinned(m)] + [m for m in messages if not is_pinned(m)]
+        )
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def get_context_messages(self, conversation_id: int, limit: int) -> List[ContextMessage]:
+        """Pinned system messages first, then the newest turns.
+
+        Each half is a LIMITed backward scan of its own index on (conversation_id, id),
+        combined with UNION ALL, so only ``limit`` rows per half are read and sorted.
+        """
+        if self.cache:
+            cached = await self.cache.get(conversation_id, limit)
+            if cached is not None:
+                return self._with_pending(conversation_id, cached)[:limit]
+        columns = (
+            Message.id,
+            Message.role,
+            Message.content,
+            Message.token_count,
+            Message.generation_info["compacted_through"].as_integer().label("compacted_through")
+        )
+        pinned = Message.role.in_(ContextAssembler.PINNED_ROLES)
+        newest = union_all(*(
+            select(*columns, literal(rank).label("rank"))
+            .where(Message.conversation_id == conversation_id)
+            .where(condition)
+            .order_by(Message.id.desc())
+            .limit(limit)
+            for rank, condition in ((0, pinned), (1, ~pinned))
+        )).subquery()
+        async with self.get_session() as session:
+            result = await session.execute(
+                select(newest).order_by(newest.c.rank, newest.c.id.desc()).limit(limit)
+            )
+            messages = [
+                ContextMessage(
+                    id=row.id,
+                    role=row.role,
+                    content=row.content,
+                    token_count=row.token_count,
+                    compacted_through=row.compacted_through
+                )
+                for row in result
+            ]
+        if self.cache:
+            await self.cache.populate(conversation_id, messages)
+        return self._with_pending(conversation_id, messages)[:limit]
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def get_compaction_candidates(self, token_threshold: int, min_turns: int, limit: int) -> List[int]:
+        """Conversations with more than ``min_turns`` turns and ``token_threshold`` tokens since the last compaction.
+
+        Conversations that are over the threshold but cannot be compacted yet
+        are left out, so they do not take up the batch on every pass; the ones
+        waiting longest come first.
+        """
+        async with self.get_session() as session:
+            result = await session.execute(
+                select(Message.conversation_id)
+                .join(Conversation, Conversation.id == Message.conversation_id)
+                .where(Conversation.archived_at.is_(None))
+                .where(Message.role.notin_(ContextAssembler.PINNED_ROLES))
+                .where(Message.id > func.coalesce(Conversation.compacted_through, 0))
+                .group_by(Message.conversation_id)
+                .having(func.sum(Message.token_count) > token_threshold)
+                .having(func.count() > min_turns)
+                .order_by(func.min(Message.id))
+                .limit(limit)
+            )
+            return list(result.scalars())
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def get_compaction_state(self, conversation_id: int) -> Tuple[Optional[ContextMessage], List[ContextMessage]]:
+        """The latest summary, if any, and every turn after it in chronological order"""
+        async with self.get_session() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            if conversation is None:
+                return None, []
+            await self.ensure_hot(conversation)
+            compacted_through = conversation.compacted_through
+            summary = (await session.execute(
+                select(Message.id, Message.role, Message.content, Message.token_count)
+                .where(Message.conversation_id == conversation_id)
+                .where(Message.role == ContextAssembler.SUMMARY_ROLE)
+                .order_by(Message.id.desc())
+                .limit(1)
+            )).first()
+            turns = await session.execute(
+                select(Message.id, Message.role, Message.content, Message.token_count)
+                .where(Message.conversation_id == conversation_id)
+                .where(Message.role.notin_(ContextAssembler.PINNED_ROLES))
+                .where(Message.id > (compacted_through or 0))
+                .order_by(Message.id)
+            )
+            return (
+                ContextMessage(
+                    id=summary.id,
+                    role=summary.role,
+                    content=summary.content,
+                    token_count=summary.token_count,
+                    compacted_through=compacted_through
+                ) if summary else None,
+                [
+                    ContextMessage(id=row.id, role=row.role, content=row.content, token_count=row.token_count)
+                    for row in turns
+                ]
+            )
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def mark_compacted(self, conversation_id: int, compacted_through: int) -> None:
+        async with self.get_session() as session:
+            await session.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(compacted_through=compacted_through)
+            )
+            await session.commit()
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def set_user_model_config(
+        self,
+        user_id: int,
+        model_type: ModelType,
+        model_name: Optional[str],
+        parameters: Dict[str, Any]
+    ) -> UserModelConfig:
+        """Create or replace a user's parameters for one model, or for every model of the type when ``model_name`` is None"""
+        async with self.get_session() as session:
+            config = await session.scalar(
+                select(UserModelConfig)
+                .where(UserModelConfig.user_id == user_id)
+                .where(UserModelConfig.model_type == model_type)
+                .where(
+                    UserModelConfig.model_name == model_name if model_name is not None
+                    else UserModelConfig.model_name.is_(None)
+                )
+            )
+            if config is None:
+                config = UserModelConfig(user_id=user_id, model_type=model_type, model_name=model_name)
+                session.add(config)
+            config.parameters = parameters
+            await session.commit()
+            return config
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def list_conversations(
+        self,
+        user_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Conversation]:
+        """Newest conversations first, continuing after the (created_at, id) keyset ``before``"""
+        query = select(Conversation).where(Conversation.user_id == user_id)
+        if before is not None:
+            query = query.where(tuple_(Conversation.created_at, Conversation.id) < tuple_(*before))
+        async with self.get_session() as session:
+            result = await session.execute(
+                query.order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(limit)
+            )
+            return list(result.scalars())
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def list_messages(
+        self,
+        conversation_id: int,
+        limit: int,
+        after_id: Optional[int] = None,
+        descending: bool = False
+    ) -> List[Message]:
+        """Messages of a conversation in id order, continuing past the keyset ``after_id``"""
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if after_id is not None:
+            query = query.where(Message.id < after_id if descending else Message.id > after_id)
+        async with self.get_session() as session:
+            result = await session.execute(
+                query.order_by(Message.id.desc() if descending else Message.id).limit(limit)
+            )
+            return list(result.scalars())
+
+    @instrument
+    @metrics.timed(metrics.db_operation_duration)
+    async def usage_percentiles(
+        self,
+        group_by: Literal["user", "model"],
+        since: datetime,
+        quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)
+    ) -> List[Dict[str, Any]]:
+        """Percentiles of the usage recorded on assistant replies since ``since``, per user or per model"""
+        key = (
+            Conversation.user_id if group_by == "user"
+            else Message.generation_info[("usage", "model")].as_string()
+        )
+        columns = [key.label("key"), func.count().label("replies")]
+        for field in accounting.COST_FIELDS:
+            value = Message.generation_info[("usage", field)].as_float()
+            columns.append(func.sum(value).label(f"{field}_sum"))
+            columns.extend(
+                func.percentile_cont(quantile).within_group(value).label(f"{field}_p{round(quantile * 100)}")
+                for quantile in quantiles
+            )
+        async with self.get_session() as session:
+            result = await session.execute(
+                select(*columns)
+                .join(Conversation, Conversation.id == Message.conversation_id)
+                .where(Message.role == "assistant")
+                .where(Message.created_at >= since)
+                .where(Message.generation_info[("usage", "model")].as_string().is_not(None))
+                .group_by(key)
+                .order_by(key)
+            )
+            return [dict(row._mapping) for row in result]
@@ -0,0 +1,67 @@
+from typing import Any, List, Optional, Sequence
+import re
+import zlib
+
+import numpy as np
+
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class EmbeddingService(LoggerMixin):
+    """L2-normalized sentence embeddings from a small local CPU model.
+
+    Until a model is loaded, texts are embedded by signed feature hashing of
+    lowercased words, word bigrams and character trigrams. That is cheap,
+    deterministic and tolerant of casing, whitespace and small wording changes.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, dim: Optional[int] = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.dim = dim or settings.EMBEDDING_DIM
+        self.model = self.load_model()
+
+    def load_model(self) -> Any:
+        self.logger.info(f"Loading embedding model: {self.model_name}")
+        # Placeholder: Replace with actual embedding model loading logic
+        return None
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = _WORD_PATTERN.findall(text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def _hash_embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        # Sublinear term frequency keeps long texts from being dominated by repeated words
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """One normalized float32 row per text"""
+        if self.model is None:
+            return self._hash_embed(texts)
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    @staticmethod
+    def to_bytes(vector: np.ndarray) -> bytes:
+        """Compact float16 storage form"""
+        return np.asarray(vector, dtype=np.float16).tobytes()
+
+    def from_bytes(self, data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype=np.float16).astype(np.float32).reshape(self.dim)
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union, TYPE_CHECKING
 from dataclasses import dataclass
 import logging
+import re
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+from functools import lru_cache, partial
 import asyncio
 
 from src.models.pydantic import ModelConfig
@@ -17,6 +20,14 @@ from websrc.api.exceptions.exceptions import (
 )
 from websrc.config.settings import settings
 from websrc.config.logging_config import LoggerMixin
+from src.services.model_router import ModelRouter, RouteDecision
+from src.services.tokenizer import TokenizerService
+from src.services import accounting, metrics, tracing
+from src.services.profiler import current_route, profiler
+from opentelemetry import context as otel_context
+
+if TYPE_CHECKING:
+    from src.services.semantic_cache import CacheHit, SemanticResponseCache
 
 @dataclass
 class ModelResources:
@@ -32,9 +43,12 @@ class BaseModelHandler(ABC, LoggerMixin):
     def __init__(self, model_config: ModelConfig, resources: Optional[ModelResources] = None):
         self.model_config = model_config
         self.resources = resources or ModelResources()
-        self.logger = self.logger
         self._executor = ThreadPoolExecutor(max_workers=self.resources.cpu_threads)
+        self.metric_attributes = {"model": model_config.model_name}
+        self.busy_workers = 0
+        self._busy_lock = threading.Lock()
         self._initialize()
+        metrics.register_handler(self)
 
     def _initialize(self):
         """Initialize model resources and settings"""
@@ -42,6 +56,36 @@ class BaseModelHandler(ABC, LoggerMixin):
         self._setup_model_parameters()
         self.logger.info(f"Initialized {self.__class__.__name__} with {self.resources}")
 
+    def _tracked(self, work: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap work for the executor so its queue wait, busy worker count, trace context, profiling tag and usage carry over"""
+        submitted = time.perf_counter()
+        submitted_ns = time.time_ns()
+        # Executor threads do not inherit the caller's context, so spans are parented explicitly
+        parent = otel_context.get_current()
+        route = current_route.get()
+        usage = accounting.current_usage.get()
+
+        def run() -> Any:
+            token = otel_context.attach(parent)
+            waited = time.perf_counter() - submitted
+            metrics.queue_wait.record(waited, self.metric_attributes)
+            tracing.tracer.start_span("llm.queue_wait", start_time=submitted_ns, attributes=self.metric_attributes).end()
+            with self._busy_lock:
+                self.busy_workers += 1
+            try:
+                with profiler.executor_work(route, self.model_config.model_name), accounting.executor_work(usage, waited):
+                    return work()
+            finally:
+                with self._busy_lock:
+                    self.busy_workers -= 1
+                otel_context.detach(token)
+        return run
+
+    def resident_memory_bytes(self) -> int:
+        """Memory held by the loaded weights, when the model can report it"""
+        footprint = getattr(self.model, "get_memory_footprint", None)
+        return int(footprint()) if callable(footprint) else 0
+
     @abstractmethod
     def _setup_model_parameters(self):
         """Configure model-specific parameters"""
@@ -55,6 +99,56 @@ class BaseModelHandler(ABC, LoggerMixin):
     def generate(self, prompt: str, **kwargs) -> Any:
         pass
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[Any]:
+        """Yield the output in pieces as it is produced; models that cannot stream yield it whole"""
+        yield self.generate(prompt, **kwargs)
+
+    async def generate_stream_async(
+        self,
+        prompt: str,
+        cancelled: Optional[threading.Event] = None,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """Run ``generate_stream`` on the handler's thread pool and relay its pieces.
+
+        Setting ``cancelled`` stops generation at the next piece; so does closing
+        the iterator early.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        closed = threading.Event()
+
+        def produce() -> None:
+            try:
+                for piece in self.generate_stream(prompt, **kwargs):
+                    if closed.is_set() or (cancelled is not None and cancelled.is_set()):
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, piece)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        loop.run_in_executor(self._executor, self._tracked(produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                # Pieces already queued are dropped once the caller cancels
+                if cancelled is not None and cancelled.is_set():
+                    break
+        finally:
+            closed.set()
+
+    def score_confidence(self, prompt: str, output: Any) -> Optional[float]:
+        """Confidence in [0, 1] for a generated output, or None if the model cannot tell"""
+        return None
+
     def __del__(self):
         self._executor.shutdown(wait=False)
 
@@ -67,6 +161,10 @@ class TextModelHandler(BaseModelHandler):
             "repetition_penalty": self.model_config.parameters.get("repetition_penalty", 1.1),
         }
 
+    def generation_options(self, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Model defaults overridden by per-request parameters"""
+        return {**self.generation_config, **(parameters or {})}
+
     @lru_cache(maxsize=1)  # Cache the model loading
     def load_model(self) -> Tuple[Any, Any]:
         self.logger.info(f"Loading text model: {self.model_config.model_name}")
@@ -79,14 +177,31 @@ class TextModelHandler(BaseModelHandler):
 
     async def generate_async(self, prompt: str, **kwargs) -> str:
         return await asyncio.get_event_loop().run_in_executor(
-            self._executor, self.generate, prompt, **kwargs
+            self._executor, self._tracked(partial(self.generate, prompt, **kwargs))
         )
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        # Placeholder: Replace with the model's token streamer; joined pieces equal ``generate``
+        yield from re.findall(r"\S+\s*", self.generate(prompt, **kwargs))
+
     def generate(self, prompt: str, **kwargs) -> str:
         self.logger.info(f"Generating text with prompt: {prompt[:50]}...")
         try:
-            # Placeholder: Replace with actual text generation logic
-            return f"Generated text based on prompt: {prompt}"
+            options = self.generation_options(kwargs.get("parameters"))
+            with tracing.stage("llm.tokenize") as span:
+                # Placeholder: Replace with the model tokenizer's encoding of ``prompt``
+                input_ids = prompt.split()
+                span.set_attribute("llm.prompt_tokens", len(input_ids))
+            with tracing.stage("llm.prefill", **{"llm.prompt_tokens": len(input_ids)}), accounting.timed("prefill_seconds"):
+                # Placeholder: Replace with the forward pass over ``input_ids`` that fills the KV cache
+                pass
+            with tracing.stage("llm.decode", **{"llm.max_length": kwargs.get("max_length") or 0}) as span, accounting.timed("decode_seconds"):
+                # Placeholder: Replace with actual token-by-token generation using ``options``
+                output_ids = f"Generated text based on prompt: {prompt}".split(" ")
+                span.set_attribute("llm.generated_tokens", len(output_ids))
+            with tracing.stage("llm.detokenize"):
+                # Placeholder: Replace with the tokenizer's decoding of ``output_ids``
+                return " ".join(output_ids)
         except Exception as e:
             self.logger.exception("Text generation failed")
             raise TextGenerationError(f"Error generating text: {str(e)}")
@@ -112,7 +227,9 @@ class ImageModelHandler(BaseModelHandler):
 
     async def generate_async(self, prompt: str, **kwargs) -> str:
         """Asynchronous generation using thread pool"""
-        return await self._executor.submit(self.generate, prompt, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._tracked(partial(self.generate, prompt, **kwargs))
+        )
 
     def generate(self, prompt: str, **kwargs) -> str:
         self.logger.info(f"Generating image with prompt: {prompt[:50]} at resolution {kwargs['resolution']}")
@@ -137,9 +254,10 @@ class ModelFactory:
             raise ModelConfigurationError(f"Unsupported model type: {model_config.model_type}")
 
 class LLMGenerate(LoggerMixin):
-    def __init__(self, model_factory: ModelFactory):
+    def __init__(self, model_factory: ModelFactory, response_cache: Optional["SemanticResponseCache"] = None):
         super().__init__()
         self.model_factory = model_factory
+        self.response_cache = response_cache
         self.model_config = ModelConfig(
             model_type=settings.MODEL_TYPE,
             model_name=settings.MODEL_NAME
@@ -147,16 +265,61 @@ class LLMGenerate(LoggerMixin):
         if not self.validate_model_configuration():
             raise ModelConfigurationError(f"Invalid model configuration: {settings.MODEL_NAME} for type {settings.MODEL_TYPE}")
         
-        self.handler = self.model_factory.get_handler(self.model_config) if settings.ENABLE_LLM_SERVICE else None
+        self._handlers: Dict[str, BaseModelHandler] = {}
+        self._tokenizers: Dict[str, TokenizerService] = {}
+        self._in_flight = 0
+        self._quality_samples: Set[asyncio.Task] = set()
+        self.handler = self._load_handler(self.model_config) if settings.ENABLE_LLM_SERVICE else None
+        self.router = self._build_router() if settings.MODEL_ROUTING_ENABLED else None
         self.logger.info(f"LLMGenerate initialized with model: {self.model_config.model_name}")
 
+    def _load_handler(self, model_config: ModelConfig) -> BaseModelHandler:
+        handler = self._handlers.get(model_config.model_name)
+        if handler is None:
+            handler = self.model_factory.get_handler(model_config)
+            self._handlers[model_config.model_name] = handler
+        return handler
+
+    def _build_router(self) -> Optional[ModelRouter]:
+        if self.model_config.model_type != ModelType.TEXT:
+            self.logger.warning("Model routing only applies to text models; routing disabled.")
+            return None
+        return ModelRouter(default_model=self.model_config.model_name)
+
+    def get_text_handler(self, model_name: str) -> BaseModelHandler:
+        """Return the handler for a text model, loading it on first use"""
+        if model_name == self.model_config.model_name and self.handler is not None:
+            return self.handler
+        return self._load_handler(ModelConfig(model_type=ModelType.TEXT, model_name=model_name))
+
+    @property
+    def serving_models(self) -> List[str]:
+        """Text models this service generates with: the configured one, routing targets and any already loaded"""
+        names = [self.model_config.model_name] + (self.router.models if self.router else []) + list(self._handlers)
+        return list(dict.fromkeys(names))
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of text generations currently in flight"""
+        return self._in_flight
+
+    def get_tokenizer(self, model_name: Optional[str] = None) -> TokenizerService:
+        """Cached tokenizer service for a text model, defaulting to the configured model"""
+        model_name = model_name or self.model_config.model_name
+        tokenizer = self._tokenizers.get(model_name)
+        if tokenizer is None:
+            handler = self.get_text_handler(model_name) if settings.ENABLE_LLM_SERVICE else None
+            tokenizer = TokenizerService.from_handler(handler, model_name=model_name)
+            self._tokenizers[model_name] = tokenizer
+        return tokenizer
+
     def validate_model_configuration(self) -> bool:
         """Validate that the configured model exists and is supported"""
         try:
             if self.model_config.model_type == "text":
-                return self.model_config.model_name in TextModelName.__members__
+                return self.model_config.model_name in TextModelName.list()
             elif self.model_config.model_type == "image":
-                return self.model_config.model_name in ImageModelName.__members__
+                return self.model_config.model_name in ImageModelName.list()
             return False
         except Exception as e:
             self.logger.error(f"Model configuration validation failed: {e}")
@@ -171,10 +334,26 @@ class LLMGenerate(LoggerMixin):
         if not self.validate_model_configuration():
             raise ModelConfigurationError(f"Invalid model configuration: {model_name} for type {model_type}")
         
-        self.handler = self.model_factory.get_handler(self.model_config) if settings.ENABLE_LLM_SERVICE else None
+        self.handler = self._load_handler(self.model_config) if settings.ENABLE_LLM_SERVICE else None
+        self.router = self._build_router() if settings.MODEL_ROUTING_ENABLED else None
         self.logger.info(f"Model configured to: {model_type} - {model_name}")
 
-    def generate_text(self, request: TextGenerationRequest) -> str:
+    def route_text(self, request: TextGenerationRequest) -> RouteDecision:
+        """Choose the model for a text request; the configured model when routing is off"""
+        with tracing.stage("llm.admission", **{"llm.queue_depth": self.queue_depth}) as span:
+            if self.router is None:
+                decision = RouteDecision(route=ModelRouter.DEFAULT_ROUTE, model_name=self.model_config.model_name)
+            else:
+                decision = self.router.route(
+                    prompt_tokens=self.get_tokenizer().count_tokens(request.prompt),
+                    max_length=request.max_length,
+                    tenant=request.tenant,
+                    queue_depth=self.queue_depth,
+                )
+            span.set_attributes({"llm.route": decision.route, "llm.model": decision.model_name})
+            return decision
+
+    def _check_text_service(self) -> Optional[str]:
         if not settings.ENABLE_LLM_SERVICE:
             self.logger.warning("LLM Service is disabled.")
             return "LLM Service is currently disabled."
@@ -182,16 +361,224 @@ class LLMGenerate(LoggerMixin):
         if self.model_config.model_type != ModelType.TEXT:
             self.logger.error("Configured model type is not 'text'")
             raise ModelConfigurationError("Configured model type is not 'text'")
-        
-        return self.handler.generate(prompt=request.prompt, max_length=request.max_length)
+        return None
 
-    def generate_image(self, request: ImageGenerationRequest) -> str:
+    @staticmethod
+    def _parameters_for(request: TextGenerationRequest, model_name: str) -> Dict[str, Any]:
+        return {**request.model_parameters.get(model_name, {}), **request.parameters}
+
+    def _record_route(self, decision: RouteDecision, started: float) -> None:
+        latency = time.perf_counter() - started
+        metrics.request_latency.record(latency, {"model": decision.model_name})
+        if self.router is not None:
+            self.router.record(decision, latency)
+
+    def _record_tokens(self, model_name: str, prompt: str, output: str) -> None:
+        tokenizer = self.get_tokenizer(model_name)
+        attributes = {"model": model_name}
+        prompt_tokens, completion_tokens = tokenizer.count_tokens(prompt), tokenizer.count_tokens(output)
+        metrics.prompt_tokens.add(prompt_tokens, attributes)
+        metrics.generated_tokens.add(completion_tokens, attributes)
+        accounting.update(
+            model=model_name,
+            precision=self.get_text_handler(model_name).resources.precision,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+
+    def _uses_cache(self, request: TextGenerationRequest) -> bool:
+        return self.response_cache is not None and request.cacheable
+
+    def _cache_namespace(self, request: TextGenerationRequest, decision: RouteDecision) -> Hashable:
+        return self.response_cache.namespace(
+            decision.model_name,
+            request.max_length,
+            self._parameters_for(request, decision.model_name),
+            tenant=request.tenant
+        )
+
+    async def _sample_cache_quality(self, hit: "CacheHit", request: TextGenerationRequest, decision: RouteDecision) -> None:
+        """Regenerate a sampled cache hit in the background and score the cached answer against it"""
+        # The task inherited the request's context; its cost is not the requester's
+        accounting.current_usage.set(None)
+        try:
+            fresh = await self.get_text_handler(decision.model_name).generate_async(
+                prompt=request.prompt,
+                max_length=request.max_length,
+                parameters=self._parameters_for(request, decision.model_name)
+            )
+            self.response_cache.record_quality(hit, fresh)
+        except Exception as e:
+            self.logger.warning(f"Semantic cache quality sample failed: {e}")
+
+    def generate_text(self, request: TextGenerationRequest) -> str:
+        disabled = self._check_text_service()
+        if disabled:
+            return disabled
+
+        decision = self.route_text(request)
+        if self._uses_cache(request):
+            with tracing.stage("cache.semantic_lookup") as span:
+                vector = self.response_cache.embed(request.prompt)
+                namespace = self._cache_namespace(request, decision)
+                hit = self.response_cache.lookup(vector, namespace)
+                span.set_attribute("cache.hit", hit is not None)
+            accounting.update(model=decision.model_name, cache="hit" if hit else "miss")
+            if hit:
+                return hit.response
+
+        started = time.perf_counter()
+        self._in_flight += 1
+        metrics.requests_in_flight.add(1)
+        try:
+            handler = self.get_text_handler(decision.model_name)
+            output = handler.generate(
+                prompt=request.prompt,
+                max_length=request.max_length,
+                parameters=self._parameters_for(request, decision.model_name)
+            )
+            if self.router and self.router.should_escalate(decision, handler.score_confidence(request.prompt, output)):
+                decision = self.router.escalate(decision)
+                accounting.update(escalated=True)
+                output = self.get_text_handler(decision.model_name).generate(
+                    prompt=request.prompt,
+                    max_length=request.max_length,
+                    parameters=self._parameters_for(request, decision.model_name)
+                )
+            self._record_tokens(decision.model_name, request.prompt, output)
+            if self._uses_cache(request):
+                self.response_cache.store(vector, namespace, request.prompt, output)
+            return output
+        finally:
+            self._in_flight -= 1
+            metrics.requests_in_flight.add(-1)
+            self._record_route(decision, started)
+
+    async def generate_text_async(self, request: TextGenerationRequest) -> str:
+        disabled = self._check_text_service()
+        if disabled:
+            return disabled
+
+        decision = self.route_text(request)
+        if self._uses_cache(request):
+            with tracing.stage("cache.semantic_lookup") as span:
+                vector = await asyncio.get_running_loop().run_in_executor(None, self.response_cache.embed, request.prompt)
+                namespace = self._cache_namespace(request, decision)
+                hit = self.response_cache.lookup(vector, namespace)
+                span.set_attribute("cache.hit", hit is not None)
+            accounting.update(model=decision.model_name, cache="hit" if hit else "miss")
+            if hit:
+                if hit.sampled:
+                    task = asyncio.create_task(self._sample_cache_quality(hit, request, decision))
+                    self._quality_samples.add(task)
+                    task.add_done_callback(self._quality_samples.discard)
+                return hit.response
+
+        started = time.perf_counter()
+        self._in_flight += 1
+        metrics.requests_in_flight.add(1)
+        try:
+            handler = self.get_text_handler(decision.model_name)
+            output = await handler.generate_async(
+                prompt=request.prompt,
+                max_length=request.max_length,
+                parameters=self._parameters_for(request, decision.model_name)
+            )
+            if self.router and self.router.should_escalate(decision, handler.score_confidence(request.prompt, output)):
+                decision = self.router.escalate(decision)
+                accounting.update(escalated=True)
+                output = await self.get_text_handler(decision.model_name).generate_async(
+                    prompt=request.prompt,
+                    max_length=request.max_length,
+                    parameters=self._parameters_for(request, decision.model_name)
+                )
+            self._record_tokens(decision.model_name, request.prompt, output)
+            if self._uses_cache(request):
+                self.response_cache.store(vector, namespace, request.prompt, output)
+            return output
+        finally:
+            self._in_flight -= 1
+            metrics.requests_in_flight.add(-1)
+            self._record_route(decision, started)
+
+    async def stream_text_async(
+        self,
+        request: TextGenerationRequest,
+        cancelled: Optional[threading.Event] = None
+    ) -> AsyncIterator[str]:
+        """Yield generated text as the model produces it.
+
+        Streams are routed and served from the semantic cache like
+        ``generate_text_async``, but never escalated: pieces already sent cannot
+        be taken back. Cancelled streams are not cached.
+        """
+        disabled = self._check_text_service()
+        if disabled:
+            yield disabled
+            return
+
+        decision = self.route_text(request)
+        if self._uses_cache(request):
+            with tracing.stage("cache.semantic_lookup") as span:
+                vector = await asyncio.get_running_loop().run_in_executor(None, self.response_cache.embed, request.prompt)
+                namespace = self._cache_namespace(request, decision)
+                hit = self.response_cache.lookup(vector, namespace)
+                span.set_attribute("cache.hit", hit is not None)
+            accounting.update(model=decision.model_name, cache="hit" if hit else "miss")
+            if hit:
+                yield hit.response
+                return
+
+        cancelled = cancelled or threading.Event()
+        started = time.perf_counter()
+        self._in_flight += 1
+        metrics.requests_in_flight.add(1)
+        try:
+            pieces = []
+            attributes = {"model": decision.model_name}
+            last_piece = started
+            async for piece in self.get_text_handler(decision.model_name).generate_stream_async(
+                request.prompt,
+                cancelled=cancelled,
+                max_length=request.max_length,
+                parameters=self._parameters_for(request, decision.model_name)
+            ):
+                now = time.perf_counter()
+                if pieces:
+                    metrics.inter_token_latency.record(now - last_piece, attributes)
+                else:
+                    metrics.time_to_first_token.record(now - started, attributes)
+                last_piece = now
+                pieces.append(piece)
+                yield piece
+            output = "".join(pieces)
+            self._record_tokens(decision.model_name, request.prompt, output)
+            if self._uses_cache(request) and not cancelled.is_set():
+                self.response_cache.store(vector, namespace, request.prompt, output)
+        finally:
+            self._in_flight -= 1
+            metrics.requests_in_flight.add(-1)
+            self._record_route(decision, started)
+
+    def _check_image_service(self) -> Optional[str]:
         if not settings.ENABLE_LLM_SERVICE:
             self.logger.warning("LLM Service is disabled.")
             return "LLM Service is currently disabled."
-        
+
         if self.model_config.model_type != ModelType.IMAGE:
             self.logger.error("Configured model type is not 'image'")
             raise ModelConfigurationError("Configured model type is not 'image'")
-        
+        return None
+
+    def generate_image(self, request: ImageGenerationRequest) -> str:
+        disabled = self._check_image_service()
+        if disabled:
+            return disabled
         return self.handler.generate(prompt=request.prompt, resolution=request.resolution)
+
+    async def generate_image_async(self, request: ImageGenerationRequest) -> str:
+        """``generate_image`` on the handler's thread pool, keeping the event loop free"""
+        disabled = self._check_image_service()
+        if disabled:
+            return disabled
+        return await self.handler.generate_async(prompt=request.prompt, resolution=request.resolution)
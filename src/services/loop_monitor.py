@@ -0,0 +1,126 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from src.services import metrics
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+class EventLoopMonitor(LoggerMixin):
+    """Measures event loop lag and captures what is blocking the loop when it stalls.
+
+    A task on the loop sleeps for ``interval`` and records how late it woke
+    up as ``event_loop.lag``. A watchdog thread checks when the task is due;
+    once it is ``threshold`` seconds overdue the loop thread's
+    stack is captured while the blocking call is still on it. Captures are
+    logged at most once per ``capture_interval`` and the most recent are
+    kept for ``stats``. With ``debug`` set, asyncio's debug mode also logs
+    every callback or task step that holds the loop longer than
+    ``threshold``, naming the coroutine; it is too slow for production.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        capture_interval: Optional[float] = None,
+        debug: Optional[bool] = None,
+        history: int = 10
+    ):
+        self.interval = interval if interval is not None else settings.LOOP_MONITOR_INTERVAL
+        self.threshold = threshold if threshold is not None else settings.LOOP_LAG_THRESHOLD
+        self.capture_interval = capture_interval if capture_interval is not None else settings.LOOP_STALL_CAPTURE_INTERVAL
+        self.debug = debug if debug is not None else settings.LOOP_MONITOR_DEBUG
+        self.captures: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.suppressed = 0
+        self._due = time.monotonic()
+        self._last_capture = float("-inf")
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._loop_thread = threading.get_ident()
+        self._due = time.monotonic() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.create_task(self.run())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join)
+
+    async def run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            self._due = expected
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.max_lag = max(self.max_lag, lag)
+            metrics.event_loop_lag.record(lag)
+
+    def _watch(self) -> None:
+        # Measured from when the task should have woken, so a stall counts after
+        # ``threshold`` rather than ``threshold`` plus the sleep, and polled often
+        # enough to see it before the loop recovers. One capture per stall: the
+        # task has to run and reschedule itself before the next
+        poll = min(self.interval, self.threshold / 2)
+        captured_at = None
+        while not self._stopped.wait(poll):
+            due = self._due
+            stalled = time.monotonic() - due
+            if stalled < self.threshold or due == captured_at:
+                continue
+            captured_at = due
+            self.stalls += 1
+            metrics.event_loop_stalls.add(1)
+            if time.monotonic() - self._last_capture < self.capture_interval:
+                self.suppressed += 1
+                continue
+            self._last_capture = time.monotonic()
+            self._capture(stalled)
+
+    def _capture(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame)
+        self.captures.appendleft({"at": time.time(), "stalled_seconds": round(stalled, 3), "stack": stack})
+        self.logger.warning(
+            f"Event loop blocked for {stalled:.3f}s, running:\n{''.join(stack)}"
+            + (f"({self.suppressed} stalls since the last capture were not captured)" if self.suppressed else "")
+        )
+        self.suppressed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        captures: List[Dict[str, Any]] = list(self.captures)
+        return {
+            "running": self._task is not None,
+            "debug": self.debug,
+            "threshold_seconds": self.threshold,
+            "max_lag_seconds": round(self.max_lag, 6),
+            "stalls": self.stalls,
+            "recent_captures": captures,
+        }
@@ -0,0 +1,113 @@
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+import os
+import time
+import weakref
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+# Instruments record nothing until setup_metrics installs a meter provider; durations are in seconds
+meter = metrics.get_meter("locallm")
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+TOKEN_GAP_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+DB_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+LOOP_LAG_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+queue_wait = meter.create_histogram(
+    "llm.queue_wait", unit="s", description="Time a generation waited for a model worker thread"
+)
+time_to_first_token = meter.create_histogram(
+    "llm.time_to_first_token", unit="s", description="Time from request to the first streamed piece"
+)
+inter_token_latency = meter.create_histogram(
+    "llm.inter_token_latency", unit="s", description="Gap between consecutive streamed pieces"
+)
+request_latency = meter.create_histogram(
+    "llm.request_latency", unit="s", description="Total time to serve a generation request"
+)
+prompt_tokens = meter.create_counter(
+    "llm.prompt_tokens", unit="{token}", description="Prompt tokens sent to models"
+)
+generated_tokens = meter.create_counter(
+    "llm.generated_tokens", unit="{token}", description="Tokens generated by models"
+)
+requests_in_flight = meter.create_up_down_counter(
+    "llm.requests_in_flight", unit="{request}", description="Generations currently running"
+)
+cache_requests = meter.create_counter(
+    "cache.requests", unit="{request}", description="Cache lookups by cache and result (hit or miss)"
+)
+db_operation_duration = meter.create_histogram(
+    "db.operation.duration", unit="s", description="Duration of DatabaseService operations"
+)
+event_loop_lag = meter.create_histogram(
+    "event_loop.lag", unit="s", description="How late the event loop ran a timer it was asked to run"
+)
+event_loop_stalls = meter.create_counter(
+    "event_loop.stalls", unit="{stall}", description="Times the event loop was blocked past the lag threshold"
+)
+
+# Applied as views by setup_metrics; the SDK defaults are sized for milliseconds
+HISTOGRAM_BUCKETS: Dict[str, list] = {
+    "llm.queue_wait": LATENCY_BUCKETS,
+    "llm.time_to_first_token": LATENCY_BUCKETS,
+    "llm.inter_token_latency": TOKEN_GAP_BUCKETS,
+    "llm.request_latency": LATENCY_BUCKETS,
+    "db.operation.duration": DB_BUCKETS,
+    "event_loop.lag": LOOP_LAG_BUCKETS,
+}
+
+# Model handlers report executor utilisation and memory through callbacks
+_handlers: "weakref.WeakSet" = weakref.WeakSet()
+
+def register_handler(handler: Any) -> None:
+    _handlers.add(handler)
+
+def _observe_executor_utilisation(options: CallbackOptions) -> Iterable[Observation]:
+    for handler in list(_handlers):
+        yield Observation(handler.busy_workers / handler.resources.cpu_threads, handler.metric_attributes)
+
+def _observe_model_memory(options: CallbackOptions) -> Iterable[Observation]:
+    for handler in list(_handlers):
+        yield Observation(handler.resident_memory_bytes(), handler.metric_attributes)
+
+def _observe_process_memory(options: CallbackOptions) -> Iterable[Observation]:
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return
+    yield Observation(resident_pages * os.sysconf("SC_PAGE_SIZE"))
+
+meter.create_observable_gauge(
+    "llm.executor.utilization", callbacks=[_observe_executor_utilisation], unit="1",
+    description="Fraction of a model's worker threads that are busy"
+)
+meter.create_observable_gauge(
+    "llm.model.resident_memory", callbacks=[_observe_model_memory], unit="By",
+    description="Memory held by a loaded model's weights"
+)
+meter.create_observable_gauge(
+    "process.resident_memory", callbacks=[_observe_process_memory], unit="By",
+    description="Resident set size of the server process"
+)
+
+def cache_result(cache: str, hit: bool) -> None:
+    cache_requests.add(1, {"cache": cache, "result": "hit" if hit else "miss"})
+
+def timed(histogram, attributes: Optional[Dict[str, str]] = None) -> Callable:
+    """Record how long an async function takes; ``operation`` defaults to its name"""
+    def decorator(func: Callable) -> Callable:
+        labels = {"operation": func.__name__, **(attributes or {})}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter() - started, labels)
+        return wrapper
+    return decorator
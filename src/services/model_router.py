@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import threading
+
+from src.models.enum import TextModelName
+from websrc.api.exceptions.exceptions import ModelConfigurationError
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+@dataclass
+class RoutingRule:
+    """A single routing rule. Every condition that is set must hold for the rule to match."""
+    name: str
+    model_name: str
+    max_prompt_tokens: Optional[int] = None
+    max_length: Optional[int] = None
+    tenants: Optional[List[str]] = None
+    min_queue_depth: Optional[int] = None
+    escalate_to: Optional[str] = None
+
+    def matches(self, prompt_tokens: int, max_length: int, tenant: Optional[str], queue_depth: int) -> bool:
+        if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+            return False
+        if self.max_length is not None and max_length > self.max_length:
+            return False
+        if self.tenants is not None and tenant not in self.tenants:
+            return False
+        if self.min_queue_depth is not None and queue_depth < self.min_queue_depth:
+            return False
+        return True
+
+@dataclass
+class RouteDecision:
+    """The model chosen for a request and why"""
+    route: str
+    model_name: str
+    escalate_to: Optional[str] = None
+    escalated: bool = False
+
+@dataclass
+class RouteStats:
+    """Running latency statistics for a single route"""
+    requests: int = 0
+    escalations: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "escalations": self.escalations,
+            "avg_latency": self.total_latency / self.requests if self.requests else 0.0,
+            "max_latency": self.max_latency,
+            "last_latency": self.last_latency,
+        }
+
+class ModelRouter(LoggerMixin):
+    """Pick a text model per request from an ordered list of rules"""
+    DEFAULT_ROUTE = "default"
+
+    def __init__(
+        self,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        default_model: Optional[str] = None,
+        confidence_threshold: Optional[float] = None,
+    ):
+        self.default_model = default_model or settings.MODEL_NAME
+        self.confidence_threshold = (
+            confidence_threshold if confidence_threshold is not None
+            else settings.MODEL_ROUTING_CONFIDENCE_THRESHOLD
+        )
+        raw_rules = rules if rules is not None else settings.MODEL_ROUTING_RULES
+        self.rules = [self._parse_rule(index, rule) for index, rule in enumerate(raw_rules)]
+        self._stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def _parse_rule(self, index: int, rule: Dict[str, Any]) -> RoutingRule:
+        try:
+            parsed = RoutingRule(**{"name": f"rule-{index}", **rule})
+        except TypeError as e:
+            raise ModelConfigurationError(f"Invalid routing rule {rule}: {e}")
+        for model_name in filter(None, (parsed.model_name, parsed.escalate_to)):
+            if model_name not in TextModelName.list():
+                raise ModelConfigurationError(f"Routing rule '{parsed.name}' references unknown text model: {model_name}")
+        return parsed
+
+    @property
+    def models(self) -> List[str]:
+        """Every model the router can send traffic to"""
+        names = [self.default_model]
+        for rule in self.rules:
+            names.extend(filter(None, (rule.model_name, rule.escalate_to)))
+        return list(dict.fromkeys(names))
+
+    def route(
+        self,
+        prompt_tokens: int,
+        max_length: int,
+        tenant: Optional[str] = None,
+        queue_depth: int = 0,
+    ) -> RouteDecision:
+        for rule in self.rules:
+            if rule.matches(prompt_tokens, max_length, tenant, queue_depth):
+                decision = RouteDecision(route=rule.name, model_name=rule.model_name, escalate_to=rule.escalate_to)
+                break
+        else:
+            decision = RouteDecision(route=self.DEFAULT_ROUTE, model_name=self.default_model)
+
+        self.logger.debug(
+            f"Routed request to {decision.model_name} via '{decision.route}' "
+            f"(prompt_tokens={prompt_tokens}, max_length={max_length}, tenant={tenant}, queue_depth={queue_depth})"
+        )
+        return decision
+
+    def should_escalate(self, decision: RouteDecision, confidence: Optional[float]) -> bool:
+        """Escalate only when the route allows it and the small model reported low confidence"""
+        return (
+            decision.escalate_to is not None
+            and not decision.escalated
+            and confidence is not None
+            and confidence < self.confidence_threshold
+        )
+
+    def escalate(self, decision: RouteDecision) -> RouteDecision:
+        with self._lock:
+            self._stats.setdefault(decision.route, RouteStats()).escalations += 1
+        self.logger.info(f"Escalating route '{decision.route}' from {decision.model_name} to {decision.escalate_to}")
+        return RouteDecision(route=decision.route, model_name=decision.escalate_to, escalated=True)
+
+    def record(self, decision: RouteDecision, latency: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(decision.route, RouteStats())
+            stats.requests += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.last_latency = latency
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {route: stats.as_dict() for route, stats in self._stats.items()}
@@ -0,0 +1,231 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+import uuid
+
+from websrc.api.exceptions.exceptions import ProfilingError
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+# Route of the profiled request being handled; None outside a profiling session
+current_route: ContextVar[Optional[str]] = ContextVar("profiled_route", default=None)
+
+@dataclass
+class ProfileSession:
+    """Collapsed stacks sampled during one profiling session"""
+    id: str
+    requests: Optional[int]
+    deadline: float
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    claimed: int = 0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    routes: Counter = field(default_factory=Counter)
+    models: Counter = field(default_factory=Counter)
+    path: Optional[str] = None
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;... count`` line per stack, as read by flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "requests": self.requests,
+            "profiled_requests": self.claimed,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "routes": dict(self.routes),
+            "models": dict(self.models),
+            "path": self.path,
+        }
+
+class RequestProfiler(LoggerMixin):
+    """Statistical sampling profiler armed on demand for the next N requests or a time window.
+
+    A sampler thread reads the stacks of the event loop thread and of model
+    executor threads working for profiled requests every ``interval``
+    seconds and counts them as collapsed stacks. Event loop stacks are
+    rooted at the profiled route when only one is in flight; executor
+    stacks at the route and model they serve. In request mode sampling only
+    happens while a profiled request is in flight, and every session ends
+    after ``max_seconds`` at the latest. Nothing runs between sessions
+    beyond an ``active`` check per request.
+    """
+
+    MAX_DEPTH = 128
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        history: int = 10
+    ):
+        self.interval = interval if interval is not None else settings.PROFILING_INTERVAL
+        self.max_seconds = max_seconds if max_seconds is not None else settings.PROFILING_MAX_SECONDS
+        self.max_requests = max_requests if max_requests is not None else settings.PROFILING_MAX_REQUESTS
+        self.output_dir = output_dir if output_dir is not None else settings.PROFILING_OUTPUT_DIR
+        self.session: Optional[ProfileSession] = None
+        self.finished: Deque[ProfileSession] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread: Optional[int] = None
+        self._in_flight: Counter = Counter()
+        # Executor thread id -> (route, model) while it works for a profiled request
+        self._thread_tags: Dict[int, Tuple[str, str]] = {}
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None
+
+    def start(self, requests: Optional[int] = None, seconds: Optional[float] = None) -> ProfileSession:
+        """Profile the next ``requests`` requests, or every request for ``seconds``; call from the event loop"""
+        if (requests is None) == (seconds is None):
+            raise ProfilingError("Give either a number of requests or a number of seconds")
+        if requests is not None and not 0 < requests <= self.max_requests:
+            raise ProfilingError(f"requests must be between 1 and {self.max_requests}")
+        if seconds is not None and not 0 < seconds <= self.max_seconds:
+            raise ProfilingError(f"seconds must be between 0 and {self.max_seconds}")
+        with self._lock:
+            if self.session is not None:
+                raise ProfilingError(f"Profiling session {self.session.id} is already running", code=409)
+            self.session = ProfileSession(
+                id=uuid.uuid4().hex[:12],
+                requests=requests,
+                deadline=time.monotonic() + (seconds if seconds is not None else self.max_seconds)
+            )
+            session = self.session
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Started profiling session {session.id} ({requests or seconds} {'requests' if requests else 'seconds'})")
+        return session
+
+    def stop(self) -> Optional[ProfileSession]:
+        """End the running session early; its samples are kept"""
+        with self._lock:
+            session = self.session
+        if session is None:
+            return None
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        return session
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        for session in [self.session, *self.finished]:
+            if session is not None and session.id == session_id:
+                return session
+        return None
+
+    @contextmanager
+    def request(self, route: str) -> Iterator[bool]:
+        """Mark a request as profiled if the session still has room for it; yields whether it was"""
+        with self._lock:
+            session = self.session
+            claimed = session is not None and (session.requests is None or session.claimed < session.requests)
+            if claimed:
+                session.claimed += 1
+                session.routes[route] += 1
+                self._in_flight[route] += 1
+        if not claimed:
+            yield False
+            return
+        token = current_route.set(route)
+        try:
+            yield True
+        finally:
+            current_route.reset(token)
+            with self._lock:
+                self._in_flight[route] -= 1
+                if not self._in_flight[route]:
+                    del self._in_flight[route]
+                finished = session.requests is not None and session.claimed >= session.requests
+                if finished and not self._in_flight and self.session is session:
+                    self._stopped.set()
+
+    @contextmanager
+    def executor_work(self, route: Optional[str], model: str) -> Iterator[None]:
+        """Attribute the current executor thread's stacks to ``route`` and ``model`` while it works"""
+        if route is None or self.session is None:
+            yield
+            return
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._thread_tags[thread_id] = (route, model)
+            if self.session is not None:
+                self.session.models[model] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._thread_tags.pop(thread_id, None)
+
+    def _sample_loop(self) -> None:
+        session = self.session
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            if time.monotonic() >= session.deadline:
+                break
+            with self._lock:
+                idle = session.requests is not None and not self._in_flight
+                routes = list(self._in_flight)
+                tags = dict(self._thread_tags)
+            if idle:
+                continue
+            loop_root = f"route={routes[0]}" if len(routes) == 1 else "route=*"
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if thread_id == self._loop_thread:
+                    root = f"{loop_root};event-loop"
+                elif thread_id in tags:
+                    route, model = tags[thread_id]
+                    root = f"route={route};model={model};executor"
+                else:
+                    continue
+                session.stacks[f"{root};{self._collapse(frame)}"] += 1
+            session.samples += 1
+        self._finish(session)
+
+    def _collapse(self, frame) -> str:
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.MAX_DEPTH:
+            code = frame.f_code
+            filename = "/".join(code.co_filename.rsplit(os.sep, 2)[-2:])
+            frames.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+    def _finish(self, session: ProfileSession) -> None:
+        session.finished_at = time.time()
+        if self.output_dir:
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                session.path = os.path.join(self.output_dir, f"profile-{session.id}.collapsed")
+                with open(session.path, "w") as f:
+                    f.write(session.collapsed())
+            except OSError as e:
+                session.path = None
+                self.logger.error(f"Could not write profile {session.id}: {e}")
+        with self._lock:
+            self.finished.appendleft(session)
+            self.session = None
+            self._thread_tags.clear()
+        self.logger.info(f"Finished profiling session {session.id}: {session.samples} samples, {session.claimed} requests")
+
+# Shared by the middleware, the admin routes and model executor threads
+profiler = RequestProfiler()
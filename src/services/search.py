@@ -0,0 +1,191 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models.database import Conversation, Message, MessageEmbedding
+from src.services.embeddings import EmbeddingService
+from src.services.vector_index import VectorIndex
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+class MessageSearchIndex(LoggerMixin):
+    """Semantic search over a user's messages.
+
+    A background job embeds new user and assistant messages in batches and
+    stores float16 vectors in ``message_embeddings``. Each user's vectors are
+    loaded on first search into a ``VectorIndex`` kept in an LRU of
+    ``SEARCH_MAX_LOADED_USERS`` users, which the job then keeps up to date.
+    """
+
+    EMBEDDED_ROLES = ("user", "assistant")
+
+    def __init__(self, session_factory, embedder: EmbeddingService):
+        self.session_factory = session_factory
+        self.embedder = embedder
+        self.batch_size = settings.SEARCH_EMBEDDING_BATCH_SIZE
+        self.interval = settings.SEARCH_EMBEDDING_INTERVAL
+        self.rescan_window = settings.SEARCH_RESCAN_WINDOW
+        self.max_loaded_users = settings.SEARCH_MAX_LOADED_USERS
+        self._indexes: "OrderedDict[int, VectorIndex]" = OrderedDict()
+        self._loads: Dict[int, asyncio.Task] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._cursor: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            self.logger.info(f"Message embedding scheduled every {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                # Keep going without sleeping while there is a backlog
+                while await self.run_once() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Message embedding pass failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Embed one batch of messages that have no vector yet; returns how many were embedded"""
+        async with self.session_factory() as session:
+            if self._cursor is None:
+                self._cursor = await session.scalar(select(func.coalesce(func.max(MessageEmbedding.message_id), 0)))
+            # Ids are assigned before commit, so rows can appear behind the cursor; rescan a window
+            rows = (await session.execute(
+                select(Message.id, Message.conversation_id, Message.content, Message.created_at, Conversation.user_id)
+                .join(Conversation, Conversation.id == Message.conversation_id)
+                .outerjoin(MessageEmbedding, MessageEmbedding.message_id == Message.id)
+                .where(Message.id > max(0, self._cursor - self.rescan_window))
+                .where(MessageEmbedding.message_id.is_(None))
+                .where(Message.role.in_(self.EMBEDDED_ROLES))
+                .order_by(Message.id)
+                .limit(self.batch_size)
+            )).all()
+            if not rows:
+                return 0
+
+            vectors = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.embedder.embed, [row.content for row in rows]
+            )
+            await session.execute(
+                insert(MessageEmbedding).on_conflict_do_nothing(),
+                [
+                    {
+                        "message_id": row.id,
+                        "user_id": row.user_id,
+                        "conversation_id": row.conversation_id,
+                        "snippet": row.content[:200],
+                        "vector": self.embedder.to_bytes(vector),
+                        "created_at": row.created_at,
+                    }
+                    for row, vector in zip(rows, vectors)
+                ]
+            )
+            await session.commit()
+        self._cursor = max(self._cursor, rows[-1].id)
+
+        by_user: Dict[int, List[int]] = {}
+        for position, row in enumerate(rows):
+            by_user.setdefault(row.user_id, []).append(position)
+        for user_id, positions in by_user.items():
+            if user_id in self._loads:
+                await self._loads[user_id]
+            index = self._indexes.get(user_id)
+            if index is not None:
+                index.add([rows[p].id for p in positions], vectors[positions])
+                await self._train_if_needed(index)
+        return len(rows)
+
+    async def _train_if_needed(self, index: VectorIndex) -> None:
+        if index.needs_training:
+            await asyncio.get_running_loop().run_in_executor(self._executor, index.train)
+
+    async def _load_index(self, user_id: int) -> VectorIndex:
+        index = VectorIndex(
+            self.embedder.dim,
+            ann_threshold=settings.SEARCH_ANN_THRESHOLD,
+            nprobe=settings.SEARCH_NPROBE
+        )
+        async with self.session_factory() as session:
+            result = await session.stream(
+                select(MessageEmbedding.message_id, MessageEmbedding.vector)
+                .where(MessageEmbedding.user_id == user_id)
+                .execution_options(yield_per=10000)
+            )
+            async for rows in result.partitions():
+                index.add(
+                    [row.message_id for row in rows],
+                    [self.embedder.from_bytes(row.vector) for row in rows]
+                )
+        await self._train_if_needed(index)
+        self._indexes[user_id] = index
+        while len(self._indexes) > self.max_loaded_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    async def index_for(self, user_id: int) -> VectorIndex:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+            return index
+        # Concurrent first searches share one load
+        if user_id not in self._loads:
+            self._loads[user_id] = asyncio.create_task(self._load_index(user_id))
+        try:
+            return await asyncio.shield(self._loads[user_id])
+        finally:
+            if user_id in self._loads and self._loads[user_id].done():
+                del self._loads[user_id]
+
+    async def search(self, user_id: int, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """The user's messages most similar to ``query``, best first"""
+        index = await self.index_for(user_id)
+        vector = await asyncio.get_running_loop().run_in_executor(None, self.embedder.embed_one, query)
+        hits = index.search(vector, limit)
+        if not hits:
+            return []
+        async with self.session_factory() as session:
+            rows = {
+                row.message_id: row
+                for row in await session.execute(
+                    select(
+                        MessageEmbedding.message_id,
+                        MessageEmbedding.conversation_id,
+                        MessageEmbedding.snippet,
+                        MessageEmbedding.created_at,
+                        Conversation.title
+                    )
+                    .join(Conversation, Conversation.id == MessageEmbedding.conversation_id)
+                    .where(MessageEmbedding.message_id.in_([message_id for message_id, _ in hits]))
+                )
+            }
+        return [
+            {
+                "message_id": message_id,
+                "conversation_id": rows[message_id].conversation_id,
+                "conversation_title": rows[message_id].title,
+                "snippet": rows[message_id].snippet,
+                "created_at": rows[message_id].created_at,
+                "score": round(score, 4),
+            }
+            for message_id, score in hits
+            if message_id in rows
+        ]
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+import itertools
+import json
+import random
+import threading
+import time
+
+import numpy as np
+
+from src.services import metrics
+from src.services.embeddings import EmbeddingService
+from src.services.vector_index import VectorIndex
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+@dataclass
+class CachedResponse:
+    namespace: Hashable
+    prompt: str
+    response: str
+    created_at: float
+    hits: int = 0
+
+@dataclass
+class CacheHit:
+    entry_id: int
+    response: str
+    similarity: float
+    sampled: bool
+
+class SemanticResponseCache(LoggerMixin):
+    """Serves stored answers for prompts that are near-duplicates of earlier ones.
+
+    Prompts are embedded and looked up among cached prompts of the same
+    namespace (tenant, model, parameters and length limit), so answers are
+    never shared between tenants. A match at or above
+    ``threshold`` cosine similarity is a hit. Entries expire after ``ttl``
+    seconds and the least recently used are evicted past ``size``.
+
+    A ``sample_rate`` fraction of hits is flagged for the caller to regenerate
+    and pass to ``record_quality``, which tracks how close cached answers are
+    to fresh ones.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingService,
+        threshold: Optional[float] = None,
+        size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sample_rate: Optional[float] = None
+    ):
+        self.embedder = embedder
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.size = size or settings.SEMANTIC_CACHE_SIZE
+        self.ttl = ttl or settings.SEMANTIC_CACHE_TTL
+        self.sample_rate = sample_rate if sample_rate is not None else settings.SEMANTIC_CACHE_SAMPLE_RATE
+        self._entries: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        self._indexes: Dict[Hashable, VectorIndex] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "expired": 0, "evicted": 0, "sampled": 0}
+        self._agreement_sum = 0.0
+        self._disagreements = 0
+
+    @staticmethod
+    def namespace(
+        model_name: str,
+        max_length: int,
+        parameters: Dict[str, Any],
+        tenant: Optional[str] = None
+    ) -> Hashable:
+        return (tenant, model_name, max_length, json.dumps(parameters, sort_keys=True, default=str))
+
+    def embed(self, prompt: str) -> np.ndarray:
+        return self.embedder.embed_one(prompt)
+
+    def _drop(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        index = self._indexes[entry.namespace]
+        index.remove([entry_id])
+        if not len(index):
+            del self._indexes[entry.namespace]
+
+    def lookup(self, vector: np.ndarray, namespace: Hashable) -> Optional[CacheHit]:
+        with self._lock:
+            self._stats["lookups"] += 1
+            hit = self._lookup(vector, namespace)
+        metrics.cache_result("semantic", hit is not None)
+        return hit
+
+    def _lookup(self, vector: np.ndarray, namespace: Hashable) -> Optional[CacheHit]:
+        index = self._indexes.get(namespace)
+        if index is None:
+            return None
+        now = time.monotonic()
+        for entry_id, similarity in index.search(vector, 4):
+            if similarity < self.threshold:
+                break
+            entry = self._entries[entry_id]
+            if now - entry.created_at > self.ttl:
+                self._drop(entry_id)
+                self._stats["expired"] += 1
+                continue
+            self._entries.move_to_end(entry_id)
+            entry.hits += 1
+            self._stats["hits"] += 1
+            sampled = random.random() < self.sample_rate
+            return CacheHit(entry_id=entry_id, response=entry.response, similarity=similarity, sampled=sampled)
+        return None
+
+    def store(self, vector: np.ndarray, namespace: Hashable, prompt: str, response: str) -> None:
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = CachedResponse(
+                namespace=namespace, prompt=prompt, response=response, created_at=time.monotonic()
+            )
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = self._indexes[namespace] = VectorIndex(self.embedder.dim)
+            index.add([entry_id], vector[np.newaxis])
+            while len(self._entries) > self.size:
+                self._drop(next(iter(self._entries)))
+                self._stats["evicted"] += 1
+
+    def record_quality(self, hit: CacheHit, fresh_response: str) -> float:
+        """Compare a sampled hit with a freshly generated answer; returns their similarity"""
+        cached, fresh = self.embedder.embed([hit.response, fresh_response])
+        agreement = float(cached @ fresh)
+        with self._lock:
+            self._stats["sampled"] += 1
+            self._agreement_sum += agreement
+            if agreement < self.threshold:
+                self._disagreements += 1
+        if agreement < self.threshold:
+            self.logger.info(
+                f"Semantic cache hit diverged from a fresh answer (prompt similarity {hit.similarity:.3f}, "
+                f"answer similarity {agreement:.3f})"
+            )
+        return agreement
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups, sampled = self._stats["lookups"], self._stats["sampled"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_size": self.size,
+                "threshold": self.threshold,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "sampled_agreement": round(self._agreement_sum / sampled, 4) if sampled else None,
+                "sampled_disagreement_rate": round(self._disagreements / sampled, 4) if sampled else None,
+            }
@@ -0,0 +1,73 @@
+from typing import Any, Iterator, Tuple
+import time
+
+from src.models.pydantic import ModelConfig
+from src.models.enum import ModelType
+from src.services.llm_generate import BaseModelHandler, ImageModelHandler, ModelFactory, TextModelHandler
+
+class StubTextHandler(TextModelHandler):
+    """A deterministic stand-in for a text model with a fixed cost per token.
+
+    The reply to a prompt is always the same ``output_tokens`` words (capped
+    by ``max_length``). Prefill sleeps ``prefill_latency`` per prompt word and
+    decode sleeps ``token_latency`` per generated word, releasing the GIL the
+    way native inference does, so benchmarks measure the server around the
+    model rather than the model.
+    """
+
+    def __init__(self, model_config: ModelConfig, token_latency: float, prefill_latency: float, output_tokens: int):
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self.output_tokens = output_tokens
+        super().__init__(model_config)
+
+    def load_model(self) -> Tuple[Any, Any]:
+        return None, None
+
+    def _reply(self, prompt: str, max_length: int) -> Iterator[str]:
+        words = prompt.split()
+        time.sleep(self.prefill_latency * len(words))
+        for i in range(min(self.output_tokens, max_length)):
+            time.sleep(self.token_latency)
+            yield f"{words[i % len(words)] if words else 'token'}{i} "
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        return "".join(self._reply(prompt, kwargs.get("max_length") or self.output_tokens))
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        yield from self._reply(prompt, kwargs.get("max_length") or self.output_tokens)
+
+class StubImageHandler(ImageModelHandler):
+    """A stand-in for an image model that takes ``image_latency`` seconds per image"""
+
+    def __init__(self, model_config: ModelConfig, image_latency: float):
+        self.image_latency = image_latency
+        super().__init__(model_config)
+
+    def load_model(self) -> Tuple[Any, Any]:
+        return None, None
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        time.sleep(self.image_latency)
+        return f"https://placehold.co/{kwargs['resolution']}/png"
+
+class StubModelFactory(ModelFactory):
+    """Builds stub handlers for every model, for load tests without model weights"""
+
+    def __init__(
+        self,
+        token_latency: float = 0.005,
+        prefill_latency: float = 0.0002,
+        output_tokens: int = 64,
+        image_latency: float = 0.5
+    ):
+        super().__init__()
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self.output_tokens = output_tokens
+        self.image_latency = image_latency
+
+    def get_handler(self, model_config: ModelConfig) -> BaseModelHandler:
+        if model_config.model_type == ModelType.IMAGE:
+            return StubImageHandler(model_config, self.image_latency)
+        return StubTextHandler(model_config, self.token_latency, self.prefill_latency, self.output_tokens)
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import re
+import threading
+import zlib
+
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+_FALLBACK_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_FALLBACK_VOCAB_SIZE = 50257
+
+class TokenizerService(LoggerMixin):
+    """Token ids and counts for a model, with an LRU cache of already tokenized text.
+
+    Wraps the tokenizer loaded by a ``BaseModelHandler``. Handlers that have no
+    tokenizer yet fall back to a deterministic word/punctuation split so token
+    counts stay stable across layers.
+    """
+
+    def __init__(self, tokenizer: Any = None, model_name: Optional[str] = None, cache_size: Optional[int] = None):
+        self.tokenizer = tokenizer
+        self.model_name = model_name
+        self.cache_size = cache_size if cache_size is not None else settings.TOKENIZER_CACHE_SIZE
+        self._cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_handler(cls, handler: Any, model_name: Optional[str] = None) -> "TokenizerService":
+        name = model_name or getattr(getattr(handler, "model_config", None), "model_name", None)
+        return cls(tokenizer=getattr(handler, "tokenizer", None), model_name=name)
+
+    def _lookup(self, text: str) -> Optional[List[int]]:
+        with self._lock:
+            ids = self._cache.get(text)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(text)
+            self.hits += 1
+            return ids
+
+    def _store(self, text: str, ids: List[int]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[text] = ids
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _encode_uncached(self, texts: Sequence[str]) -> List[List[int]]:
+        if self.tokenizer is None:
+            return [
+                [zlib.crc32(piece.encode("utf-8")) % _FALLBACK_VOCAB_SIZE for piece in _FALLBACK_PATTERN.findall(text)]
+                for text in texts
+            ]
+        if callable(self.tokenizer):
+            return list(self.tokenizer(list(texts), add_special_tokens=False)["input_ids"])
+        return [self.tokenizer.encode(text, add_special_tokens=False) for text in texts]
+
+    def encode(self, text: str, prefix: Optional[str] = None) -> List[int]:
+        """Token ids for ``text``; a ``prefix`` such as a system prompt is cached on its own"""
+        if prefix:
+            return self.encode(prefix) + self.encode(text)
+        ids = self._lookup(text)
+        if ids is None:
+            ids = self._encode_uncached([text])[0]
+            self._store(text, ids)
+        return ids
+
+    def encode_batch(self, texts: Sequence[str], prefix: Optional[str] = None) -> List[List[int]]:
+        """Token ids for many texts, sending only cache misses to the tokenizer in one call"""
+        results: List[Optional[List[int]]] = [self._lookup(text) for text in texts]
+        missing = list(dict.fromkeys(text for text, ids in zip(texts, results) if ids is None))
+        if missing:
+            encoded = dict(zip(missing, self._encode_uncached(missing)))
+            for text, ids in encoded.items():
+                self._store(text, ids)
+            results = [ids if ids is not None else encoded[text] for text, ids in zip(texts, results)]
+        if prefix:
+            prefix_ids = self.encode(prefix)
+            return [prefix_ids + ids for ids in results]
+        return results
+
+    def count_tokens(self, text: str, prefix: Optional[str] = None) -> int:
+        return len(self.encode(text, prefix=prefix))
+
+    def count_tokens_batch(self, texts: Sequence[str], prefix: Optional[str] = None) -> List[int]:
+        return [len(ids) for ids in self.encode_batch(texts, prefix=prefix)]
+
+    def cache_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
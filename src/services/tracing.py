@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import threading
+import time
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.trace import Span, StatusCode
+
+tracer = trace.get_tracer("locallm")
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[Span]:
+    """A child span for one stage of request handling"""
+    with tracer.start_as_current_span(name, attributes=attributes or None) as span:
+        yield span
+
+def traced(name: str) -> Callable:
+    """Run an async function inside a span, like ``stage`` for a whole call"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """Holds each trace's spans until its local root ends, then keeps or drops the trace.
+
+    A trace is exported if its trace id falls in the ``head_rate`` fraction,
+    if the root took at least ``slow_threshold`` seconds, or if any span
+    failed. Memory is bounded by ``max_traces`` buffered traces and
+    ``max_spans_per_trace``; overflow is dropped and counted. ``stats``
+    reports what was kept and the processor's own cost per span.
+    """
+
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        head_rate: float,
+        slow_threshold: float,
+        max_traces: int = 2048,
+        max_spans_per_trace: int = 256
+    ):
+        self.delegate = delegate
+        self.head_bound = int(head_rate * (1 << 64))
+        self.slow_threshold_ns = int(slow_threshold * 1e9)
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._buffers: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._failed: set = set()
+        # Spans that end after their root follow the root's decision
+        self._decisions: "OrderedDict[int, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "spans": 0, "traces_kept": 0, "traces_dropped": 0,
+            "kept_head": 0, "kept_slow": 0, "kept_error": 0,
+            "spans_overflowed": 0, "traces_evicted": 0,
+        }
+        self._processing_ns = 0
+
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def _is_head_sampled(self, trace_id: int) -> bool:
+        return (trace_id & ((1 << 64) - 1)) < self.head_bound
+
+    def on_end(self, span: ReadableSpan) -> None:
+        started = time.perf_counter_ns()
+        trace_id = span.context.trace_id
+        is_root = span.parent is None or span.parent.is_remote
+        export: List[ReadableSpan] = []
+        with self._lock:
+            self._stats["spans"] += 1
+            if span.status.status_code == StatusCode.ERROR:
+                self._failed.add(trace_id)
+            decision = self._decisions.get(trace_id)
+            if decision is not None:
+                export = [span] if decision else []
+            elif is_root:
+                spans = self._buffers.pop(trace_id, [])
+                spans.append(span)
+                keep = self._decide(trace_id, span)
+                self._decisions[trace_id] = keep
+                while len(self._decisions) > self.max_traces:
+                    self._decisions.popitem(last=False)
+                export = spans if keep else []
+            else:
+                spans = self._buffers.get(trace_id)
+                if spans is None:
+                    spans = self._buffers[trace_id] = []
+                    while len(self._buffers) > self.max_traces:
+                        evicted, _ = self._buffers.popitem(last=False)
+                        self._failed.discard(evicted)
+                        self._stats["traces_evicted"] += 1
+                if len(spans) < self.max_spans_per_trace:
+                    spans.append(span)
+                else:
+                    self._stats["spans_overflowed"] += 1
+        for kept in export:
+            self.delegate.on_end(kept)
+        with self._lock:
+            self._processing_ns += time.perf_counter_ns() - started
+
+    def _decide(self, trace_id: int, root: ReadableSpan) -> bool:
+        failed = trace_id in self._failed
+        self._failed.discard(trace_id)
+        if self._is_head_sampled(trace_id):
+            reason = "kept_head"
+        elif failed:
+            reason = "kept_error"
+        elif root.end_time - root.start_time >= self.slow_threshold_ns:
+            reason = "kept_slow"
+        else:
+            self._stats["traces_dropped"] += 1
+            return False
+        self._stats[reason] += 1
+        self._stats["traces_kept"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = self._stats["spans"]
+            return {
+                **self._stats,
+                "buffered_traces": len(self._buffers),
+                "processing_us_per_span": round(self._processing_ns / spans / 1000, 3) if spans else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.delegate.force_flush(timeout_millis)
@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+import gzip
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import shutil
+
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+PROMPT_FIELDS = ("prompt", "content")
+# String values worth keeping; every other string may carry user text
+SHAPE_FIELDS = ("resolution", "model_type", "model_name")
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+class TrafficRecorder(LoggerMixin):
+    """Appends anonymised request shapes to a rotating NDJSON capture file.
+
+    Each line holds the arrival time, route template, status, latency, the
+    prompt's token count, its body encoding and the numeric parameters. The
+    prompt itself is never written; with ``hash_prompts`` a salted hash of it
+    is, so repeated prompts can be recognised. Writes go through a queue to a
+    background thread, and rotated files are gzipped.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+        sample_rate: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        backups: Optional[int] = None,
+        hash_prompts: Optional[bool] = None,
+        salt: Optional[str] = None
+    ):
+        self.path = path or settings.CAPTURE_FILE
+        self.token_counter = token_counter or (lambda text: len(text.split()))
+        self.sample_rate = sample_rate if sample_rate is not None else settings.CAPTURE_SAMPLE_RATE
+        self.hash_prompts = hash_prompts if hash_prompts is not None else settings.CAPTURE_HASH_PROMPTS
+        # Without a configured salt hashes only match within one process
+        self.salt = (salt if salt is not None else settings.CAPTURE_SALT).encode()[:64] or os.urandom(16)
+        handler = logging.handlers.RotatingFileHandler(
+            self.path,
+            maxBytes=max_bytes if max_bytes is not None else settings.CAPTURE_MAX_BYTES,
+            backupCount=backups if backups is not None else settings.CAPTURE_BACKUPS
+        )
+        handler.namer = lambda name: f"{name}.gz"
+        handler.rotator = _gzip_rotator
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._handler = handler
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _parse(self, content_type: str, body: bytes) -> Tuple[Optional[str], Dict[str, Any]]:
+        if content_type.startswith("application/json"):
+            data = json.loads(body or b"{}")
+            return "json", data if isinstance(data, dict) else {}
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return "form", dict(parse_qsl(body.decode()))
+        return None, {}
+
+    @staticmethod
+    def _shape(value: Any) -> Any:
+        if isinstance(value, (bool, int, float)) or value is None:
+            return value
+        if isinstance(value, str):
+            try:
+                return float(value) if "." in value else int(value)
+            except ValueError:
+                return None
+        return None
+
+    def record(
+        self,
+        arrived: float,
+        route: str,
+        status: int,
+        latency: float,
+        content_type: str = "",
+        body: bytes = b""
+    ) -> None:
+        entry: Dict[str, Any] = {"t": round(arrived, 6), "route": route, "status": status, "latency": round(latency, 6)}
+        try:
+            encoding, fields = self._parse(content_type, body)
+        except (ValueError, UnicodeDecodeError):
+            encoding, fields = None, {}
+        if encoding:
+            entry["enc"] = encoding
+        params: Dict[str, Any] = {}
+        for name, value in fields.items():
+            if name in PROMPT_FIELDS and isinstance(value, str):
+                entry["prompt_field"] = name
+                entry["prompt_tokens"] = self.token_counter(value)
+                if self.hash_prompts:
+                    entry["prompt_hash"] = hashlib.blake2b(value.encode(), key=self.salt, digest_size=8).hexdigest()
+            elif name in SHAPE_FIELDS and isinstance(value, str):
+                params[name] = value
+            elif isinstance(value, dict):
+                nested = {key: self._shape(item) for key, item in value.items()}
+                params[name] = {key: item for key, item in nested.items() if item is not None}
+            elif self._shape(value) is not None:
+                params[name] = self._shape(value)
+        if params:
+            entry["params"] = params
+        self._queue.put_nowait(logging.makeLogRecord({"msg": json.dumps(entry, separators=(",", ":"))}))
+
+    def close(self) -> None:
+        self._listener.stop()
+        self._handler.close()
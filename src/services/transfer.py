@@ -0,0 +1,153 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+import base64
+import json
+
+from sqlalchemy import Enum, JSON, DateTime, LargeBinary, Table, select, text
+
+from src.models.database import User, Conversation, ConversationArchive, Message
+from websrc.api.exceptions.exceptions import DataImportError
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+class ConversationTransfer(LoggerMixin):
+    """Bulk export and import of users, conversations and messages as NDJSON.
+
+    Every line is ``{"table": <name>, "row": {...}}``, tables in foreign-key order.
+    Archived conversations travel as their compressed blobs, base64-encoded.
+    Export streams rows through a server-side cursor so memory stays bounded;
+    import writes through the PostgreSQL COPY protocol in chunks, inside a single
+    transaction, then moves the id sequences past the imported ids.
+    """
+    TABLES: Tuple[Table, ...] = (
+        User.__table__, Conversation.__table__, ConversationArchive.__table__, Message.__table__
+    )
+    # Credentials never leave the database; imported users get new keys
+    EXCLUDED_COLUMNS: Dict[str, Tuple[str, ...]] = {"users": ("api_key",)}
+
+    def __init__(self, session_factory, batch_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.TRANSFER_BATCH_SIZE
+        self._tables = {table.name: table for table in self.TABLES}
+
+    def _export_query(self, table: Table, user_id: Optional[int]):
+        excluded = self.EXCLUDED_COLUMNS.get(table.name, ())
+        query = select(*(column for column in table.columns if column.name not in excluded))
+        query = query.order_by(*table.primary_key.columns)
+        if user_id is None:
+            return query
+        if table is User.__table__:
+            return query.where(table.c.id == user_id)
+        if table is Conversation.__table__:
+            return query.where(table.c.user_id == user_id)
+        return query.where(table.c.conversation_id.in_(
+            select(Conversation.id).where(Conversation.user_id == user_id)
+        ))
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, PyEnum):
+            return value.value
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode()
+        return value
+
+    async def export_ndjson(self, user_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield NDJSON chunks of up to ``batch_size`` rows each"""
+        async with self.session_factory() as session:
+            for table in self.TABLES:
+                result = await session.stream(
+                    self._export_query(table, user_id).execution_options(yield_per=self.batch_size)
+                )
+                async for rows in result.partitions():
+                    yield "".join(
+                        json.dumps({
+                            "table": table.name,
+                            "row": {key: self._encode(value) for key, value in row._mapping.items()}
+                        }, separators=(",", ":")) + "\n"
+                        for row in rows
+                    ).encode()
+
+    def _decode_row(self, table: Table, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Convert a JSON row to the Python types asyncpg's COPY expects for ``table``"""
+        record = []
+        for column in table.columns:
+            value = row.get(column.name)
+            if value is not None:
+                if isinstance(column.type, DateTime):
+                    value = datetime.fromisoformat(value)
+                elif isinstance(column.type, Enum) and column.type.enum_class is not None:
+                    value = column.type.enum_class(value).name
+                elif isinstance(column.type, JSON):
+                    value = json.dumps(value)
+                elif isinstance(column.type, LargeBinary):
+                    value = base64.b64decode(value)
+            record.append(value)
+        return tuple(record)
+
+    async def import_ndjson(self, chunks: AsyncIterable[bytes]) -> Dict[str, int]:
+        """COPY NDJSON rows into their tables; returns the row count per table"""
+        counts = {name: 0 for name in self._tables}
+        async with self.session_factory() as session:
+            connection = await session.connection()
+            raw = await connection.get_raw_connection()
+            driver = raw.driver_connection
+
+            current: Optional[Table] = None
+            records: List[Tuple[Any, ...]] = []
+
+            async def copy_pending() -> None:
+                if current is not None and records:
+                    await driver.copy_records_to_table(
+                        current.name, records=records, columns=[column.name for column in current.columns]
+                    )
+                    counts[current.name] += len(records)
+                    records.clear()
+
+            try:
+                async for line_number, line in _iter_lines(chunks):
+                    try:
+                        item = json.loads(line)
+                        table = self._tables[item["table"]]
+                        record = self._decode_row(table, item["row"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        raise DataImportError(f"Invalid import line {line_number}: {e}")
+                    if table is not current:
+                        await copy_pending()
+                        current = table
+                    records.append(record)
+                    if len(records) >= self.batch_size:
+                        await copy_pending()
+                await copy_pending()
+
+                for name, table in self._tables.items():
+                    if "id" not in table.c:
+                        continue
+                    await session.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                        f"GREATEST((SELECT MAX(id) FROM {name}), 1))"
+                    ))
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        self.logger.info(f"Imported {counts}")
+        return counts
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into non-empty lines without holding more than one partial line"""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
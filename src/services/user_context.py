@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import time
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.models.database import User, UserModelConfig
+from src.models.enum import ModelType, TextModelName, ImageModelName
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+def hash_api_key(api_key: str) -> str:
+    """Digest stored in ``User.api_key``; raw keys are never persisted"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+@dataclass(frozen=True)
+class UserContext:
+    """Who is calling and the generation parameters they configured"""
+    user_id: int
+    username: Optional[str] = None
+    # model type -> model name -> parameters, type-wide defaults already merged in
+    generation_config: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def tenant(self) -> Optional[str]:
+        return self.username
+
+    def model_parameters(self, model_type: ModelType) -> Dict[str, Dict[str, Any]]:
+        return self.generation_config.get(ModelType(model_type).value, {})
+
+    def parameters_for(self, model_type: ModelType, model_name: str) -> Dict[str, Any]:
+        return self.model_parameters(model_type).get(model_name, {})
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserContext":
+        return cls(
+            user_id=user.id,
+            username=user.username,
+            generation_config=merge_model_configs(user.model_configs)
+        )
+
+def merge_model_configs(configs: Iterable[UserModelConfig]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Resolve per-model parameters; a config without ``model_name`` applies to every model of its type"""
+    defaults: Dict[str, Dict[str, Any]] = {}
+    specific: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for config in configs:
+        model_type = ModelType(config.model_type).value
+        if config.model_name:
+            specific[(model_type, config.model_name)] = config.parameters or {}
+        else:
+            defaults[model_type] = config.parameters or {}
+
+    merged: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for model_type, names in ((ModelType.TEXT.value, TextModelName.list()), (ModelType.IMAGE.value, ImageModelName.list())):
+        for name in names:
+            parameters = {**defaults.get(model_type, {}), **specific.get((model_type, name), {})}
+            if parameters:
+                merged.setdefault(model_type, {})[name] = parameters
+    return merged
+
+class UserContextResolver(LoggerMixin):
+    """Resolves API keys to a ``UserContext`` through an in-process TTL cache.
+
+    Entries are keyed by the key's SHA-256 digest, so a request costs no database
+    round-trip while its entry is fresh. Unknown keys are cached for a shorter
+    time. Any process that changes a user publishes the user id on a Redis
+    channel, and every process listening on it evicts that user's entries.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        redis_client=None,
+        size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.redis = redis_client
+        self.size = size or settings.USER_CONTEXT_CACHE_SIZE
+        self.ttl = ttl or settings.USER_CONTEXT_CACHE_TTL
+        self.negative_ttl = negative_ttl or settings.USER_CONTEXT_NEGATIVE_TTL
+        self.channel = settings.USER_CONTEXT_CHANNEL
+        self._cache: "OrderedDict[str, Tuple[float, Optional[UserContext]]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key_hash: str) -> Tuple[bool, Optional[UserContext]]:
+        entry = self._cache.get(key_hash)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return False, None
+        self._cache.move_to_end(key_hash)
+        self.hits += 1
+        return True, entry[1]
+
+    def _store(self, key_hash: str, context: Optional[UserContext]) -> None:
+        ttl = self.ttl if context is not None else self.negative_ttl
+        self._cache[key_hash] = (time.monotonic() + ttl, context)
+        self._cache.move_to_end(key_hash)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key_hash: str) -> Optional[UserContext]:
+        async with self.session_factory() as session:
+            user = await session.scalar(
+                select(User).options(selectinload(User.model_configs)).where(User.api_key == key_hash)
+            )
+            return UserContext.from_user(user) if user else None
+
+    async def resolve(self, api_key: str) -> Optional[UserContext]:
+        """The caller's context, or None for an unknown key"""
+        key_hash = hash_api_key(api_key)
+        found, context = self._lookup(key_hash)
+        if not found:
+            context = await self._load(key_hash)
+            self._store(key_hash, context)
+        return context
+
+    def evict(self, user_id: Optional[int] = None) -> None:
+        """Drop a user's entries from this process, or everything when ``user_id`` is None"""
+        if user_id is None:
+            self._cache.clear()
+            return
+        for key_hash in [k for k, (_, context) in self._cache.items() if context and context.user_id == user_id]:
+            del self._cache[key_hash]
+
+    async def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Evict a user here and tell every other process to do the same"""
+        self.evict(user_id)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.publish(self.channel, json.dumps({"user_id": user_id}))
+        except RedisError as e:
+            self.logger.warning(f"User context invalidation publish failed for {user_id}: {e}")
+
+    def start(self) -> None:
+        if self._task is None and self.redis is not None:
+            self._task = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Invalidations may have been missed while unsubscribed
+                    self.evict()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.evict(json.loads(message["data"]).get("user_id"))
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, ValueError) as e:
+                self.logger.warning(f"User context invalidation listener failed: {e}")
+                self.evict()
+                await asyncio.sleep(1)
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "max_size": self.size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+
+class VectorIndex:
+    """Array-backed inner-product index over L2-normalized vectors.
+
+    Small indexes are searched exactly with one matrix-vector product. Once
+    ``ann_threshold`` live vectors are reached, ``train`` clusters the rows with
+    k-means and stores them grouped by centroid (an IVF layout); queries then
+    scan only the ``nprobe`` closest clusters plus rows added since training.
+    Removed rows are tombstoned and dropped at the next training.
+
+    Reads take a snapshot of the arrays under a lock and compute outside it, so
+    searches can run while another thread trains.
+    """
+
+    def __init__(self, dim: int, ann_threshold: Optional[int] = None, nprobe: int = 8):
+        self.dim = dim
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._clustered = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._rows
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def needs_training(self) -> bool:
+        """Past the ANN threshold and either untrained or with a tail as large as the clustered part"""
+        if self.ann_threshold is None or len(self) < self.ann_threshold:
+            return False
+        return not self.is_trained or self._size - self._clustered >= self._clustered
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = [int(item_id) for item_id in ids]
+        self.remove(item_id for item_id in ids if item_id in self._rows)
+        with self._lock:
+            needed = self._size + len(ids)
+            if needed > len(self._vectors):
+                capacity = max(needed, 2 * len(self._vectors), 64)
+                grown_vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+                grown_vectors[:self._size] = self._vectors[:self._size]
+                grown_ids = np.full(capacity, -1, dtype=np.int64)
+                grown_ids[:self._size] = self._ids[:self._size]
+                self._vectors, self._ids = grown_vectors, grown_ids
+            self._vectors[self._size:needed] = vectors
+            self._ids[self._size:needed] = ids
+            for offset, item_id in enumerate(ids):
+                self._rows[item_id] = self._size + offset
+            self._size = needed
+
+    def remove(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            for item_id in list(ids):
+                row = self._rows.pop(int(item_id), None)
+                if row is not None:
+                    self._ids[row] = -1
+            # Untrained indexes have no training pass to drop tombstones, so compact here
+            if self._centroids is None and self._size > 64 and len(self._rows) < self._size // 2:
+                live = np.nonzero(self._ids[:self._size] >= 0)[0]
+                self._vectors, self._ids = self._vectors[live], self._ids[live]
+                self._size = len(live)
+                self._rows = {int(item_id): row for row, item_id in enumerate(self._ids)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._size = 0
+            self._rows = {}
+            self._centroids, self._offsets, self._clustered = None, None, 0
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Up to ``k`` (id, cosine similarity) pairs, best first"""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            vectors, ids, size = self._vectors, self._ids, self._size
+            centroids, offsets, clustered = self._centroids, self._offsets, self._clustered
+
+        if centroids is None:
+            rows = np.arange(size)
+        else:
+            probe = np.argsort(centroids @ query)[::-1][:self.nprobe]
+            rows = np.concatenate(
+                [np.arange(offsets[c], offsets[c + 1]) for c in probe] + [np.arange(clustered, size)]
+            )
+        rows = rows[ids[rows] >= 0]
+        if k <= 0 or len(rows) == 0:
+            return []
+        scores = vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in top]
+
+    def train(self, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster live rows into ~sqrt(n) lists with k-means; safe to call from a worker thread"""
+        with self._lock:
+            snapshot_rows = np.nonzero(self._ids[:self._size] >= 0)[0]
+            vectors = self._vectors[snapshot_rows]
+            ids = self._ids[snapshot_rows]
+            snapshot_size = self._size
+        if len(ids) == 0:
+            return
+
+        nlist = max(1, int(np.sqrt(len(ids))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=nlist), out=offsets[1:])
+
+        with self._lock:
+            # Rows added or removed while training keep their state in the new layout
+            tail_vectors = self._vectors[snapshot_size:self._size]
+            tail_ids = self._ids[snapshot_size:self._size]
+            ordered_ids = ids[order]
+            for row, (item_id, old_row) in enumerate(zip(ordered_ids, snapshot_rows[order])):
+                if self._rows.get(int(item_id)) != old_row:
+                    ordered_ids[row] = -1
+            self._vectors = np.concatenate([vectors[order], tail_vectors])
+            self._ids = np.concatenate([ordered_ids, tail_ids])
+            self._size = len(self._ids)
+            self._rows = {int(item_id): row for row, item_id in enumerate(self._ids) if item_id >= 0}
+            self._centroids, self._offsets, self._clustered = centroids, offsets, len(ordered_ids)
@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from src.models.enum import ModelType
+from src.services.llm_generate import BaseModelHandler, LLMGenerate
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+@dataclass
+class ModelWarmupState:
+    """Load and warm-up progress of a single model"""
+    loaded: bool = False
+    warmed: int = 0
+    shapes: int = 0
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "warmed": f"{self.warmed}/{self.shapes}",
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+@dataclass
+class WarmupProgress:
+    status: str = "pending"
+    models: Dict[str, ModelWarmupState] = field(default_factory=dict)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class ModelWarmup(LoggerMixin):
+    """Loads the configured models at startup and runs warm-up generations.
+
+    Building ``LLMGenerate`` loads the configured model; routing targets and
+    the compaction model are loaded next, then every text model generates
+    once for each ``WARMUP_SHAPES`` entry of (prompt tokens, max length) so
+    allocator and kernel caches are populated before real traffic. The work
+    runs in a worker thread so the server keeps answering liveness probes;
+    ``ready`` turns true only when it has finished. A model that fails to
+    load leaves the replica not ready; a failed warm-up generation is logged
+    and skipped.
+    """
+
+    WARMUP_WORD = "warmup "
+
+    def __init__(self, service_provider: Callable[[], Optional[LLMGenerate]], shapes: Optional[List[List[int]]] = None):
+        self.service_provider = service_provider
+        self.shapes: List[Tuple[int, int]] = [tuple(shape) for shape in (shapes if shapes is not None else settings.WARMUP_SHAPES)]
+        self.progress = WarmupProgress()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.progress.status in ("ready", "skipped")
+
+    def skip(self) -> None:
+        """Mark the replica ready without warming; models then load on first use"""
+        self.progress.status = "skipped"
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # The worker thread cannot be interrupted; only stop waiting for it
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        self.progress.started_at = time.monotonic()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.run_sync)
+        except Exception as e:
+            self.progress.status = "failed"
+            self.logger.error(f"Model warm-up failed: {e}", exc_info=True)
+        finally:
+            self.progress.finished_at = time.monotonic()
+
+    def run_sync(self) -> None:
+        """Load and warm every configured model; blocking"""
+        self.progress.status = "loading"
+        primary = settings.MODEL_NAME
+        self.progress.models[primary] = ModelWarmupState(shapes=self._shape_count(settings.MODEL_TYPE))
+        started = time.monotonic()
+        try:
+            service = self.service_provider()
+        except Exception as e:
+            self.progress.models[primary].error = str(e)
+            raise
+        if service is None:
+            # Nothing to load when the LLM service is disabled
+            self.progress.models.clear()
+            self.progress.status = "ready"
+            return
+        self.progress.models[primary].loaded = True
+        self.progress.models[primary].load_seconds = round(time.monotonic() - started, 3)
+
+        handlers: Dict[str, BaseModelHandler] = {primary: service.handler}
+        for model_name in self.configured_models(service):
+            if model_name in handlers:
+                continue
+            state = self.progress.models[model_name] = ModelWarmupState(shapes=self._shape_count(ModelType.TEXT))
+            started = time.monotonic()
+            try:
+                handlers[model_name] = service.get_text_handler(model_name)
+            except Exception as e:
+                state.error = str(e)
+                raise
+            state.loaded = True
+            state.load_seconds = round(time.monotonic() - started, 3)
+
+        self.progress.status = "warming"
+        for model_name, handler in handlers.items():
+            self._warm(model_name, handler, service)
+        self.progress.status = "ready"
+        elapsed = time.monotonic() - self.progress.started_at if self.progress.started_at else 0.0
+        self.logger.info(f"Warmed {len(handlers)} model(s) in {elapsed:.1f}s")
+
+    def configured_models(self, service: LLMGenerate) -> List[str]:
+        """Text models requests can reach besides the primary one"""
+        models: List[str] = []
+        if service.router is not None:
+            for rule in service.router.rules:
+                models.append(rule.model_name)
+                if rule.escalate_to:
+                    models.append(rule.escalate_to)
+        if settings.COMPACTION_ENABLED:
+            models.append(settings.COMPACTION_MODEL)
+        models.extend(settings.WARMUP_MODELS)
+        return list(dict.fromkeys(models))
+
+    def _shape_count(self, model_type: str) -> int:
+        return len(self.shapes) if model_type == ModelType.TEXT else 1
+
+    def _warm(self, model_name: str, handler: BaseModelHandler, service: LLMGenerate) -> None:
+        state = self.progress.models[model_name]
+        if handler.model_config.model_type == ModelType.IMAGE:
+            shapes = [("warmup", {"resolution": "512x512"})]
+        else:
+            tokenizer = service.get_tokenizer(model_name)
+            shapes = []
+            for prompt_tokens, max_length in self.shapes:
+                # Keep the prompt inside the context window with room for the reply
+                prompt_tokens = max(1, min(prompt_tokens, handler.resources.context_length - max_length))
+                prompt = self.WARMUP_WORD * prompt_tokens
+                # Tokenizers can split the word; shorten the prompt to the intended length
+                actual = tokenizer.count_tokens(prompt)
+                if actual > prompt_tokens:
+                    prompt = self.WARMUP_WORD * max(1, prompt_tokens * prompt_tokens // actual)
+                shapes.append((prompt, {"max_length": max_length, "parameters": {}}))
+        for prompt, kwargs in shapes:
+            try:
+                handler.generate(prompt, **kwargs)
+            except Exception as e:
+                self.logger.warning(f"Warm-up generation for {model_name} failed: {e}")
+            state.warmed += 1
+
+    def status(self) -> Dict[str, Any]:
+        total = sum(1 + state.shapes for state in self.progress.models.values())
+        done = sum(int(state.loaded) + state.warmed for state in self.progress.models.values())
+        end = self.progress.finished_at or time.monotonic()
+        return {
+            "status": self.progress.status,
+            "ready": self.ready,
+            "progress": 1.0 if self.ready else round(done / total, 3) if total else 0.0,
+            "elapsed_seconds": round(end - self.progress.started_at, 3) if self.progress.started_at else None,
+            "models": {name: state.as_dict() for name, state in self.progress.models.items()},
+        }
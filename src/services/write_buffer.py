@@ -0,0 +1,144 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+
+from sqlalchemy import insert
+
+from src.models.database import Message
+from src.services import tracing
+from websrc.config.settings import settings
+from websrc.config.logging_config import LoggerMixin
+
+PendingMessage = Tuple[Dict[str, Any], asyncio.Future]
+
+class MessageWriteBuffer(LoggerMixin):
+    """Write-behind buffer that persists messages in multi-row INSERT batches.
+
+    A batch is flushed once ``batch_size`` messages are queued or ``flush_interval``
+    seconds after the first one arrived, whichever comes first. Failed batches are
+    retried with exponential backoff; after ``max_retries`` the waiting futures
+    receive the error. ``stop`` lets a flush in progress finish, then drains
+    everything that is still queued.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        on_flushed: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size or settings.DB_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.DB_WRITE_FLUSH_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else settings.DB_WRITE_MAX_RETRIES
+        self._pending: List[PendingMessage] = []
+        self._inflight: List[PendingMessage] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Cancelling could interrupt an insert and lose the batch already taken from the queue
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception as e:
+                self.logger.error(f"Message write loop failed: {e}")
+            self._task = None
+            self._stopping = False
+        while self._pending:
+            await self.flush()
+
+    def enqueue(self, values: Dict[str, Any]) -> asyncio.Future:
+        """Queue a message row; the returned future resolves to its id once flushed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        if len(self._pending) >= self.batch_size or len(self._pending) == 1:
+            self._wakeup.set()
+        self.start()
+        return future
+
+    def pending_for(self, conversation_id: int) -> List[Dict[str, Any]]:
+        """Queued and in-flight rows of a conversation, oldest first"""
+        return [
+            values for values, _ in self._inflight + self._pending
+            if values["conversation_id"] == conversation_id
+        ]
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._pending) < self.batch_size and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wait_for_full_batch(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            while self._pending:
+                await self.flush()
+
+    async def _wait_for_full_batch(self) -> None:
+        while len(self._pending) < self.batch_size and not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            if not batch:
+                return
+            rows = [values for values, _ in batch]
+            self._inflight = batch
+            try:
+                with tracing.stage("db.persist", **{"db.batch_size": len(rows)}):
+                    ids = await self._insert_with_retry(rows)
+            except Exception as e:
+                self._inflight = []
+                self.logger.error(f"Dropping batch of {len(rows)} messages after {self.max_retries} retries: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            flushed = [{**values, "id": message_id} for values, message_id in zip(rows, ids)]
+            for (_, future), message_id in zip(batch, ids):
+                if not future.done():
+                    future.set_result(message_id)
+            try:
+                if self.on_flushed:
+                    await self.on_flushed(flushed)
+            finally:
+                # Stay visible to pending_for until readers can find the rows elsewhere
+                self._inflight = []
+
+    async def _insert_with_retry(self, rows: List[Dict[str, Any]]) -> List[int]:
+        attempt = 0
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(
+                        insert(Message).returning(Message.id, sort_by_parameter_order=True),
+                        rows
+                    )
+                    ids = list(result.scalars())
+                    await session.commit()
+                    return ids
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = 0.1 * 2 ** attempt
+                attempt += 1
+                self.logger.warning(f"Message batch insert failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from websrc.api.exceptions.exceptions import BaseAppError
+from websrc.api.middleware.error_handlers import base_app_error_handler
+from websrc.api.routes import configuration, transfer
+from websrc.config.settings import settings
+
+def post_import(headers):
+    app = FastAPI()
+    app.include_router(transfer.router)
+    app.add_exception_handler(BaseAppError, base_app_error_handler)
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/conversations/import", content=b"", headers=headers)
+    return asyncio.run(send())
+
+def test_transfer_requires_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert post_import({"X-Admin-Token": ""}).status_code == 401
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert post_import({}).status_code == 401
+    assert post_import({"X-Admin-Token": "wrong"}).status_code == 401
+
+def test_usage_stats_require_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(configuration.router)
+    app.add_exception_handler(BaseAppError, base_app_error_handler)
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/usage/stats", params={"group_by": "user"})
+    assert asyncio.run(send()).status_code == 401
+
+def test_event_loop_stats_require_profiling_token(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(configuration.router)
+    app.add_exception_handler(BaseAppError, base_app_error_handler)
+
+    async def send(headers):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/telemetry/event-loop/stats", headers=headers)
+    assert asyncio.run(send({})).status_code == 401
+    assert asyncio.run(send({"X-Profiling-Token": "secret"})).status_code == 200
@@ -0,0 +1,54 @@
+import asyncio
+import random
+
+import pytest
+
+from src.cli.benchmark import burst_arrivals, compare, in_process_client, percentile, poisson_arrivals, run_scenario
+from src.services.container import container
+from src.services.stub_model import StubModelFactory
+from websrc.config.settings import settings
+
+@pytest.fixture
+def restore_app(monkeypatch):
+    for name in ("MODEL_TYPE", "MODEL_NAME"):
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+    monkeypatch.setattr(container, "_factory", container._factory)
+    monkeypatch.setattr(container, "_llm_service", container._llm_service)
+
+def test_arrival_schedules_are_deterministic_and_open_loop():
+    assert poisson_arrivals(50, 2, random.Random(1)) == poisson_arrivals(50, 2, random.Random(1))
+    assert 60 < len(poisson_arrivals(50, 2, random.Random(1))) < 140
+    assert burst_arrivals(10, 2, burst_size=5) == [0.0] * 5 + [0.5] * 5 + [1.0] * 5 + [1.5] * 5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0 and percentile([], 99) == 0.0
+
+@pytest.mark.parametrize("scenario", ["text", "image"])
+def test_in_process_scenario_reports_latency_percentiles(restore_app, scenario):
+    factory = StubModelFactory(token_latency=0.001, output_tokens=8, image_latency=0.01)
+
+    async def run():
+        async with in_process_client(scenario, factory) as client:
+            return await run_scenario(client, scenario, [0.0] * 5 + [0.05] * 5, offered_rate=20, max_length=8)
+    summary = asyncio.run(run()).summary()
+
+    assert summary["requests"] == 10 and summary["errors"] == 0
+    assert summary["throughput"] > 0
+    assert 0 < summary["latency_p50"] <= summary["latency_p99"]
+    # Buffered routes have no first token to time
+    assert "ttft_p50" not in summary
+
+def test_stream_scenario_times_the_first_token(restore_app):
+    factory = StubModelFactory(token_latency=0.01, output_tokens=20)
+
+    async def run():
+        async with in_process_client("stream", factory) as client:
+            return await run_scenario(client, "stream", [0.0] * 3, offered_rate=10, max_length=20)
+    summary = asyncio.run(run()).summary()
+
+    assert summary["requests"] == 3 and summary["errors"] == 0
+    assert 0 < summary["ttft_p99"] < summary["latency_p50"] / 2
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {"scenario": "text", "throughput": 100.0, "errors": 0, **{f"latency_p{q}": 0.1 for q in (50, 95, 99)}}
+    assert compare(dict(baseline, latency_p99=0.105), baseline, tolerance=0.1) == []
+    regressions = compare(dict(baseline, latency_p99=0.2, throughput=50.0), baseline, tolerance=0.1)
+    assert len(regressions) == 2 and "latency_p99" in regressions[0] and "throughput" in regressions[1]
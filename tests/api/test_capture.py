@@ -0,0 +1,71 @@
+import asyncio
+import glob
+import json
+
+import httpx
+from fastapi import FastAPI, Form
+
+from src.cli.replay import build_request, read_capture, replay
+from src.services.traffic_capture import TrafficRecorder
+from websrc.api.middleware.capture import TrafficCaptureMiddleware
+
+def make_app():
+    app = FastAPI()
+
+    @app.post("/generate/")
+    async def generate(prompt: str = Form(...), max_length: int = Form(100), user_note: str = Form("")):
+        return {"length": len(prompt.split())}
+
+    @app.post("/conversations/{conversation_id}/generate")
+    async def reply(conversation_id: int, body: dict):
+        return {"ok": True}
+
+    return app
+
+def test_capture_records_anonymised_shapes_and_replays_them(tmp_path):
+    path = str(tmp_path / "traffic.ndjson")
+    recorder = TrafficRecorder(path=path, sample_rate=1.0, hash_prompts=True, salt="test")
+    app = make_app()
+    captured_app = TrafficCaptureMiddleware(app, recorder)
+
+    async def send():
+        transport = httpx.ASGITransport(app=captured_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(2):
+                await client.post("/generate/", data={"prompt": "a secret prompt here", "max_length": 50, "user_note": "private"})
+            await client.post("/conversations/7/generate", json={"content": "hi", "parameters": {"temperature": 0.5, "stop": "x"}})
+    asyncio.run(send())
+    recorder.close()
+
+    raw = open(path).read()
+    assert "secret" not in raw and "private" not in raw
+    records = read_capture([path])
+    first, second, conversation = records
+    assert first["route"] == "POST /generate/" and first["status"] == 200 and first["enc"] == "form"
+    assert first["prompt_tokens"] == 4 and first["params"] == {"max_length": 50}
+    assert first["prompt_hash"] == second["prompt_hash"]
+    assert conversation["route"] == "POST /conversations/{conversation_id}/generate"
+    assert conversation["params"] == {"parameters": {"temperature": 0.5}}
+
+    request = build_request(first, seed=0)
+    assert request["data"]["max_length"] == 50 and len(request["data"]["prompt"].split()) == 4
+
+    async def run_replay():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await replay(client, records[:2], speed=10)
+    report = asyncio.run(run_replay())
+    assert report["skipped"] == 0
+    route = report["routes"]["POST /generate/"]
+    assert route["captured"] == 2 and route["replayed"] == 2 and route["errors"] == 0
+    assert route["ratio_p50"] is not None
+
+def test_capture_file_rotates_into_gzipped_backups(tmp_path):
+    path = str(tmp_path / "traffic.ndjson")
+    recorder = TrafficRecorder(path=path, max_bytes=200, backups=2)
+    for i in range(20):
+        recorder.record(arrived=float(i), route="GET /health/", status=200, latency=0.001)
+    recorder.close()
+
+    files = sorted(glob.glob(f"{path}*"))
+    assert f"{path}.1.gz" in files and len(files) == 3
+    assert all(json.dumps(record) for record in read_capture(files))
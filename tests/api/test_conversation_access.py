@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.container import container
+from websrc.api.routes import conversations
+from websrc.config.settings import settings
+
+class OwnedByOtherUser:
+    def __init__(self):
+        self.listed = False
+
+    async def get_conversation(self, conversation_id):
+        return SimpleNamespace(id=conversation_id, user_id=settings.DEFAULT_USER_ID + 1)
+
+    async def list_messages(self, **kwargs):
+        self.listed = True
+        return []
+
+def test_other_users_conversations_are_not_found(monkeypatch):
+    db = OwnedByOtherUser()
+    monkeypatch.setattr(container, "_db_service", db)
+    app = FastAPI()
+    app.include_router(conversations.router)
+    client = TestClient(app)
+
+    assert client.get("/conversations/7/messages").status_code == 404
+    assert client.post("/conversations/7/messages", json={"role": "user", "content": "hi"}).status_code == 404
+    assert not db.listed
@@ -0,0 +1,53 @@
+import asyncio
+import httpx
+from fastapi import FastAPI
+
+from src.cli.build_assets import build
+from websrc.api.routes import frontend
+from websrc.api.utility.static_assets import AssetManifest, PrecompressedStaticFiles
+
+def get(app, url, **headers):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url, headers=headers)
+    return asyncio.run(send())
+
+def test_pages_render_once_and_answer_304():
+    app = FastAPI()
+    app.include_router(frontend.router)
+    frontend.pages.clear()
+
+    first = get(app, "/home", **{"accept-encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.text.startswith("<!DOCTYPE html>")
+    assert len(frontend.pages._pages) == 1
+
+    again = get(app, "/home", **{"if-none-match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert len(frontend.pages._pages) == 1
+
+def test_static_assets_are_precompressed_and_fingerprinted(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_text("body { color: red; }\n" * 100)
+    assert str(tmp_path / "css" / "site.css.gz") in build(str(tmp_path))
+    assert build(str(tmp_path)) == []
+
+    manifest = AssetManifest(str(tmp_path))
+    url = manifest.url("css/site.css")
+    assert url != "/static/css/site.css"
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=str(tmp_path), manifest=manifest))
+
+    response = get(app, url, **{"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert "immutable" in response.headers["cache-control"]
+    assert response.content.startswith(b"body")
+
+    plain = get(app, "/static/css/site.css", **{"accept-encoding": "identity"})
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert "immutable" not in plain.headers.get("cache-control", "")
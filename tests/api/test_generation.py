@@ -16,3 +16,10 @@ def test_generate_text():
     })
     assert response.status_code == 200
     assert "Generated text based on prompt" in response.text
+
+def test_liveness_and_readiness():
+    assert client.get("/health/live").json() == {"status": "alive"}
+    # Startup has not run, so the models have not been warmed
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
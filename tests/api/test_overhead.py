@@ -0,0 +1,18 @@
+import pytest
+
+from src.cli.microbench import REQUEST_PATHS, run
+
+# Framework cost per request in microseconds, excluding the model. Generous
+# against ~30us and ~11us (pages come from the page cache) measured locally
+OVERHEAD_BUDGET_US = {
+    "generation": 500.0,
+    "page": 200.0,
+}
+
+@pytest.mark.benchmark
+def test_framework_overhead_per_request_within_budget():
+    steps = sorted({step for path in REQUEST_PATHS.values() for step in path})
+    results = run(steps, repeat=5)
+
+    for request, budget in OVERHEAD_BUDGET_US.items():
+        assert results["requests_us"][request] < budget, results["steps_us"]
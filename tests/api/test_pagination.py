@@ -0,0 +1,34 @@
+from datetime import datetime
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from websrc.api.utility.pagination import encode_cursor, decode_cursor
+from websrc.api.utility.conditional import conditional_json_response
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 4, 23, 9, 30, 15, 123456)
+    cursor = encode_cursor({"created_at": created_at, "id": 42})
+    assert decode_cursor(cursor, ("created_at", "id"), datetime_keys=("created_at",)) == {
+        "created_at": created_at, "id": 42
+    }
+    assert decode_cursor(None, ("id",)) is None
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor({"other": 1})])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, ("id",))
+    assert exc.value.status_code == 400
+
+def test_conditional_response_returns_304_for_matching_etag():
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request):
+        return conditional_json_response(request, {"items": [1, 2, 3]})
+
+    client = TestClient(app)
+    first = client.get("/items")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get("/items", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/items", headers={"If-None-Match": 'W/"stale"'}).status_code == 200
@@ -0,0 +1,23 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.profiler import RequestProfiler
+from websrc.api.middleware import profiling
+
+def test_requests_are_tagged_with_the_route_template(monkeypatch):
+    profiler = RequestProfiler(interval=0.001, max_seconds=10, output_dir="")
+    monkeypatch.setattr(profiling, "profiler", profiler)
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+    @app.get("/conversations/{conversation_id}/messages")
+    async def list_messages(conversation_id: int):
+        return []
+
+    client = TestClient(app)
+    session = profiler.start(requests=3)
+    for path in ("/conversations/1/messages", "/conversations/2/messages", "/missing"):
+        client.get(path)
+    profiler.stop()
+
+    assert session.routes == {"GET /conversations/{conversation_id}/messages": 2, "GET /missing": 1}
@@ -0,0 +1,20 @@
+from src.cli.profile_startup import APP_MODULE, import_profile
+
+# Generous against the ~0.6s measured locally; catches heavy subsystems creeping back in
+IMPORT_BUDGET_SECONDS = 2.0
+
+# Only needed once the matching feature is enabled
+DEFERRED_MODULES = {
+    "numpy",
+    "asyncpg",
+    "opentelemetry.exporter.jaeger.thrift",
+    "opentelemetry.instrumentation.requests",
+}
+
+def test_app_import_defers_optional_subsystems():
+    timings = import_profile(APP_MODULE)
+    imported = {timing.module for timing in timings}
+    assert not DEFERRED_MODULES & imported
+
+    total_us = next(t.cumulative_us for t in timings if t.module == APP_MODULE)
+    assert total_us / 1e6 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.container import container
+from src.services.tokenizer import TokenizerService
+from websrc.api.exceptions.exceptions import BaseAppError
+from websrc.api.middleware.error_handlers import base_app_error_handler
+from websrc.api.routes import tokenization
+
+class ServingOneModel:
+    serving_models = ["gpt-neo-125m"]
+
+    def __init__(self):
+        self.loaded_on_loop = []
+
+    def get_tokenizer(self, model_name=None):
+        try:
+            asyncio.get_running_loop()
+            self.loaded_on_loop.append(True)
+        except RuntimeError:
+            self.loaded_on_loop.append(False)
+        return TokenizerService(model_name=model_name)
+
+def client_for(monkeypatch, llm_service):
+    monkeypatch.setattr(container, "_llm_service", llm_service)
+    app = FastAPI()
+    app.include_router(tokenization.router)
+    app.add_exception_handler(BaseAppError, base_app_error_handler)
+    return TestClient(app)
+
+def test_only_served_models_are_tokenized_off_the_loop(monkeypatch):
+    llm_service = ServingOneModel()
+    client = client_for(monkeypatch, llm_service)
+
+    response = client.post("/count_tokens", json={"texts": ["a b c"], "model_name": "gpt-neo-125m"})
+    assert response.status_code == 200 and response.json()["total"] == 3
+
+    response = client.post("/tokenize", json={"texts": ["a b c"], "model_name": "falcon-40b-instruct"})
+    assert response.status_code == 400
+    assert llm_service.loaded_on_loop == [False]
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.services import accounting
+from src.services.database import DatabaseService
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from websrc.models.pydantic import TextGenerationRequest
+
+def test_generation_usage_is_recorded_for_the_tracked_request():
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt="account for this prompt", max_length=50)
+
+    async def run():
+        with accounting.track() as usage:
+            await service.generate_text_async(request)
+        # Untracked generations are not charged to anyone
+        await service.generate_text_async(request)
+        return usage
+    usage = asyncio.run(run()).as_dict()
+
+    assert usage["model"] == service.model_config.model_name
+    assert usage["precision"] == service.handler.resources.precision
+    assert usage["prompt_tokens"] > 0 and usage["completion_tokens"] > usage["prompt_tokens"]
+    # The stub model is too quick for thread CPU time to register reliably
+    assert usage["cpu_seconds"] >= 0 and usage["queue_wait_seconds"] >= 0
+    assert usage["total_seconds"] >= usage["prefill_seconds"] + usage["decode_seconds"]
+    assert usage["cache"] is None and usage["escalated"] is False
+    assert accounting.current_usage.get() is None
+
+def test_streamed_generation_is_accounted():
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt="stream and account", max_length=50)
+
+    async def run():
+        with accounting.track() as usage:
+            pieces = [piece async for piece in service.stream_text_async(request)]
+        return usage, pieces
+    usage, pieces = asyncio.run(run())
+
+    assert usage.completion_tokens > 0 and len(pieces) > 1
+    assert usage.model == service.model_config.model_name and usage.prompt_tokens > 0
+    assert usage.cpu_seconds >= 0 and usage.queue_wait_seconds >= 0
+
+class RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self.rows
+
+def test_usage_percentiles_groups_assistant_replies():
+    row = SimpleNamespace(_mapping={"key": 1, "replies": 3, "total_seconds_p50": 0.2})
+    session = RecordingSession([row])
+    db = DatabaseService(lambda: session)
+
+    groups = asyncio.run(db.usage_percentiles(group_by="user", since=datetime(2024, 1, 1), quantiles=(0.5, 0.99)))
+
+    assert groups == [{"key": 1, "replies": 3, "total_seconds_p50": 0.2}]
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "GROUP BY conversations.user_id" in sql
+    assert "percentile_cont(%(percentile_cont_1)s) WITHIN GROUP (ORDER BY" in sql
+    for field in accounting.COST_FIELDS:
+        assert f"{field}_p50" in sql and f"{field}_p99" in sql and f"{field}_sum" in sql
+    assert "messages.role = %(role_1)s" in sql
@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import Delete, Insert, Select, Update
+from sqlalchemy.dialects import postgresql
+
+from src.models.database import Conversation, ConversationArchive, Message
+from src.services.archive import ConversationArchiver
+
+def test_pack_roundtrip_restores_rows():
+    archiver = ConversationArchiver(session_factory=None)
+    created_at = datetime(2024, 1, 2, 3, 4, 5)
+    rows = [
+        {
+            "id": i,
+            "role": "user",
+            "content": "the same sentence again " * 10,
+            "token_count": 50,
+            "created_at": created_at.isoformat(),
+            "generation_info": {"model": "gpt-neo-125m"},
+        }
+        for i in range(20)
+    ]
+    data = archiver._pack(rows)
+    assert len(data) < sum(len(row["content"]) for row in rows) // 10
+
+    restored = archiver._unpack(data)
+    assert [row["id"] for row in restored] == list(range(20))
+    assert restored[0]["created_at"] == created_at
+    assert restored[0]["generation_info"] == {"model": "gpt-neo-125m"}
+
+class Scalars(list):
+    def all(self):
+        return list(self)
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return Scalars(self.value)
+
+class FakeStore:
+    """Conversation 1 and its rows, changed by the statements the archiver runs"""
+    def __init__(self, messages, archived_at=None, candidates=()):
+        self.conversation = Conversation(id=1, user_id=1, archived_at=archived_at)
+        self.messages = messages
+        self.archive = None
+        self.candidates = list(candidates)
+        self.statements = []
+        self.sessions = 0
+
+class FakeSession:
+    def __init__(self, store):
+        self.store = store
+        store.sessions += 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        store = self.store
+        store.statements.append(statement)
+        if isinstance(statement, Select):
+            selected = statement.column_descriptions[0]["name"]
+            if selected == "archived_at":
+                return FakeResult(store.conversation.archived_at)
+            if selected == "conversation_id":
+                return FakeResult(store.candidates)
+            return FakeResult(store.messages)
+        if isinstance(statement, Delete):
+            store.messages = []
+        elif isinstance(statement, Update):
+            store.conversation.archived_at = statement.compile().params["archived_at"]
+        elif isinstance(statement, Insert):
+            store.messages = [Message(**row) for row in params]
+        return FakeResult(None)
+
+    def add(self, row):
+        self.store.archive = row
+
+    async def get(self, model, key):
+        assert model is ConversationArchive and key == 1
+        return self.store.archive
+
+    async def delete(self, row):
+        self.store.archive = None
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+class RecordingCache:
+    def __init__(self):
+        self.invalidated = []
+
+    async def invalidate(self, conversation_id):
+        self.invalidated.append(conversation_id)
+
+def messages(last_active):
+    return [
+        Message(
+            id=i, conversation_id=1, role="user" if i % 2 else "assistant", content=f"turn {i} " * 20,
+            token_count=40, created_at=last_active - timedelta(minutes=10 - i), generation_info={"turn": i}
+        )
+        for i in range(1, 6)
+    ]
+
+def archiver_for(store, cache=None):
+    return ConversationArchiver(session_factory=lambda: FakeSession(store), cache=cache)
+
+def test_archive_then_rehydrate_restores_every_message():
+    idle_since = datetime.utcnow() - timedelta(days=60)
+    original = messages(idle_since)
+    store = FakeStore(list(original))
+    cache = RecordingCache()
+    archiver = archiver_for(store, cache)
+
+    assert asyncio.run(archiver.archive(1))
+    assert store.messages == [] and store.conversation.archived_at is not None
+    assert store.archive.message_count == 5
+    # A second pass finds it already archived
+    assert not asyncio.run(archiver.archive(1))
+
+    assert asyncio.run(archiver.rehydrate(1))
+    assert store.archive is None and store.conversation.archived_at is None
+    assert [(m.id, m.role, m.content, m.created_at, m.generation_info) for m in store.messages] == [
+        (m.id, m.role, m.content, m.created_at, m.generation_info) for m in original
+    ]
+    assert not asyncio.run(archiver.rehydrate(1))
+    assert cache.invalidated == [1, 1]
+
+def test_recently_active_conversations_are_not_archived():
+    store = FakeStore(messages(datetime.utcnow()))
+
+    assert not asyncio.run(archiver_for(store).archive(1))
+    assert len(store.messages) == 5 and store.archive is None
+
+def test_ensure_hot_only_touches_the_database_for_archived_conversations():
+    store = FakeStore(messages(datetime.utcnow() - timedelta(days=60)))
+    archiver = archiver_for(store)
+
+    assert not asyncio.run(archiver.ensure_hot(store.conversation))
+    assert store.sessions == 0
+
+    asyncio.run(archiver.archive(1))
+    assert asyncio.run(archiver.ensure_hot(store.conversation))
+    assert len(store.messages) == 5
+
+def test_idle_candidates_are_selected_by_last_activity():
+    store = FakeStore(messages(datetime.utcnow() - timedelta(days=60)), candidates=[1])
+    archiver = archiver_for(store)
+    archiver.batch_size = 7
+
+    assert asyncio.run(archiver.run_once()) == 1
+    sql = str(store.statements[0].compile(dialect=postgresql.dialect()))
+    assert "conversations.archived_at IS NULL" in sql
+    assert "GROUP BY messages.conversation_id" in sql
+    assert "HAVING max(messages.created_at) < %(max_1)s" in sql
+    assert "LIMIT %(param_1)s" in sql
+    assert store.conversation.archived_at is not None
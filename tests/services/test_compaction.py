@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.compaction import ConversationCompactor
+from src.services.context import ContextMessage
+from src.services.database import DatabaseService
+from websrc.config.settings import settings
+
+def words(text):
+    return len(text.split())
+
+class FakeDatabase:
+    def __init__(self, conversations, candidates=None):
+        self.conversations = conversations
+        self.candidates = candidates if candidates is not None else list(conversations)
+        self.summaries = {}
+        self.compacted_through = {}
+
+    async def get_compaction_candidates(self, token_threshold, min_turns, limit):
+        return self.candidates[:limit]
+
+    async def get_compaction_state(self, conversation_id):
+        through = self.compacted_through.get(conversation_id, 0)
+        summary = self.summaries.get(conversation_id)
+        return (
+            ContextMessage(id=None, role="summary", content=summary) if summary else None,
+            [turn for turn in self.conversations[conversation_id] if turn.id > through]
+        )
+
+    async def add_message(self, conversation_id, role, content, metadata):
+        assert role == "summary"
+        self.summaries[conversation_id] = content
+
+    async def mark_compacted(self, conversation_id, compacted_through):
+        self.compacted_through[conversation_id] = compacted_through
+
+class FakeLLM:
+    def __init__(self, context_length):
+        self.prompts = []
+        self.queue_depth = 0
+        self.handler = SimpleNamespace(resources=SimpleNamespace(context_length=context_length), generate=self.generate)
+
+    def generate(self, prompt, max_length):
+        self.prompts.append(prompt)
+        return f"summary {len(self.prompts)}"
+
+    def get_text_handler(self, model_name):
+        return self.handler
+
+    def get_tokenizer(self, model_name):
+        return SimpleNamespace(count_tokens=words)
+
+def turns(count, words_each=5):
+    return [
+        ContextMessage(id=i, role="user" if i % 2 else "assistant", content=" ".join([f"w{i}"] * words_each))
+        for i in range(1, count + 1)
+    ]
+
+def compactor(db, llm, keep_recent=2):
+    service = ConversationCompactor(db, lambda: llm)
+    service.keep_recent = keep_recent
+    return service
+
+def test_run_once_compacts_candidates_and_keeps_recent_turns(monkeypatch):
+    monkeypatch.setattr(settings, "COMPACTION_SUMMARY_MAX_LENGTH", 16)
+    db = FakeDatabase({1: turns(6), 2: turns(2)}, candidates=[1, 2])
+    llm = FakeLLM(context_length=2048)
+    service = compactor(db, llm, keep_recent=2)
+
+    assert asyncio.run(service.run_once()) == 1
+    # Conversation 2 has nothing older than its recent turns
+    assert db.compacted_through == {1: 4}
+    assert db.summaries == {1: "summary 1"}
+    assert "w4" in llm.prompts[0] and "w5" not in llm.prompts[0]
+
+    db.conversations[1] += [ContextMessage(id=7, role="user", content="w7"), ContextMessage(id=8, role="assistant", content="w8")]
+    assert asyncio.run(service.compact(1))
+    assert db.compacted_through[1] == 6
+    assert "Earlier summary: summary 1" in llm.prompts[1] and "w4" not in llm.prompts[1]
+
+def test_long_transcripts_are_summarized_in_chunks_that_fit_the_window(monkeypatch):
+    monkeypatch.setattr(settings, "COMPACTION_SUMMARY_MAX_LENGTH", 16)
+    prompt_overhead = words(ConversationCompactor.SUMMARY_PROMPT.format(transcript=""))
+    context_length = prompt_overhead + 16 + 40
+    db = FakeDatabase({1: turns(30, words_each=10)})
+    llm = FakeLLM(context_length=context_length)
+
+    assert asyncio.run(compactor(db, llm, keep_recent=0).compact(1))
+    assert len(llm.prompts) > 1
+    assert all(words(prompt) <= context_length - 16 for prompt in llm.prompts)
+    assert all("w30" not in prompt for prompt in llm.prompts[:-1]) and "w30" in llm.prompts[-1]
+    assert db.compacted_through == {1: 30}
+
+def test_a_turn_longer_than_the_window_is_clipped():
+    long_turn = ContextMessage(id=1, role="user", content=" ".join(["word"] * 500))
+    chunk = ConversationCompactor.fit_turns([long_turn], budget=50, count_tokens=words)
+    assert len(chunk) == 1 and words(f"user: {chunk[0].content}") <= 50
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalars=lambda: iter([3, 1]))
+
+def test_candidates_need_more_turns_than_are_kept_and_oldest_come_first():
+    session = RecordingSession()
+    db = DatabaseService(lambda: session)
+
+    assert asyncio.run(db.get_compaction_candidates(token_threshold=1536, min_turns=8, limit=10)) == [3, 1]
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "HAVING sum(messages.token_count) > 1536 AND count(*) > 8" in sql
+    assert "ORDER BY min(messages.id)" in sql
+    assert "messages.role NOT IN ('system', 'summary')" in sql
+    assert "conversations.archived_at IS NULL" in sql
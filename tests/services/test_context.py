@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.context import ContextAssembler, ContextMessage
+from src.services.database import DatabaseService
+from src.services.tokenizer import TokenizerService
+
+def make_assembler():
+    return ContextAssembler(db_service=None, tokenizer=TokenizerService(), history_limit=50)
+
+def history():
+    # Ordered as DatabaseService.get_context_messages returns it: pinned first, then newest first
+    return [
+        ContextMessage(id=1, role="system", content="be brief", token_count=5),
+        ContextMessage(id=5, role="assistant", content="four", token_count=10),
+        ContextMessage(id=4, role="user", content="three", token_count=10),
+        ContextMessage(id=3, role="assistant", content="two", token_count=50),
+        ContextMessage(id=2, role="user", content="one", token_count=1),
+    ]
+
+def test_keeps_pinned_and_newest_turns_within_budget():
+    context = make_assembler().build(history(), "hello", max_length=20, context_length=50)
+    assert [message.id for message in context.messages] == [1, 4, 5, None]
+    assert context.truncated == 2
+    assert context.prompt_tokens <= 50 - 20
+    assert context.prompt.splitlines() == [
+        "system: be brief", "user: three", "assistant: four", "user: hello", "assistant:"
+    ]
+
+def test_counts_tokens_for_legacy_rows():
+    legacy = [ContextMessage(id=1, role="user", content="an older turn")]
+    context = make_assembler().build(legacy, "hi", max_length=10, context_length=100)
+    assert legacy[0].token_count == 3
+    assert context.prompt_tokens == 4
+
+def test_latest_summary_replaces_compacted_turns():
+    compacted = [
+        ContextMessage(id=1, role="system", content="be brief", token_count=5),
+        ContextMessage(id=9, role="summary", content="newer summary", token_count=3, compacted_through=6),
+        ContextMessage(id=4, role="summary", content="older summary", token_count=3, compacted_through=2),
+        ContextMessage(id=8, role="assistant", content="eight", token_count=1),
+        ContextMessage(id=7, role="user", content="seven", token_count=1),
+        ContextMessage(id=6, role="assistant", content="six", token_count=1),
+        ContextMessage(id=5, role="user", content="five", token_count=1),
+    ]
+    context = make_assembler().build(compacted, "hello", max_length=10, context_length=100)
+    assert [message.id for message in context.messages] == [1, 9, 7, 8, None]
+    assert context.truncated == 0
+
+def test_unsaved_messages_keep_their_order():
+    # Write-behind turns have no id yet; newest first like the rest of the history
+    pending = [
+        ContextMessage(id=1, role="system", content="be brief", token_count=1),
+        ContextMessage(role="assistant", content="second reply", token_count=1),
+        ContextMessage(role="user", content="second question", token_count=1),
+        ContextMessage(id=3, role="assistant", content="first reply", token_count=1),
+        ContextMessage(id=2, role="user", content="first question", token_count=1),
+    ]
+    context = make_assembler().build(pending, "third question", max_length=10, context_length=100)
+    assert [message.content for message in context.messages] == [
+        "be brief", "first question", "first reply", "second question", "second reply", "third question"
+    ]
+
+class RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self.rows
+
+def test_context_messages_read_pinned_and_newest_rows_with_separate_limits():
+    rows = [
+        SimpleNamespace(id=1, role="system", content="be brief", token_count=5, compacted_through=None),
+        SimpleNamespace(id=9, role="assistant", content="latest", token_count=3, compacted_through=None),
+    ]
+    session = RecordingSession(rows)
+    db = DatabaseService(lambda: session)
+
+    messages = asyncio.run(db.get_context_messages(7, limit=20))
+
+    assert [message.id for message in messages] == [1, 9]
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    # Both halves are ordered by id alone, so each is a LIMITed scan of a (conversation_id, id) index
+    assert sql.count("ORDER BY messages.id DESC \n LIMIT 20") == 2
+    assert "UNION ALL" in sql and "CASE" not in sql
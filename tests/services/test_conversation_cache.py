@@ -0,0 +1,128 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.services.context import ContextMessage
+from src.services.conversation_cache import ConversationCache
+
+class FakeRedis:
+    """The list and key commands ConversationCache uses, in memory"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise RedisConnectionError("redis is down")
+
+    def register_script(self, script):
+        async def append(keys, args):
+            self._check()
+            marker, target, _ = keys
+            if marker not in self.data:
+                return 0
+            self.data.setdefault(target, []).append(args[0])
+            if int(args[1]) > 0:
+                self.data[target] = self.data[target][-int(args[1]):]
+            return 1
+        return append
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.data.pop(key, None)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self):
+        self.redis._check()
+        data, results = self.redis.data, []
+        for name, args in self.commands:
+            if name == "exists":
+                results.append(int(args[0] in data))
+            elif name == "lrange":
+                results.append(list(data.get(args[0], [])))
+            elif name == "delete":
+                for key in args:
+                    data.pop(key, None)
+                results.append(len(args))
+            elif name == "rpush":
+                data.setdefault(args[0], []).extend(args[1:])
+                results.append(len(data[args[0]]))
+            elif name == "set":
+                data[args[0]] = args[1]
+                results.append(True)
+            else:
+                results.append(True)
+        return results
+
+def message(id, role="user"):
+    return ContextMessage(id=id, role=role, content=f"message {id}", token_count=2)
+
+def newest_first(*ids):
+    return [message(id) for id in sorted(ids, reverse=True)]
+
+def test_miss_then_populate_then_hit():
+    cache = ConversationCache(FakeRedis(), size=10, ttl=60)
+
+    async def run():
+        assert await cache.get(1) is None
+        await cache.populate(1, [message(1, role="system")] + newest_first(2, 3))
+        return await cache.get(1)
+    cached = asyncio.run(run())
+
+    assert [(m.id, m.role) for m in cached] == [(1, "system"), (3, "user"), (2, "user")]
+
+def test_append_only_while_cached_and_keeps_the_newest():
+    cache = ConversationCache(FakeRedis(), size=3, ttl=60)
+
+    async def run():
+        await cache.append(1, message(1))
+        assert await cache.get(1) is None
+        await cache.populate(1, newest_first(1, 2, 3))
+        await cache.append(1, message(4))
+        return await cache.get(1)
+    assert [m.id for m in asyncio.run(run())] == [4, 3, 2]
+
+def test_full_tail_is_a_miss_when_more_history_is_wanted():
+    cache = ConversationCache(FakeRedis(), size=3, ttl=60)
+
+    async def run():
+        await cache.populate(1, newest_first(1, 2, 3, 4))
+        await cache.populate(2, newest_first(1, 2))
+        return await cache.get(1, limit=3), await cache.get(1, limit=10), await cache.get(2, limit=10)
+    within_size, beyond_size, short_conversation = asyncio.run(run())
+
+    assert [m.id for m in within_size] == [4, 3, 2]
+    assert beyond_size is None
+    assert [m.id for m in short_conversation] == [2, 1]
+
+def test_redis_errors_fall_back_to_a_miss():
+    redis = FakeRedis()
+    cache = ConversationCache(redis, size=10, ttl=60)
+
+    async def run():
+        await cache.populate(1, newest_first(1, 2))
+        redis.down = True
+        missed = await cache.get(1)
+        await cache.append(1, message(3))
+        await cache.populate(1, newest_first(1, 2, 3))
+        redis.down = False
+        return missed
+    assert asyncio.run(run()) is None
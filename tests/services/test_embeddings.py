@@ -0,0 +1,21 @@
+import numpy as np
+
+from src.services.embeddings import EmbeddingService
+
+def test_hashed_embeddings_tolerate_small_changes():
+    embedder = EmbeddingService(model_name="hashing", dim=256)
+    vectors = embedder.embed([
+        "How do I reset my password?",
+        "how do i reset my  PASSWORD",
+        "What is the capital of France?",
+    ])
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert vectors[0] @ vectors[1] > 0.99
+    assert vectors[0] @ vectors[2] < 0.3
+
+def test_vectors_roundtrip_through_float16_storage():
+    embedder = EmbeddingService(model_name="hashing", dim=64)
+    vector = embedder.embed_one("hello world")
+    restored = embedder.from_bytes(embedder.to_bytes(vector))
+    assert restored.shape == (64,)
+    assert np.allclose(vector, restored, atol=1e-3)
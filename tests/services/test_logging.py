@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import logging.handlers
+import queue
+
+import pytest
+
+from websrc.config.logging_config import DeferredQueueHandler, SamplingFilter, instrument
+
+def make_record(name: str, level: int = logging.INFO, msg: str = "message", args=None) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_rate_limit_drops_excess_and_reports_suppressed_count():
+    now = [0.0]
+    sampling = SamplingFilter(rate_limits={"noisy": 2}, clock=lambda: now[0])
+
+    passed = [sampling.filter(make_record("noisy.child")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert sampling.filter(make_record("quiet"))
+
+    now[0] = 0.5
+    record = make_record("noisy.child")
+    assert sampling.filter(record)
+    assert record.suppressed == 3
+
+def test_sampling_only_applies_below_warning():
+    sampling = SamplingFilter(sample_rates={"chatty": 0.0})
+    assert not sampling.filter(make_record("chatty", logging.INFO))
+    assert sampling.filter(make_record("chatty", logging.ERROR))
+
+def test_queue_handler_defers_formatting_to_listener():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    args = {"count": 1}
+    handler.handle(make_record("app", msg="count=%(count)s", args=(args,)))
+    args["count"] = 2
+
+    record = log_queue.get_nowait()
+    assert record.msg == "count=1" and record.args is None
+
+def test_instrument_is_a_no_op_when_disabled():
+    def work():
+        return 1
+
+    assert instrument(work, enabled=False) is work
+
+def test_instrument_logs_duration_and_errors(caplog):
+    class Service:
+        @instrument(enabled=True)
+        async def fail(self):
+            raise ValueError("boom")
+
+        @instrument(enabled=True)
+        def succeed(self):
+            return "ok"
+
+    with caplog.at_level(logging.DEBUG, logger=__name__):
+        assert Service().succeed() == "ok"
+        with pytest.raises(ValueError):
+            asyncio.run(Service().fail())
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0].endswith("Service.succeed")
+    assert "Exiting" in messages[1] and messages[1].endswith("ms")
+    assert "Error in" in messages[-1] and "Service.fail" in messages[-1]
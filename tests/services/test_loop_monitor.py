@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from src.services.loop_monitor import EventLoopMonitor
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+def test_stall_captures_blocking_stack_once_per_capture_interval():
+    monitor = EventLoopMonitor(interval=0.01, threshold=0.05, capture_interval=60, debug=False)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+    asyncio.run(run())
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 2
+    assert stats["max_lag_seconds"] >= 0.25
+    # The second stall falls inside the capture interval
+    assert len(stats["recent_captures"]) == 1
+    assert "block_the_loop" in "".join(stats["recent_captures"][0]["stack"])
+    assert not stats["running"]
+
+def test_idle_loop_records_no_stalls():
+    monitor = EventLoopMonitor(interval=0.01, threshold=0.1, capture_interval=0, debug=False)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+    asyncio.run(run())
+
+    assert monitor.stats()["stalls"] == 0 and not monitor.captures
+
+def test_stall_counts_from_threshold_not_threshold_plus_interval():
+    monitor = EventLoopMonitor(interval=0.2, threshold=0.05, capture_interval=0, debug=False)
+
+    async def run():
+        monitor.start()
+        # Let the monitor task start its sleep, then hold the loop 0.15s past its wake-up
+        await asyncio.sleep(0)
+        block_the_loop(0.35)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+    asyncio.run(run())
+
+    assert monitor.stats()["stalls"] == 1
+    assert monitor.captures[0]["stalled_seconds"] < 0.2
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from websrc.api.middleware.telemetry import setup_metrics
+from websrc.config.settings import settings
+from websrc.models.pydantic import TextGenerationRequest
+
+@pytest.fixture(scope="module")
+def reader():
+    reader = InMemoryMetricReader()
+    setup_metrics(readers=[reader])
+    return reader
+
+def collect(reader):
+    points = {}
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                points[metric.name] = list(metric.data.data_points)
+    return points
+
+def test_generation_records_latency_tokens_and_queue_wait(reader):
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt="count these prompt tokens", max_length=50)
+    asyncio.run(service.generate_text_async(request))
+
+    async def stream():
+        return [piece async for piece in service.stream_text_async(request, cancelled=threading.Event())]
+    pieces = asyncio.run(stream())
+
+    points = collect(reader)
+    model = {"model": settings.MODEL_NAME}
+    latency = next(p for p in points["llm.request_latency"] if dict(p.attributes) == model)
+    assert latency.count >= 2
+    assert latency.explicit_bounds[0] == 0.005
+    assert next(p for p in points["llm.time_to_first_token"] if dict(p.attributes) == model).count >= 1
+    assert next(p for p in points["llm.inter_token_latency"] if dict(p.attributes) == model).count >= len(pieces) - 1
+    assert next(p for p in points["llm.queue_wait"] if dict(p.attributes) == model).count >= 2
+    assert next(p for p in points["llm.generated_tokens"] if dict(p.attributes) == model).value > 0
+    assert "llm.executor.utilization" in points
+    assert sum(p.value for p in points["llm.requests_in_flight"]) == 0
@@ -0,0 +1,48 @@
+import pytest
+from src.services.model_router import ModelRouter
+from websrc.api.exceptions.exceptions import ModelConfigurationError
+
+RULES = [
+    {"name": "premium", "model_name": "llama-2-13b", "tenants": ["acme"]},
+    {"name": "overload", "model_name": "gpt-neo-125m", "min_queue_depth": 8},
+    {"name": "short", "model_name": "gpt-neo-1.3b", "max_prompt_tokens": 256, "max_length": 200,
+     "escalate_to": "falcon-40b-instruct"},
+]
+
+def make_router():
+    return ModelRouter(rules=RULES, default_model="falcon-40b-instruct", confidence_threshold=0.5)
+
+def test_first_matching_rule_wins():
+    router = make_router()
+    assert router.route(prompt_tokens=10, max_length=100, tenant="acme").route == "premium"
+    assert router.route(prompt_tokens=10, max_length=100, queue_depth=9).model_name == "gpt-neo-125m"
+    assert router.route(prompt_tokens=10, max_length=100).model_name == "gpt-neo-1.3b"
+
+def test_falls_back_to_default_model():
+    decision = make_router().route(prompt_tokens=4096, max_length=100)
+    assert decision.route == ModelRouter.DEFAULT_ROUTE
+    assert decision.model_name == "falcon-40b-instruct"
+
+def test_escalates_only_on_low_confidence():
+    router = make_router()
+    decision = router.route(prompt_tokens=10, max_length=100)
+    assert not router.should_escalate(decision, None)
+    assert not router.should_escalate(decision, 0.9)
+    assert router.should_escalate(decision, 0.1)
+    escalated = router.escalate(decision)
+    assert escalated.model_name == "falcon-40b-instruct"
+    assert not router.should_escalate(escalated, 0.1)
+
+def test_records_per_route_latency():
+    router = make_router()
+    decision = router.route(prompt_tokens=10, max_length=100)
+    router.record(decision, 0.2)
+    router.record(decision, 0.4)
+    stats = router.stats()["short"]
+    assert stats["requests"] == 2
+    assert stats["avg_latency"] == pytest.approx(0.3)
+    assert stats["max_latency"] == pytest.approx(0.4)
+
+def test_rejects_unknown_models():
+    with pytest.raises(ModelConfigurationError):
+        ModelRouter(rules=[{"model_name": "not-a-model"}])
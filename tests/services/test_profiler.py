@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from src.services.profiler import RequestProfiler
+from websrc.api.exceptions.exceptions import ProfilingError
+from websrc.models.pydantic import TextGenerationRequest
+
+def test_profiles_next_requests_with_route_and_model(tmp_path, monkeypatch):
+    import src.services.llm_generate as llm_generate
+    profiler = RequestProfiler(interval=0.001, max_seconds=10, output_dir=str(tmp_path))
+    monkeypatch.setattr(llm_generate, "profiler", profiler)
+    service = LLMGenerate(ModelFactory())
+    handler = service.handler
+    generate = handler.generate
+    # Slow enough for the sampler to see the executor thread at work
+    monkeypatch.setattr(handler, "generate", lambda prompt, **kwargs: time.sleep(0.05) or generate(prompt, **kwargs))
+
+    async def run():
+        session = profiler.start(requests=1)
+        with profiler.request("POST /generate/text/") as profiled:
+            assert profiled
+            await service.generate_text_async(TextGenerationRequest(prompt="profile me", max_length=10))
+        with profiler.request("POST /generate/text/") as profiled:
+            assert not profiled
+        profiler._thread.join(timeout=5)
+        return session
+    session = asyncio.run(run())
+
+    assert not profiler.active and profiler.get(session.id) is session
+    assert session.samples > 0 and session.routes == {"POST /generate/text/": 1}
+    executor_stacks = [stack for stack in session.stacks if f"model={service.model_config.model_name};executor" in stack]
+    assert executor_stacks and all(stack.startswith("route=POST /generate/text/;") for stack in executor_stacks)
+    assert (tmp_path / f"profile-{session.id}.collapsed").read_text() == session.collapsed()
+
+def test_only_one_bounded_session_runs_at_a_time():
+    profiler = RequestProfiler(interval=0.001, max_seconds=1, max_requests=5, output_dir="")
+    with pytest.raises(ProfilingError):
+        profiler.start(requests=6)
+    with pytest.raises(ProfilingError):
+        profiler.start()
+
+    session = profiler.start(seconds=0.5)
+    with pytest.raises(ProfilingError) as error:
+        profiler.start(seconds=0.5)
+    assert error.value.code == 409
+    assert profiler.stop() is session
+    assert not profiler.active and session.finished_at is not None
@@ -0,0 +1,55 @@
+import time
+
+from src.services.embeddings import EmbeddingService
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from src.services.semantic_cache import SemanticResponseCache
+from websrc.models.pydantic import TextGenerationRequest
+
+def _cache(**kwargs):
+    return SemanticResponseCache(EmbeddingService(model_name="hashing", dim=256), threshold=0.9, **kwargs)
+
+def test_near_duplicate_prompts_hit_within_namespace():
+    cache = _cache(size=10, ttl=60, sample_rate=0)
+    namespace = cache.namespace("gpt-neo-125m", 100, {"temperature": 0.7})
+    cache.store(cache.embed("How do I reset my password?"), namespace, "How do I reset my password?", "Use the link.")
+
+    hit = cache.lookup(cache.embed("how do I reset my  Password"), namespace)
+    assert hit is not None and hit.response == "Use the link."
+    assert cache.lookup(cache.embed("What is the capital of France?"), namespace) is None
+    other = cache.namespace("gpt-neo-125m", 100, {"temperature": 0.1})
+    assert cache.lookup(cache.embed("How do I reset my password?"), other) is None
+    assert cache.stats()["hits"] == 1
+
+def test_entries_expire_and_evict_least_recently_used():
+    cache = _cache(size=2, ttl=0.05, sample_rate=0)
+    namespace = cache.namespace("m", 10, {})
+    for prompt in ("first prompt here", "second prompt here", "third prompt here"):
+        cache.store(cache.embed(prompt), namespace, prompt, prompt.upper())
+    assert cache.lookup(cache.embed("first prompt here"), namespace) is None
+    assert cache.stats()["evicted"] == 1
+
+    time.sleep(0.06)
+    assert cache.lookup(cache.embed("third prompt here"), namespace) is None
+    assert cache.stats()["expired"] == 1
+
+def test_generate_text_serves_near_duplicates_from_cache():
+    cache = _cache(size=10, ttl=60, sample_rate=0)
+    service = LLMGenerate(ModelFactory(), response_cache=cache)
+    first = service.generate_text(TextGenerationRequest(prompt="Tell me about the weather today", max_length=50))
+    second = service.generate_text(TextGenerationRequest(prompt="tell me about the weather today!", max_length=50))
+    assert second == first
+    third = service.generate_text(TextGenerationRequest(prompt="tell me about the weather today!", max_length=60))
+    assert third != first
+
+def test_tenants_and_conversation_prompts_do_not_share_answers():
+    cache = _cache(size=10, ttl=60, sample_rate=0)
+    service = LLMGenerate(ModelFactory(), response_cache=cache)
+    first = service.generate_text(TextGenerationRequest(prompt="Tell me about the weather today", max_length=50, tenant="a"))
+    service.generate_text(TextGenerationRequest(prompt="Tell me about the weather today", max_length=50, tenant="b"))
+    assert cache.stats()["hits"] == 0
+
+    service.generate_text(TextGenerationRequest(
+        prompt="Tell me about the weather today", max_length=50, tenant="a", cacheable=False
+    ))
+    assert cache.stats()["hits"] == 0 and cache.stats()["lookups"] == 2
+    assert service.generate_text(TextGenerationRequest(prompt="Tell me about the weather today", max_length=50, tenant="a")) == first
@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from websrc.models.pydantic import TextGenerationRequest
+
+def _collect(service, request, cancel_after=None):
+    async def run():
+        cancelled = threading.Event()
+        pieces = []
+        async for piece in service.stream_text_async(request, cancelled=cancelled):
+            pieces.append(piece)
+            if cancel_after is not None and len(pieces) == cancel_after:
+                cancelled.set()
+        return pieces
+    return asyncio.run(run())
+
+def test_stream_pieces_join_to_the_full_output():
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt="stream this reply please", max_length=50)
+    pieces = _collect(service, request)
+    assert len(pieces) > 1
+    assert "".join(pieces) == service.generate_text(request)
+    assert service.queue_depth == 0
+
+def test_cancel_stops_the_stream():
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt=" ".join(["word"] * 200), max_length=50)
+    pieces = _collect(service, request, cancel_after=1)
+    assert len(pieces) < 200
@@ -0,0 +1,43 @@
+from src.services.tokenizer import TokenizerService
+
+class FakeTokenizer:
+    """Counts how often the underlying tokenizer is invoked"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, add_special_tokens=False):
+        self.calls.append(list(texts))
+        return {"input_ids": [[len(word) for word in text.split()] for text in texts]}
+
+def test_fallback_tokenizer_is_deterministic():
+    tokenizer = TokenizerService()
+    assert tokenizer.encode("Hello, world!") == TokenizerService().encode("Hello, world!")
+    assert tokenizer.count_tokens("Hello, world!") == 4
+
+def test_encode_uses_lru_cache():
+    fake = FakeTokenizer()
+    tokenizer = TokenizerService(tokenizer=fake, cache_size=2)
+    tokenizer.encode("a b")
+    tokenizer.encode("a b")
+    assert len(fake.calls) == 1
+    tokenizer.encode("c")
+    tokenizer.encode("d")
+    tokenizer.encode("a b")
+    assert len(fake.calls) == 4
+    assert tokenizer.cache_info()["size"] == 2
+
+def test_batch_only_tokenizes_misses_once():
+    fake = FakeTokenizer()
+    tokenizer = TokenizerService(tokenizer=fake)
+    tokenizer.encode("cached text")
+    counts = tokenizer.count_tokens_batch(["cached text", "new", "new", "other words here"])
+    assert counts == [2, 1, 1, 3]
+    assert fake.calls[-1] == ["new", "other words here"]
+
+def test_prefix_is_cached_separately():
+    fake = FakeTokenizer()
+    tokenizer = TokenizerService(tokenizer=fake)
+    system = "You are a helpful assistant"
+    assert tokenizer.count_tokens("hi", prefix=system) == 6
+    assert tokenizer.count_tokens_batch(["hi", "hello there"], prefix=system) == [6, 7]
+    assert sum(system in call for call in fake.calls) == 1
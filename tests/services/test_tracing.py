@@ -0,0 +1,67 @@
+import asyncio
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from src.services.tracing import TailSamplingSpanProcessor
+from websrc.models.pydantic import TextGenerationRequest
+
+def make_tracer(**options):
+    exporter = InMemorySpanExporter()
+    sampler = TailSamplingSpanProcessor(SimpleSpanProcessor(exporter), **options)
+    provider = TracerProvider()
+    provider.add_span_processor(sampler)
+    return provider.get_tracer(__name__), sampler, exporter
+
+def test_tail_sampling_keeps_slow_and_failed_traces_only():
+    tracer, sampler, exporter = make_tracer(head_rate=0.0, slow_threshold=60.0)
+    with tracer.start_as_current_span("fast"):
+        with tracer.start_as_current_span("child"):
+            pass
+    with tracer.start_as_current_span("failed"):
+        with tracer.start_as_current_span("child") as child:
+            child.set_status(Status(StatusCode.ERROR))
+    with tracer.start_as_current_span("slow", start_time=0):
+        pass
+
+    assert sorted(span.name for span in exporter.get_finished_spans()) == ["child", "failed", "slow"]
+    stats = sampler.stats()
+    assert stats["traces_dropped"] == 1 and stats["kept_error"] == 1 and stats["kept_slow"] == 1
+    assert stats["buffered_traces"] == 0
+    assert stats["processing_us_per_span"] > 0
+
+def test_tail_sampling_bounds_buffered_spans():
+    tracer, sampler, exporter = make_tracer(head_rate=1.0, slow_threshold=60.0, max_traces=4, max_spans_per_trace=3)
+    with tracer.start_as_current_span("root"):
+        for _ in range(10):
+            with tracer.start_as_current_span("child"):
+                pass
+
+    assert len(exporter.get_finished_spans()) == 4
+    assert sampler.stats()["spans_overflowed"] == 7
+
+def test_generation_stages_are_children_of_the_request_span():
+    exporter = InMemorySpanExporter()
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        trace.set_tracer_provider(provider := TracerProvider())
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    service = LLMGenerate(ModelFactory())
+    request = TextGenerationRequest(prompt="trace every stage", max_length=20)
+
+    async def run():
+        with provider.get_tracer(__name__).start_as_current_span("request"):
+            await service.generate_text_async(request)
+    asyncio.run(run())
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    root = spans["request"]
+    for name in ("llm.admission", "llm.queue_wait", "llm.tokenize", "llm.prefill", "llm.decode", "llm.detokenize"):
+        assert spans[name].context.trace_id == root.context.trace_id, name
+    assert spans["llm.tokenize"].attributes["llm.prompt_tokens"] == 3
+    assert spans["llm.decode"].attributes["llm.generated_tokens"] > 0
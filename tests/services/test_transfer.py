@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime
+
+from src.models.database import Conversation, Message, User
+from src.services.transfer import ConversationTransfer, _iter_lines
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+async def _collect(chunks):
+    return [item async for item in _iter_lines(chunks)]
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    lines = asyncio.run(_collect(_chunks(b'{"a":', b'1}\n\n{"b"', b':2}')))
+    assert lines == [(1, b'{"a":1}'), (3, b'{"b":2}')]
+
+def test_decode_row_matches_copy_types():
+    transfer = ConversationTransfer(session_factory=None, batch_size=10)
+    created_at = datetime(2024, 1, 2, 3, 4, 5)
+    conversation = transfer._decode_row(Conversation.__table__, {
+        "id": 1,
+        "user_id": 2,
+        "title": "t",
+        "model_type": "text",
+        "model_name": "gpt-neo-125m",
+        "created_at": transfer._encode(created_at),
+    })
+    assert conversation == (1, 2, "t", "TEXT", "gpt-neo-125m", created_at, None, None)
+
+    message = transfer._decode_row(Message.__table__, {"id": 3, "generation_info": {"model": "x"}})
+    assert '{"model": "x"}' in message
+
+def test_export_leaves_out_api_keys():
+    transfer = ConversationTransfer(session_factory=None, batch_size=10)
+    query = transfer._export_query(User.__table__, user_id=2)
+    assert "api_key" not in {column.name for column in query.selected_columns}
+    assert "username" in {column.name for column in query.selected_columns}
@@ -0,0 +1,36 @@
+import asyncio
+
+from src.models.database import UserModelConfig
+from src.models.enum import ModelType
+from src.services.user_context import UserContext, UserContextResolver, hash_api_key, merge_model_configs
+
+def test_model_specific_parameters_override_type_defaults():
+    merged = merge_model_configs([
+        UserModelConfig(model_type=ModelType.TEXT, model_name=None, parameters={"temperature": 0.2, "top_k": 10}),
+        UserModelConfig(model_type=ModelType.TEXT, model_name="gpt-neo-125m", parameters={"temperature": 0.9}),
+    ])
+    context = UserContext(user_id=1, generation_config=merged)
+    assert context.parameters_for(ModelType.TEXT, "gpt-neo-125m") == {"temperature": 0.9, "top_k": 10}
+    assert context.parameters_for(ModelType.TEXT, "gpt-neo-2.7b") == {"temperature": 0.2, "top_k": 10}
+    assert context.model_parameters(ModelType.IMAGE) == {}
+
+def test_resolver_caches_and_evicts_by_user():
+    resolver = UserContextResolver(session_factory=None, size=10, ttl=60, negative_ttl=60)
+    users = {hash_api_key("good"): UserContext(user_id=7, username="alice")}
+    loads = []
+
+    async def load(key_hash):
+        loads.append(key_hash)
+        return users.get(key_hash)
+    resolver._load = load
+
+    async def scenario():
+        assert (await resolver.resolve("good")).user_id == 7
+        assert (await resolver.resolve("good")).user_id == 7
+        assert await resolver.resolve("bad") is None
+        assert await resolver.resolve("bad") is None
+        assert len(loads) == 2
+        await resolver.invalidate(7)
+        await resolver.resolve("good")
+        assert len(loads) == 3
+    asyncio.run(scenario())
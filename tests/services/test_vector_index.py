@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.services.vector_index import VectorIndex
+
+def _unit_vectors(count, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dim))
+    vectors = centers[rng.integers(0, 20, count)] + 0.3 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+def test_exact_search_returns_best_matches_first():
+    vectors = _unit_vectors(100, 16)
+    index = VectorIndex(16)
+    index.add(range(100), vectors)
+    hits = index.search(vectors[42], 3)
+    assert hits[0][0] == 42
+    assert hits[0][1] >= hits[1][1] >= hits[2][1]
+
+    index.remove([42])
+    assert 42 not in [item_id for item_id, _ in index.search(vectors[42], 3)]
+    assert len(index) == 99
+
+def test_trained_index_matches_exact_search():
+    vectors = _unit_vectors(2000, 32)
+    index = VectorIndex(32, ann_threshold=1000, nprobe=8)
+    index.add(range(2000), vectors)
+    exact = [index.search(vector, 5) for vector in vectors[:50]]
+    assert index.needs_training
+    index.train()
+    assert index.is_trained and not index.needs_training
+
+    index.add([5000], vectors[:1])
+    approximate = [index.search(vector, 5) for vector in vectors[:50]]
+    recall = np.mean([
+        len({i for i, _ in e} & {i for i, _ in a}) / 5 for e, a in zip(exact, approximate)
+    ])
+    assert recall >= 0.9
+    assert 5000 in [item_id for item_id, _ in index.search(vectors[0], 2)]
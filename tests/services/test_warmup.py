@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+from src.services import container as container_module
+from src.services.llm_generate import LLMGenerate, ModelFactory
+from src.services.warmup import ModelWarmup
+from websrc.config.settings import settings
+
+class RecordingFactory(ModelFactory):
+    def __init__(self):
+        super().__init__()
+        self.handlers = []
+
+    def get_handler(self, model_config):
+        handler = super().get_handler(model_config)
+        calls = []
+        generate = handler.generate
+        handler.generate = lambda prompt, **kwargs: calls.append((len(prompt.split()), kwargs.get("max_length"))) or generate(prompt, **kwargs)
+        self.handlers.append((model_config.model_name, calls))
+        return handler
+
+def test_warmup_loads_and_warms_configured_models(monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_MODELS", ["gpt-neo-125m"])
+    factory = RecordingFactory()
+    warmup = ModelWarmup(lambda: LLMGenerate(factory), shapes=[[16, 8], [4000, 64]])
+    assert not warmup.ready
+    assert warmup.status()["progress"] == 0.0
+
+    asyncio.run(warmup.run())
+
+    status = warmup.status()
+    assert warmup.ready and status["progress"] == 1.0
+    assert list(status["models"]) == [settings.MODEL_NAME, "gpt-neo-125m"]
+    assert all(model["loaded"] and model["warmed"] == "2/2" for model in status["models"].values())
+    # Oversized shapes are clipped to the context window
+    assert factory.handlers[0][1] == [(16, 8), (2048 - 64, 64)]
+
+def test_warmup_load_failure_leaves_replica_not_ready():
+    def failing_provider():
+        raise RuntimeError("out of memory")
+
+    warmup = ModelWarmup(failing_provider, shapes=[[16, 8]])
+    asyncio.run(warmup.run())
+
+    status = warmup.status()
+    assert not warmup.ready
+    assert status["status"] == "failed"
+    assert status["models"][settings.MODEL_NAME]["error"] == "out of memory"
+
+def test_warmup_prompts_are_shortened_when_words_split_into_several_tokens(monkeypatch):
+    factory = RecordingFactory()
+    service = LLMGenerate(factory)
+    tokenizer = service.get_tokenizer()
+    monkeypatch.setattr(tokenizer, "count_tokens", lambda text, prefix=None: 2 * len(text.split()))
+
+    asyncio.run(ModelWarmup(lambda: service, shapes=[[16, 8]]).run())
+
+    assert factory.handlers[0][1] == [(8, 8)]
+
+def test_llm_service_is_built_once_across_threads(monkeypatch):
+    built = []
+
+    class SlowService:
+        def __init__(self, factory, response_cache=None):
+            time.sleep(0.05)
+            built.append(self)
+
+    monkeypatch.setattr(container_module, "LLMGenerate", SlowService)
+    services = container_module.ServiceContainer()
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(services.llm_service)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1 and all(service is built[0] for service in seen)
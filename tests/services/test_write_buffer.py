@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+from src.services.write_buffer import MessageWriteBuffer
+
+class FakeResult:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return iter(self.ids)
+
+class FakeDatabase:
+    """Session factory that assigns ids, optionally failing or stalling each insert"""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.batches = []
+        self.attempts = 0
+        self.next_id = 1
+
+    def __call__(self):
+        return FakeSession(self)
+
+class FakeSession:
+    def __init__(self, database):
+        self.database = database
+        self.rows = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows):
+        self.database.attempts += 1
+        await asyncio.sleep(self.database.delay)
+        if self.database.failures:
+            self.database.failures -= 1
+            raise ConnectionError("connection reset")
+        self.rows = rows
+        ids = list(range(self.database.next_id, self.database.next_id + len(rows)))
+        self.database.next_id += len(rows)
+        return FakeResult(ids)
+
+    async def commit(self):
+        self.database.batches.append(self.rows)
+
+def row(n):
+    return {"conversation_id": 1, "role": "user", "content": f"message {n}"}
+
+def test_full_batch_flushes_without_waiting_for_the_interval():
+    database = FakeDatabase()
+    buffer = MessageWriteBuffer(database, batch_size=3, flush_interval=10, max_retries=0)
+
+    async def run():
+        futures = [buffer.enqueue(row(n)) for n in range(3)]
+        started = time.perf_counter()
+        ids = await asyncio.gather(*futures)
+        elapsed = time.perf_counter() - started
+        await buffer.stop()
+        return ids, elapsed
+    ids, elapsed = asyncio.run(run())
+
+    assert ids == [1, 2, 3]
+    assert elapsed < 1
+    assert [len(batch) for batch in database.batches] == [3]
+
+def test_partial_batch_flushes_after_the_interval():
+    database = FakeDatabase()
+    buffer = MessageWriteBuffer(database, batch_size=100, flush_interval=0.05, max_retries=0)
+
+    async def run():
+        future = buffer.enqueue(row(0))
+        await asyncio.sleep(0.01)
+        assert not future.done()
+        message_id = await asyncio.wait_for(future, timeout=1)
+        await buffer.stop()
+        return message_id
+    assert asyncio.run(run()) == 1
+    assert len(database.batches) == 1
+
+def test_failed_insert_is_retried_then_reported():
+    database = FakeDatabase(failures=1)
+    buffer = MessageWriteBuffer(database, batch_size=1, flush_interval=10, max_retries=2)
+
+    async def run():
+        message_id = await asyncio.wait_for(buffer.enqueue(row(0)), timeout=2)
+        database.failures = 5
+        failed = buffer.enqueue(row(1))
+        try:
+            await asyncio.wait_for(failed, timeout=2)
+        except ConnectionError:
+            pass
+        await buffer.stop()
+        return message_id, failed
+    message_id, failed = asyncio.run(run())
+
+    assert message_id == 1
+    assert isinstance(failed.exception(), ConnectionError)
+    assert database.attempts == 2 + 3
+
+def test_stop_waits_for_the_flush_in_progress_and_drains_the_queue():
+    database = FakeDatabase(delay=0.1)
+    buffer = MessageWriteBuffer(database, batch_size=2, flush_interval=10, max_retries=0)
+
+    async def run():
+        inflight = [buffer.enqueue(row(n)) for n in range(2)]
+        await asyncio.sleep(0.02)
+        queued = buffer.enqueue(row(2))
+        await buffer.stop()
+        return inflight + [queued]
+    futures = asyncio.run(run())
+
+    assert [future.result() for future in futures] == [1, 2, 3]
+    assert [len(batch) for batch in database.batches] == [2, 1]
@@ -26,4 +26,14 @@ class ImageGenerationError(BaseAppError):
     def __init__(self, message: str) -> None:
         super().__init__(message, code=500)
 
+class DataImportError(BaseAppError):
+    def __init__(self, message: str) -> None:
+        super().__init__(message, code=400)
+
+class AuthenticationError(BaseAppError):
+    def __init__(self, message: str) -> None:
+        super().__init__(message, code=401)
 
+class ProfilingError(BaseAppError):
+    def __init__(self, message: str, code: int = 400) -> None:
+        super().__init__(message, code=code)
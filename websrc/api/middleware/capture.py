@@ -0,0 +1,57 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.traffic_capture import TrafficRecorder
+from websrc.config.settings import settings
+
+class TrafficCaptureMiddleware:
+    """Records the shape, arrival time and latency of sampled HTTP requests for later replay.
+
+    The request body is copied as the app reads it and parsed only after the
+    response has been sent; bodies over ``CAPTURE_MAX_BODY_BYTES`` are
+    recorded without their fields.
+    """
+
+    def __init__(self, app: ASGIApp, recorder: TrafficRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.recorder.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.time()
+        started = time.perf_counter()
+        chunks = []
+        size = 0
+        status = 500
+
+        async def capturing_receive() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= settings.CAPTURE_MAX_BODY_BYTES:
+                size += len(message.get("body", b""))
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, capturing_receive, capturing_send)
+        finally:
+            route = scope.get("route")
+            content_type = dict(scope["headers"]).get(b"content-type", b"").decode("latin-1")
+            self.recorder.record(
+                arrived=arrived,
+                route=f"{scope['method']} {route.path if route is not None else scope['path']}",
+                status=status,
+                latency=time.perf_counter() - started,
+                content_type=content_type,
+                body=b"".join(chunks) if size <= settings.CAPTURE_MAX_BODY_BYTES else b""
+            )
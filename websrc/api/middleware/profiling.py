@@ -0,0 +1,31 @@
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.services.profiler import profiler
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route ``scope`` will be dispatched to, e.g. ``/conversations/{conversation_id}/messages``.
+
+    Matched up front because the label is needed while the handler runs, before
+    routing would set ``scope["route"]``; unmatched paths keep their raw path.
+    """
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return scope["path"]
+
+class ProfilingMiddleware:
+    """Claims requests for the running profiling session so their stacks are tagged with the route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Profiling admin calls are never profiled themselves
+        if not profiler.active or scope["type"] != "http" or scope["path"].startswith("/profiling/"):
+            await self.app(scope, receive, send)
+            return
+        with profiler.request(f"{scope['method']} {route_template(scope)}"):
+            await self.app(scope, receive, send)
@@ -1,16 +1,36 @@
 import os
+from typing import Optional
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 
-def setup_telemetry(app):
-    resource = Resource(
+from websrc.config.settings import settings
+from src.services.tracing import TailSamplingSpanProcessor
+
+# Set by setup_telemetry when spans are exported; reports sampling decisions and cost
+tail_sampler: Optional[TailSamplingSpanProcessor] = None
+
+def _span_exporter():
+    # Exporters pull in gRPC or thrift, so only the configured one is imported
+    if settings.TELEMETRY_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(
+            endpoint=f"{os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://otel-collector:4317')}"
+        )
+    if settings.TELEMETRY_EXPORTER == "jaeger":
+        from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+        return JaegerExporter(
+            agent_host_name=settings.JAEGER_AGENT_HOST,
+            agent_port=settings.JAEGER_AGENT_PORT
+        )
+    return None
+
+def _resource() -> Resource:
+    return Resource(
         attributes={
             "service.name": "locaLLM",
             "service.version": "1.1.0",
@@ -18,19 +38,66 @@ def setup_telemetry(app):
         }
     )
 
-    provider = TracerProvider(resource=resource)
-    trace.set_tracer_provider(provider)
+def _metric_reader():
+    # Like span exporters, readers are imported only when selected
+    if settings.METRICS_EXPORTER == "prometheus":
+        from opentelemetry.exporter.prometheus import PrometheusMetricReader
+        from prometheus_client import start_http_server
+        start_http_server(settings.METRICS_PORT)
+        return PrometheusMetricReader()
+    if settings.METRICS_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        return PeriodicExportingMetricReader(
+            OTLPMetricExporter(
+                endpoint=f"{os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://otel-collector:4317')}"
+            ),
+            export_interval_millis=settings.METRICS_EXPORT_INTERVAL * 1000
+        )
+    return None
 
-    otlp_exporter = OTLPSpanExporter(
-        endpoint=f"{os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://otel-collector:4317')}"
-    )
+def setup_metrics(readers=None) -> None:
+    """Install the meter provider the instruments in ``src.services.metrics`` report to"""
+    from opentelemetry import metrics as otel_metrics
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+    from src.services.metrics import HISTOGRAM_BUCKETS
 
-    provider.add_span_processor(
-        BatchSpanProcessor(otlp_exporter)
-    )
+    if readers is None:
+        reader = _metric_reader()
+        readers = [reader] if reader is not None else []
+    if not readers:
+        return
+    views = [
+        View(instrument_name=name, aggregation=ExplicitBucketHistogramAggregation(boundaries))
+        for name, boundaries in HISTOGRAM_BUCKETS.items()
+    ]
+    otel_metrics.set_meter_provider(MeterProvider(resource=_resource(), metric_readers=readers, views=views))
+
+def setup_telemetry(app):
+    global tail_sampler
+    resource = _resource()
+
+    # Spans are recorded for TRACE_RECORD_RATE of requests; the tail sampler then exports
+    # the head-sampled fraction plus every slow or failed trace among them
+    provider = TracerProvider(resource=resource, sampler=ParentBased(TraceIdRatioBased(settings.TRACE_RECORD_RATE)))
+    trace.set_tracer_provider(provider)
+
+    exporter = _span_exporter()
+    if exporter is not None:
+        tail_sampler = TailSamplingSpanProcessor(
+            BatchSpanProcessor(exporter),
+            head_rate=settings.TRACE_HEAD_SAMPLE_RATE,
+            slow_threshold=settings.TRACE_SLOW_THRESHOLD,
+            max_traces=settings.TRACE_MAX_BUFFERED_TRACES,
+            max_spans_per_trace=settings.TRACE_MAX_SPANS_PER_TRACE
+        )
+        provider.add_span_processor(tail_sampler)
 
     FastAPIInstrumentor.instrument_app(app)
 
     # Instrumentations
     LoggingInstrumentor().instrument(set_logging_format=True)
-    RequestsInstrumentor().instrument()
\ No newline at end of file
+    if settings.TELEMETRY_INSTRUMENT_REQUESTS:
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        RequestsInstrumentor().instrument()
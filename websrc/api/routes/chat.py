@@ -0,0 +1,93 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Optional
+import asyncio
+import logging
+import threading
+
+from src.models.pydantic import ChatFrame
+from src.services.chat_session import ChatSession
+from src.services.container import container
+from websrc.api.exceptions.exceptions import AuthenticationError
+from websrc.api.utility.auth import resolve_user_context
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+async def _stream_reply(websocket: WebSocket, session: ChatSession, frame: ChatFrame, cancelled: threading.Event) -> None:
+    await websocket.send_json({"type": "start"})
+    try:
+        async for piece in session.stream_turn(frame.content, frame.max_length, frame.parameters, cancelled):
+            await websocket.send_json({"type": "token", "text": piece})
+        await websocket.send_json({
+            "type": "end",
+            "cancelled": cancelled.is_set(),
+            "prompt_tokens": session.last_context.prompt_tokens,
+            "truncated": session.last_context.truncated
+        })
+    except WebSocketDisconnect:
+        cancelled.set()
+    except Exception as e:
+        logger.exception("Chat turn failed")
+        await websocket.send_json({"type": "error", "detail": str(e)})
+
+@router.websocket("/ws/conversations/{conversation_id}")
+async def conversation_socket(websocket: WebSocket, conversation_id: int):
+    """Chat on one conversation over a WebSocket.
+
+    Client frames are ``{"type": "turn", "content": ..., "max_length": ..., "parameters": {...}}``,
+    ``{"type": "cancel"}`` and ``{"type": "ping"}``. A turn is answered with ``start``,
+    one ``token`` frame per generated piece and ``end``; ``cancel`` stops the
+    reply in progress. One turn runs at a time.
+    """
+    try:
+        user = await resolve_user_context(websocket)
+    except AuthenticationError as e:
+        await websocket.close(code=4401, reason=e.message)
+        return
+    llm_service = container.llm_service
+    if not llm_service:
+        await websocket.close(code=1013, reason="LLM Service is disabled.")
+        return
+    conversation = await container.db_service.get_conversation(conversation_id)
+    if conversation is None or conversation.user_id != user.user_id:
+        await websocket.close(code=4404, reason="Conversation not found")
+        return
+    await container.db_service.ensure_hot(conversation)
+
+    await websocket.accept()
+    session = ChatSession(conversation_id, container.db_service, container.context_assembler, llm_service, user)
+    await websocket.send_json({"type": "ready", "conversation_id": conversation_id, "history": await session.load()})
+
+    generation: Optional[asyncio.Task] = None
+    cancelled = threading.Event()
+    try:
+        while True:
+            try:
+                frame = ChatFrame.model_validate(await websocket.receive_json())
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid frame: {e}"})
+                continue
+
+            busy = generation is not None and not generation.done()
+            if frame.type == "ping":
+                await websocket.send_json({"type": "pong"})
+            elif frame.type == "cancel":
+                if busy:
+                    cancelled.set()
+            elif busy:
+                await websocket.send_json({"type": "error", "detail": "A reply is already in progress"})
+            elif not frame.content:
+                await websocket.send_json({"type": "error", "detail": "A turn needs content"})
+            else:
+                cancelled = threading.Event()
+                generation = asyncio.create_task(_stream_reply(websocket, session, frame, cancelled))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if generation is not None and not generation.done():
+            # Stop the model and let the partial reply be stored
+            cancelled.set()
+            try:
+                await generation
+            except Exception as e:
+                logger.warning(f"Chat turn ended with the connection: {e}")
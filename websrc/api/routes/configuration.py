@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, Request, Form, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse
 import logging
 from websrc.config.settings import settings
 from src.models.enum import TextModelName, ImageModelName
 from websrc.api.exceptions.exceptions import ModelConfigurationError
 from fastapi.templating import Jinja2Templates
 import os
-from websrc.config.logging_config import log_async_function
+from datetime import datetime, timedelta
+from typing import Literal
+from websrc.config.logging_config import instrument
+from src.services.container import container
+from websrc.api.middleware import telemetry
+from websrc.api.utility.auth import require_admin_token
+from websrc.api.routes.profiling import require_profiling_token
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -40,7 +46,7 @@ async def configure_model(
     summary="Get Model Names",
     description="Returns available model names based on model type.",
 )
-@log_async_function
+@instrument
 async def get_model_names(
     request: Request,
     model_type: str = Form(...),
@@ -57,4 +63,68 @@ async def get_model_names(
         )
     except Exception as e:
         logger.exception("Failed to get model names")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get(
+    "/routing/stats/",
+    response_class=JSONResponse,
+    summary="Model Routing Stats",
+    description="Returns per-route request counts, escalations and latency for the model router.",
+)
+async def get_routing_stats() -> JSONResponse:
+    llm_service = container.llm_service
+    if not llm_service or not llm_service.router:
+        return JSONResponse({"enabled": False, "routes": {}})
+    return JSONResponse({
+        "enabled": True,
+        "models": llm_service.router.models,
+        "routes": llm_service.router.stats(),
+    })
+
+@router.get(
+    "/cache/semantic/stats",
+    response_class=JSONResponse,
+    summary="Semantic Cache Stats",
+    description="Returns hit rate, evictions and sampled answer agreement for the semantic response cache.",
+)
+async def get_semantic_cache_stats() -> JSONResponse:
+    llm_service = container.llm_service
+    if not llm_service or not llm_service.response_cache:
+        return JSONResponse({"enabled": False})
+    return JSONResponse({"enabled": True, **llm_service.response_cache.stats()})
+
+@router.get(
+    "/telemetry/tracing/stats",
+    response_class=JSONResponse,
+    summary="Trace Sampling Stats",
+    description="Returns how many traces the tail sampler kept and why, and its processing cost per span.",
+)
+async def get_tracing_stats() -> JSONResponse:
+    if telemetry.tail_sampler is None:
+        return JSONResponse({"enabled": False})
+    return JSONResponse({"enabled": True, **telemetry.tail_sampler.stats()})
+
+@router.get(
+    "/telemetry/event-loop/stats",
+    response_class=JSONResponse,
+    summary="Event Loop Stats",
+    description="Returns the worst event loop lag seen and the stacks captured while the loop was blocked.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def get_event_loop_stats() -> JSONResponse:
+    return JSONResponse(container.loop_monitor.stats())
+
+@router.get(
+    "/usage/stats",
+    response_class=JSONResponse,
+    summary="Generation Cost Percentiles",
+    description="Returns p50/p95/p99 and totals of the time, CPU and tokens recorded on replies, per user or per model.",
+    dependencies=[Depends(require_admin_token)],
+)
+async def get_usage_stats(
+    group_by: Literal["user", "model"] = "model",
+    days: int = Query(7, ge=1, le=90)
+) -> JSONResponse:
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = await container.db_service.usage_percentiles(group_by=group_by, since=since)
+    return JSONResponse({"group_by": group_by, "since": since.isoformat(), "groups": rows})
@@ -1,21 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from src.services.database import DatabaseService
+from src.models.database import Conversation
+from src.services import accounting
 from src.services.container import container
-from websrc.models.pydantic import ConversationCreate, MessageCreate
-from typing import List
+from src.models.pydantic import ConversationCreate, MessageCreate, ConversationTurn
+from src.services.llm_generate import LLMGenerate, ModelResources
+from websrc.models.pydantic import TextGenerationRequest
+from websrc.api.utility.pagination import encode_cursor, decode_cursor
+from websrc.api.utility.conditional import conditional_json_response
+from websrc.api.utility.auth import get_user_context
+from src.services.user_context import UserContext
+from src.models.enum import ModelType
+from websrc.config.settings import settings
+from typing import List, Literal, Optional
 
 router = APIRouter()
 
+async def require_owned_conversation(
+    conversation_id: int, user: UserContext, db: DatabaseService, read: bool = True
+) -> Conversation:
+    """404 unless the conversation exists and belongs to ``user``, so other users' ids are not revealed.
+
+    With ``read`` an archived conversation is rehydrated from the row already loaded here.
+    """
+    conversation = await db.get_conversation(conversation_id)
+    if conversation is None or conversation.user_id != user.user_id:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if read:
+        await db.ensure_hot(conversation)
+    return conversation
+
 @router.post("/conversations/")
 async def create_conversation(
     conversation: ConversationCreate,
+    user: UserContext = Depends(get_user_context),
     db: DatabaseService = Depends(lambda: container.db_service)
 ):
     try:
-        # Hardcoded user_id for now - implement proper auth later
-        user_id = 1
         conversation = await db.create_conversation(
-            user_id=user_id,
+            user_id=user.user_id,
             title=conversation.title,
             model_type=conversation.model_type,
             model_name=conversation.model_name
@@ -28,8 +51,10 @@ async def create_conversation(
 async def add_message(
     conversation_id: int,
     message: MessageCreate,
+    user: UserContext = Depends(get_user_context),
     db: DatabaseService = Depends(lambda: container.db_service)
 ):
+    await require_owned_conversation(conversation_id, user, db, read=False)
     try:
         message = await db.add_message(
             conversation_id=conversation_id,
@@ -39,4 +64,135 @@ async def add_message(
         )
         return {"id": message.id}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/conversations/{conversation_id}/generate")
+async def generate_reply(
+    conversation_id: int,
+    turn: ConversationTurn,
+    user: UserContext = Depends(get_user_context),
+    db: DatabaseService = Depends(lambda: container.db_service),
+    llm_service: Optional[LLMGenerate] = Depends(lambda: container.llm_service)
+):
+    """Generate the next assistant turn from stored history; clients send only the new turn"""
+    if not llm_service:
+        raise HTTPException(status_code=503, detail="LLM Service is disabled.")
+    await require_owned_conversation(conversation_id, user, db)
+    try:
+        resources = llm_service.handler.resources if llm_service.handler else ModelResources()
+        context = await container.context_assembler.assemble(
+            conversation_id=conversation_id,
+            new_turn=turn.content,
+            max_length=turn.max_length,
+            context_length=resources.context_length
+        )
+        await db.enqueue_message(
+            conversation_id=conversation_id,
+            role="user",
+            content=turn.content,
+            token_count=context.new_turn_tokens
+        )
+        with accounting.track() as usage:
+            reply = await llm_service.generate_text_async(
+                TextGenerationRequest(
+                    prompt=context.prompt,
+                    max_length=turn.max_length,
+                    parameters=turn.parameters,
+                    tenant=user.tenant,
+                    model_parameters=user.model_parameters(ModelType.TEXT),
+                    cacheable=False
+                )
+            )
+        message_id = await db.enqueue_message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=reply,
+            metadata={"usage": usage.as_dict()}
+        )
+        return {
+            # None while the reply is still buffered for a write-behind flush
+            "id": message_id.result() if message_id.done() else None,
+            "content": reply,
+            "prompt_tokens": context.prompt_tokens,
+            "truncated": context.truncated
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/conversations/")
+async def list_conversations(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: UserContext = Depends(get_user_context),
+    db: DatabaseService = Depends(lambda: container.db_service)
+):
+    """Newest conversations first; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    position = decode_cursor(cursor, ("created_at", "id"), datetime_keys=("created_at",))
+    before = (position["created_at"], position["id"]) if position else None
+    conversations = await db.list_conversations(user_id=user.user_id, limit=limit + 1, before=before)
+    page = conversations[:limit]
+    next_cursor = (
+        encode_cursor({"created_at": page[-1].created_at, "id": page[-1].id})
+        if len(conversations) > limit else None
+    )
+    return conditional_json_response(request, {
+        "items": [
+            {
+                "id": conversation.id,
+                "title": conversation.title,
+                "model_type": conversation.model_type,
+                "model_name": conversation.model_name,
+                "created_at": conversation.created_at
+            }
+            for conversation in page
+        ],
+        "next_cursor": next_cursor
+    })
+
+@router.get("/conversations/search")
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=1000),
+    limit: int = Query(10, ge=1, le=50),
+    user: UserContext = Depends(get_user_context)
+):
+    """The caller's past messages closest in meaning to ``q``"""
+    if not settings.SEARCH_ENABLED:
+        raise HTTPException(status_code=503, detail="Conversation search is disabled.")
+    return {"items": await container.search_index.search(user.user_id, q, limit)}
+
+@router.get("/conversations/{conversation_id}/messages")
+async def list_messages(
+    request: Request,
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    user: UserContext = Depends(get_user_context),
+    db: DatabaseService = Depends(lambda: container.db_service)
+):
+    """Messages of a conversation by id; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    await require_owned_conversation(conversation_id, user, db)
+    position = decode_cursor(cursor, ("id",))
+    messages = await db.list_messages(
+        conversation_id=conversation_id,
+        limit=limit + 1,
+        after_id=position["id"] if position else None,
+        descending=order == "desc"
+    )
+    page = messages[:limit]
+    next_cursor = encode_cursor({"id": page[-1].id}) if len(messages) > limit else None
+    return conditional_json_response(request, {
+        "items": [
+            {
+                "id": message.id,
+                "role": message.role,
+                "content": message.content,
+                "token_count": message.token_count,
+                "generation_info": message.generation_info,
+                "created_at": message.created_at
+            }
+            for message in page
+        ],
+        "next_cursor": next_cursor
+    })
@@ -4,11 +4,15 @@ import logging
 import jinja2
 from websrc.models.pydantic import TextModelName
 from fastapi.templating import Jinja2Templates
-from websrc.config.logging_config import log_async_function
+from websrc.config.logging_config import instrument
+from websrc.api.utility.page_cache import PageCache
+from websrc.api.utility.static_assets import static_assets
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 templates = Jinja2Templates(directory="websrc/templates")
+templates.env.globals["asset_url"] = static_assets.url
+pages = PageCache(templates)
 
 @router.get(
     "/",
@@ -16,14 +20,11 @@ templates = Jinja2Templates(directory="websrc/templates")
     summary="Serve Landing Page",
     description="Serves the landing page.",
 )
-@log_async_function
+@instrument
 async def serve_landing(request: Request):
     """Serve the landing page"""
     try:
-        return templates.TemplateResponse(
-            "landing.html",
-            {"request": request}
-        )
+        return pages.response(request, "landing.html")
     except jinja2.exceptions.TemplateNotFound:
         logger.error("Template 'landing.html' not found in templates directory")
         raise HTTPException(
@@ -37,15 +38,12 @@ async def serve_landing(request: Request):
     summary="Serve Home Page",
     description="Serves the main chat interface.",
 )
-@log_async_function
+@instrument
 async def serve_home(request: Request):
     """Serve the main chat interface"""
     try:
         text_model_names = [name.value for name in TextModelName]
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "text_model_names": text_model_names}
-        )
+        return pages.response(request, "index.html", {"text_model_names": text_model_names})
     except jinja2.exceptions.TemplateNotFound:
         logger.error("Template 'index.html' not found in templates directory")
         raise HTTPException(
@@ -59,15 +57,12 @@ async def serve_home(request: Request):
     summary="Serve Settings Page",
     description="Serves the settings page.",
 )
-@log_async_function
+@instrument
 async def serve_settings(request: Request):
     """Serve the settings page"""
     try:
         text_model_names = [name.value for name in TextModelName]
-        return templates.TemplateResponse(
-            "settings.html",
-            {"request": request, "text_model_names": text_model_names}
-        )
+        return pages.response(request, "settings.html", {"text_model_names": text_model_names})
     except jinja2.exceptions.TemplateNotFound:
         logger.error("Template 'settings.html' not found in templates directory")
         raise HTTPException(
@@ -81,14 +76,11 @@ async def serve_settings(request: Request):
     summary="Serve API Page",
     description="Serves the API documentation page.",
 )
-@log_async_function
+@instrument
 async def serve_api(request: Request):
     """Serve the API documentation page"""
     try:
-        return templates.TemplateResponse(
-            "api.html",
-            {"request": request}
-        )
+        return pages.response(request, "api.html")
     except jinja2.exceptions.TemplateNotFound:
         logger.error("Template 'api.html' not found in templates directory")
         raise HTTPException(
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Request, Form, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from websrc.models.pydantic import TextGenerationRequest, ImageGenerationRequest
 from websrc.api.exceptions.exceptions import TextGenerationError, ImageGenerationError
-from websrc.config.logging_config import log_async_function
+from websrc.config.logging_config import instrument
 from src.services.container import container
 from src.services.llm_generate import LLMGenerate
+from src.services.user_context import UserContext
+from src.models.enum import ModelType
+from websrc.api.utility.auth import get_user_context
 from typing import Optional, Dict, Any
 import logging
 import asyncio
@@ -52,23 +55,24 @@ async def log_generation_request(generation_type: str, prompt: str) -> None:
 
 @router.post(
     "/htmx/generate/text/",
-    response_class=HTMLResponse,
+    response_class=JSONResponse,
     summary="HTMX Generate Text", 
     description="Generates text based on the provided prompt via HTMX.",
     tags=["HTMX Generation"],
 )
-@log_async_function
+@instrument
 async def htmx_generate_text(
     request: Request,
     background_tasks: BackgroundTasks,
     prompt: str = Form(...),
     max_length: int = Form(1000),
-    temperature: float = Form(0.7),
-    llm_service: Optional[LLMGenerate] = Depends(container.llm_service)
-) -> HTMLResponse:
+    temperature: Optional[float] = Form(None),
+    user: UserContext = Depends(get_user_context),
+    llm_service: Optional[LLMGenerate] = Depends(lambda: container.llm_service)
+) -> JSONResponse:
     try:
         if not llm_service:
-            return HTMLResponse(
+            return JSONResponse(
                 GenerationResponse.error("LLM Service is disabled.")
             )
 
@@ -78,15 +82,14 @@ async def htmx_generate_text(
         text_request = TextGenerationRequest(
             prompt=prompt,
             max_length=max_length,
-            parameters={"temperature": temperature}
+            parameters={"temperature": temperature} if temperature is not None else {},
+            tenant=user.tenant,
+            model_parameters=user.model_parameters(ModelType.TEXT)
         )
         
-        generated_text = await llm_service.handler.generate_async(
-            prompt=text_request.prompt,
-            max_length=text_request.max_length
-        )
+        generated_text = await llm_service.generate_text_async(text_request)
         
-        return HTMLResponse(
+        return JSONResponse(
             GenerationResponse.success(
                 generated_text,
                 metadata={"prompt_length": len(prompt)}
@@ -94,11 +97,42 @@ async def htmx_generate_text(
         )
     except Exception as e:
         logger.exception("HTMX Text generation failed")
-        return HTMLResponse(
+        return JSONResponse(
             GenerationResponse.error(str(e)),
             status_code=500
         )
 
+@router.post(
+    "/generate/text/stream",
+    response_class=StreamingResponse,
+    summary="Stream Generated Text",
+    description="Generates text based on the provided prompt and streams it as plain text while it is produced.",
+    tags=["Generation"],
+)
+@instrument
+async def stream_generate_text(
+    prompt: str = Form(...),
+    max_length: int = Form(1000),
+    temperature: Optional[float] = Form(None),
+    user: UserContext = Depends(get_user_context),
+    llm_service: Optional[LLMGenerate] = Depends(lambda: container.llm_service)
+) -> StreamingResponse:
+    if not llm_service:
+        raise HTTPException(status_code=503, detail="LLM Service is disabled.")
+    text_request = TextGenerationRequest(
+        prompt=prompt,
+        max_length=max_length,
+        parameters={"temperature": temperature} if temperature is not None else {},
+        tenant=user.tenant,
+        model_parameters=user.model_parameters(ModelType.TEXT)
+    )
+    return StreamingResponse(
+        llm_service.stream_text_async(text_request),
+        media_type="text/plain; charset=utf-8",
+        # GZipMiddleware would hold pieces back until its compressor emits output
+        headers={"Content-Encoding": "identity", "Cache-Control": "no-cache"}
+    )
+
 @router.post(
     "/htmx/generate/image/",
     response_class=HTMLResponse,
@@ -106,19 +140,19 @@ async def htmx_generate_text(
     description="Generates an image based on the provided prompt via HTMX.",
     tags=["HTMX Generation"],
 )
-@log_async_function
+@instrument
 async def htmx_generate_image(
     request: Request,
     prompt: str = Form(...),
     resolution: str = Form("512x512"),
-    llm_service: Optional[LLMGenerate] = Depends(container.llm_service)
+    llm_service: Optional[LLMGenerate] = Depends(lambda: container.llm_service)
 ) -> HTMLResponse:
     try:
         if not llm_service:
             return HTMLResponse("<div class='response-content'><p>LLM Service is disabled.</p></div>")
 
         image_request = ImageGenerationRequest(prompt=prompt, resolution=resolution)
-        generated_image = llm_service.generate_image(image_request)
+        generated_image = await llm_service.generate_image_async(image_request)
         
         return HTMLResponse(
             f"""
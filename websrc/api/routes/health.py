@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
+from src.services.container import container
+
 router = APIRouter()
 
 @router.get(
@@ -12,4 +14,27 @@ router = APIRouter()
 )
 async def health_check():
     """Health check endpoint to verify the application is running."""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get(
+    "/health/live",
+    response_class=JSONResponse,
+    summary="Liveness Check",
+    description="Returns 200 while the process is serving requests, including during model loading.",
+    tags=["Health"],
+)
+async def liveness_check():
+    """Liveness probe; failing it means the process should be restarted."""
+    return {"status": "alive"}
+
+@router.get(
+    "/health/ready",
+    response_class=JSONResponse,
+    summary="Readiness Check",
+    description="Returns 200 once models are loaded and warmed, 503 with load progress until then.",
+    tags=["Health"],
+)
+async def readiness_check():
+    """Readiness probe; the load balancer should only route to replicas that pass it."""
+    status = container.warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
@@ -0,0 +1,79 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.services.profiler import ProfileSession, profiler
+from websrc.api.exceptions.exceptions import AuthenticationError, ProfilingError
+from websrc.config.settings import settings
+
+router = APIRouter(prefix="/profiling")
+
+def require_profiling_token(request: Request) -> None:
+    """Profiling exposes source paths and timings, so it needs its own token rather than a user key"""
+    token = request.headers.get("X-Profiling-Token", "")
+    if not settings.PROFILING_TOKEN or not hmac.compare_digest(token, settings.PROFILING_TOKEN):
+        raise AuthenticationError("Invalid profiling token")
+
+def _session(session_id: str) -> ProfileSession:
+    session = profiler.get(session_id)
+    if session is None:
+        raise ProfilingError(f"Profiling session {session_id} not found", code=404)
+    return session
+
+@router.post(
+    "/sessions",
+    response_class=JSONResponse,
+    summary="Start Profiling",
+    description="Samples the stacks of the next `requests` requests, or of every request for `seconds`.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def start_profiling(requests: Optional[int] = None, seconds: Optional[float] = None) -> JSONResponse:
+    return JSONResponse(status_code=201, content=profiler.start(requests=requests, seconds=seconds).summary())
+
+@router.get(
+    "/sessions",
+    response_class=JSONResponse,
+    summary="List Profiling Sessions",
+    description="Returns the running session, if any, and the most recently finished ones.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def list_profiling_sessions() -> JSONResponse:
+    return JSONResponse({
+        "running": profiler.session.summary() if profiler.session else None,
+        "finished": [session.summary() for session in profiler.finished],
+    })
+
+@router.delete(
+    "/sessions/current",
+    response_class=JSONResponse,
+    summary="Stop Profiling",
+    description="Ends the running session early and keeps what it sampled.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def stop_profiling() -> JSONResponse:
+    session = profiler.stop()
+    if session is None:
+        raise ProfilingError("No profiling session is running", code=404)
+    return JSONResponse(session.summary())
+
+@router.get(
+    "/sessions/{session_id}",
+    response_class=JSONResponse,
+    summary="Profiling Session",
+    description="Returns a session's sample counts and the routes and models it covered.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def get_profiling_session(session_id: str) -> JSONResponse:
+    return JSONResponse(_session(session_id).summary())
+
+@router.get(
+    "/sessions/{session_id}/collapsed",
+    response_class=PlainTextResponse,
+    summary="Profiling Flamegraph Input",
+    description="Returns a session's collapsed stacks, rooted at route and model, for flamegraph.pl or speedscope.",
+    dependencies=[Depends(require_profiling_token)],
+)
+async def get_profiling_stacks(session_id: str) -> PlainTextResponse:
+    return PlainTextResponse(_session(session_id).collapsed())
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+import asyncio
+import logging
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+from websrc.models.pydantic import TokenizeRequest
+from websrc.api.exceptions.exceptions import InvalidModelNameError
+from websrc.api.utility.auth import get_user_context
+from src.services.container import container
+from src.services.tokenizer import TokenizerService
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _get_tokenizer(model_name: Optional[str] = None) -> Callable[[], TokenizerService]:
+    """Check ``model_name`` on the loop and return a loader to run off it"""
+    llm_service = container.llm_service
+    if llm_service and model_name:
+        # Tokenizers come with their model; only models already being served are loaded for one
+        if model_name not in llm_service.serving_models:
+            raise InvalidModelNameError(f"Model is not being served: {model_name}")
+        return partial(llm_service.get_tokenizer, model_name)
+    tokenizer = container.tokenizer_service
+    return lambda: tokenizer
+
+def _tokenize(load_tokenizer: Callable[[], TokenizerService], request: TokenizeRequest) -> Tuple[TokenizerService, List[List[int]]]:
+    tokenizer = load_tokenizer()
+    return tokenizer, tokenizer.encode_batch(request.texts, prefix=request.prefix)
+
+def _count_tokens(load_tokenizer: Callable[[], TokenizerService], request: TokenizeRequest) -> Tuple[TokenizerService, List[int]]:
+    tokenizer = load_tokenizer()
+    return tokenizer, tokenizer.count_tokens_batch(request.texts, prefix=request.prefix)
+
+@router.post(
+    "/tokenize",
+    response_class=JSONResponse,
+    summary="Tokenize Text",
+    description="Returns token ids for a batch of texts using the model's cached tokenizer.",
+    dependencies=[Depends(get_user_context)],
+)
+async def tokenize(request: TokenizeRequest) -> JSONResponse:
+    # Off the loop: a routed model's first use loads it, and large batches take a while
+    tokenizer, tokens = await asyncio.to_thread(_tokenize, _get_tokenizer(request.model_name), request)
+    return JSONResponse({
+        "model": tokenizer.model_name,
+        "tokens": tokens,
+        "counts": [len(ids) for ids in tokens],
+    })
+
+@router.post(
+    "/count_tokens",
+    response_class=JSONResponse,
+    summary="Count Tokens",
+    description="Returns token counts for a batch of texts using the model's cached tokenizer.",
+    dependencies=[Depends(get_user_context)],
+)
+async def count_tokens(request: TokenizeRequest) -> JSONResponse:
+    tokenizer, counts = await asyncio.to_thread(_count_tokens, _get_tokenizer(request.model_name), request)
+    return JSONResponse({
+        "model": tokenizer.model_name,
+        "counts": counts,
+        "total": sum(counts),
+    })
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from src.services.container import container
+from src.services.transfer import ConversationTransfer
+from src.services.user_context import UserContext
+from websrc.api.utility.auth import get_user_context, require_admin_token
+
+router = APIRouter()
+
+@router.get(
+    "/conversations/export",
+    summary="Export Conversations",
+    description="Streams the caller's user row, conversations and messages as NDJSON, without API keys.",
+    dependencies=[Depends(require_admin_token)],
+)
+async def export_conversations(
+    user: UserContext = Depends(get_user_context),
+    transfer: ConversationTransfer = Depends(lambda: container.transfer_service)
+) -> StreamingResponse:
+    filename = f"conversations-{user.user_id}.ndjson"
+    return StreamingResponse(
+        transfer.export_ndjson(user_id=user.user_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post(
+    "/conversations/import",
+    summary="Import Conversations",
+    description="Bulk loads an NDJSON export with PostgreSQL COPY in a single transaction.",
+    dependencies=[Depends(require_admin_token)],
+)
+async def import_conversations(
+    request: Request,
+    transfer: ConversationTransfer = Depends(lambda: container.transfer_service)
+):
+    counts = await transfer.import_ndjson(request.stream())
+    return {"imported": counts}
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+from src.models.pydantic import UserModelConfigUpdate
+from src.services.container import container
+from src.services.database import DatabaseService
+from src.services.user_context import UserContext
+from websrc.api.utility.auth import get_user_context
+
+router = APIRouter()
+
+@router.get(
+    "/users/me",
+    summary="Current User",
+    description="Returns the caller and their resolved per-model generation parameters.",
+)
+async def get_current_user(user: UserContext = Depends(get_user_context)):
+    return {
+        "id": user.user_id,
+        "username": user.username,
+        "generation_config": user.generation_config
+    }
+
+@router.put(
+    "/users/me/model-configs",
+    summary="Set Model Parameters",
+    description="Stores the caller's generation parameters for a model and invalidates cached user contexts.",
+)
+async def set_model_config(
+    config: UserModelConfigUpdate,
+    user: UserContext = Depends(get_user_context),
+    db: DatabaseService = Depends(lambda: container.db_service)
+):
+    stored = await db.set_user_model_config(
+        user_id=user.user_id,
+        model_type=config.model_type,
+        model_name=config.model_name,
+        parameters=config.parameters
+    )
+    await container.user_context_resolver.invalidate(user.user_id)
+    return {"id": stored.id}
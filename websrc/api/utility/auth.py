@@ -0,0 +1,42 @@
+import hmac
+from typing import Optional
+from fastapi import Request
+from starlette.requests import HTTPConnection
+from websrc.api.exceptions.exceptions import AuthenticationError
+from websrc.config.settings import settings
+from src.services.container import container
+from src.services.user_context import UserContext
+
+def api_key_from_request(connection: HTTPConnection) -> Optional[str]:
+    """The key from ``X-API-Key``, an ``Authorization: Bearer`` header or, for WebSockets, ``?api_key=``"""
+    api_key = connection.headers.get("X-API-Key")
+    if api_key:
+        return api_key
+    scheme, _, credentials = connection.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials.strip():
+        return credentials.strip()
+    # Browsers cannot set headers on WebSocket handshakes
+    if connection.scope["type"] == "websocket":
+        return connection.query_params.get("api_key") or None
+    return None
+
+async def resolve_user_context(connection: HTTPConnection) -> UserContext:
+    """Resolve the caller; a supplied key is always checked, a missing one only when auth is enabled"""
+    api_key = api_key_from_request(connection)
+    if api_key is None:
+        if settings.AUTH_ENABLED:
+            raise AuthenticationError("Missing API key")
+        return UserContext(user_id=settings.DEFAULT_USER_ID)
+    context = await container.user_context_resolver.resolve(api_key)
+    if context is None:
+        raise AuthenticationError("Invalid API key")
+    return context
+
+async def get_user_context(request: Request) -> UserContext:
+    return await resolve_user_context(request)
+
+def require_admin_token(request: Request) -> None:
+    """Bulk data and other users' usage need an operator token on top of any user key"""
+    token = request.headers.get("X-Admin-Token", "")
+    if not settings.ADMIN_TOKEN or not hmac.compare_digest(token, settings.ADMIN_TOKEN):
+        raise AuthenticationError("Invalid admin token")
@@ -0,0 +1,24 @@
+import hashlib
+import json
+from typing import Any
+from fastapi import Request, Response
+
+def etag_for(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True when the client already holds the representation identified by ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+def conditional_json_response(request: Request, content: Any, cache_control: str = "private, no-cache") -> Response:
+    """JSON response with an ETag; answers 304 Not Modified when If-None-Match matches"""
+    body = json.dumps(content, separators=(",", ":"), default=str).encode()
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
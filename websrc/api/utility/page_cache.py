@@ -0,0 +1,54 @@
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+
+from websrc.api.utility.conditional import etag_for, if_none_match
+from websrc.config.settings import settings
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+class PageCache:
+    """Rendered pages keyed on template name and context.
+
+    Each page is rendered and gzipped once, so repeat hits cost a dict lookup
+    and a conditional check instead of a Jinja render and a compression pass.
+    Only for templates whose output depends on nothing but the given context;
+    the request is not passed to the template.
+    """
+
+    def __init__(self, templates: Jinja2Templates):
+        self.templates = templates
+        self._pages: Dict[Tuple[str, str], CachedPage] = {}
+
+    def get(self, template: str, context: Optional[Dict[str, Any]] = None) -> CachedPage:
+        context = context or {}
+        key = (template, json.dumps(context, sort_keys=True, default=str))
+        page = self._pages.get(key) if settings.PAGE_CACHE_ENABLED else None
+        if page is None:
+            body = self.templates.get_template(template).render(context).encode()
+            page = CachedPage(body=body, gzipped=gzip.compress(body, compresslevel=9), etag=etag_for(body))
+            if settings.PAGE_CACHE_ENABLED:
+                self._pages[key] = page
+        return page
+
+    def response(self, request: Request, template: str, context: Optional[Dict[str, Any]] = None) -> Response:
+        """HTML response for the page; 304 Not Modified when If-None-Match matches"""
+        page = self.get(template, context)
+        headers = {"ETag": page.etag, "Cache-Control": "public, no-cache", "Vary": "Accept-Encoding"}
+        if if_none_match(request, page.etag):
+            return Response(status_code=304, headers=headers)
+        # Setting Content-Encoding here keeps GZipMiddleware from compressing it again
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(content=page.gzipped, media_type="text/html", headers={**headers, "Content-Encoding": "gzip"})
+        return Response(content=page.body, media_type="text/html", headers=headers)
+
+    def clear(self) -> None:
+        self._pages.clear()
@@ -0,0 +1,32 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+from fastapi import HTTPException
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(
+    cursor: Optional[str],
+    keys: Sequence[str],
+    datetime_keys: Sequence[str] = ()
+) -> Optional[Dict[str, Any]]:
+    """Values of a cursor made by ``encode_cursor``; 400 if it is malformed or lacks ``keys``"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = {key: payload[key] for key in keys}
+        for key in datetime_keys:
+            values[key] = datetime.fromisoformat(values[key])
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """Wall-clock durations of named startup phases, in the order they ran"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases.append((name, elapsed))
+            logger.debug(f"Startup phase {name} took {elapsed * 1000:.1f}ms")
+
+    def report(self) -> List[Dict[str, float]]:
+        return [{"phase": name, "ms": round(elapsed * 1000, 2)} for name, elapsed in self.phases]
+
+startup_timer = StartupTimer()
@@ -0,0 +1,95 @@
+import hashlib
+import mimetypes
+import os
+import stat
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from websrc.config.settings import settings
+
+# Written next to each asset by src.cli.build_assets, preferred in this order
+ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+class AssetManifest:
+    """Content fingerprints of the files under the static directory.
+
+    ``url("css/chat.css")`` gives ``/static/css/chat.<hash>.css``; the hash
+    changes whenever the file does, so responses for fingerprinted URLs can
+    be cached by browsers and proxies without revalidation.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.directory = directory
+        self.prefix = prefix
+        self.fingerprinted: Dict[str, str] = {}
+        self.originals: Dict[str, str] = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    digest = hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+                stem, extension = os.path.splitext(path)
+                fingerprinted = f"{stem}.{digest}{extension}"
+                self.fingerprinted[path] = fingerprinted
+                self.originals[fingerprinted] = path
+
+    def url(self, path: str) -> str:
+        path = path.lstrip("/")
+        return f"{self.prefix}/{self.fingerprinted.get(path, path)}"
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Static files that serve build-time ``.br``/``.gz`` variants and honour fingerprinted URLs.
+
+    A compressed variant is used when the client accepts its encoding and it
+    is not older than the source file; otherwise the plain file is served and
+    GZipMiddleware compresses it as before. Fingerprinted paths resolve to the
+    original file and are marked immutable.
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        original = self.manifest.originals.get(path.replace(os.sep, "/"))
+        path = original or path
+        response = None
+        if scope["method"] in ("GET", "HEAD"):
+            response = self._encoded_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if original and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = f"public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable"
+        return response
+
+    def _encoded_response(self, path: str, scope: Scope) -> Optional[Response]:
+        request_headers = Headers(scope=scope)
+        accepted = request_headers.get("accept-encoding", "")
+        _, source = self.lookup_path(path)
+        if source is None or not stat.S_ISREG(source.st_mode):
+            return None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, variant = self.lookup_path(path + suffix)
+            if variant is None or variant.st_mtime < source.st_mtime:
+                continue
+            response = FileResponse(
+                full_path,
+                stat_result=variant,
+                media_type=mimetypes.guess_type(path)[0] or "text/plain",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
+
+static_assets = AssetManifest(settings.STATIC_DIR)
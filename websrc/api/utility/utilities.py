@@ -1,4 +1,4 @@
-from websrc.config.logging_config import LoggerMixin, log_function
+from websrc.config.logging_config import LoggerMixin, instrument
 import asyncio
 import os
 from functools import wraps
@@ -19,7 +19,7 @@ tracer = trace.get_tracer(__name__)
 
 class Utilities(LoggerMixin):
     @staticmethod
-    @log_function
+    @instrument
     def get_model_and_tokenizer_sync(model_type: ModelType, model_name: str) -> Dict[str, Any]:
         logger = LoggerMixin().logger
         logger.info(f"Loading model and tokenizer for {model_type.value} model: {model_name}")
@@ -38,43 +38,43 @@ class Utilities(LoggerMixin):
         log_message_func: Callable[..., str],
         attributes_func: Optional[Callable[..., Dict[str, Any]]] = None
     ) -> Callable:
+        """Run a route in a span, logging and annotating it from the route's own arguments.
+
+        ``log_message_func`` and ``attributes_func`` receive the keyword arguments
+        FastAPI already parsed (form fields included), so the request body is
+        never read a second time. Attributes are only built for recorded spans.
+        """
         def decorator(func: Callable) -> Callable:
+            def annotate(span: Span, arguments: Dict[str, Any]) -> None:
+                attributes = attributes_func(arguments) if attributes_func and span.is_recording() else None
+                Utilities.log_and_set_attributes(span, log_message_func(arguments), attributes)
+
             @wraps(func)
             async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
                 with tracer.start_as_current_span(span_name) as span:
-                    request: Optional[Request] = kwargs.get('request') or (args[0] if args else None)
-                    if request and hasattr(request, 'form'):
-                        form_data = await request.form()
-                    else:
-                        form_data = {}
-                    log_message = log_message_func(form_data)
-                    attributes = attributes_func(form_data) if attributes_func else {}
-                    Utilities.log_and_set_attributes(span, log_message, attributes)
+                    annotate(span, kwargs)
                     return await func(*args, **kwargs)
 
             @wraps(func)
             def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
                 with tracer.start_as_current_span(span_name) as span:
-                    request: Optional[Request] = kwargs.get('request') or (args[0] if args else None)
-                    log_message = log_message_func(request)
-                    attributes = attributes_func(request) if attributes_func else {}
-                    Utilities.log_and_set_attributes(span, log_message, attributes)
+                    annotate(span, kwargs)
                     return func(*args, **kwargs)
 
             return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
 
         return decorator
 
-    @log_function
     @staticmethod
+    @instrument
     def log_and_set_attributes(span: Any, log_message: str, attributes: Optional[Dict[str, Any]] = None) -> None:
         logger = LoggerMixin().logger
         logger.info(log_message)
         if attributes:
             span.set_attributes(attributes)
 
-    @log_function
     @staticmethod
+    @instrument
     def cache_response(ttl: int = 300) -> Callable:
         def decorator(func: Callable) -> Callable:
             return cached(ttl=ttl, cache=Cache.MEMORY)(func)
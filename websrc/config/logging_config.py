@@ -1,26 +1,131 @@
 import logging
-import json
+import logging.handlers
+import asyncio
+import atexit
+import copy
+import queue
+import random
+import threading
+import time
 from pythonjsonlogger import jsonlogger
 from functools import wraps
-import inspect
+from typing import Callable, Dict, Optional, Tuple
+
+from websrc.config.settings import settings
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records for a ``QueueListener`` without formatting them.
+
+    Only the message arguments are merged on the calling thread, since they
+    may be mutated after the call; JSON formatting, traceback rendering and
+    I/O all happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Per-logger sampling and rate limiting.
+
+    ``sample_rates`` maps a logger name to the fraction of records below
+    WARNING that are kept. ``rate_limits`` maps a logger name to the records
+    per second it may emit at any level, with bursts up to one second's worth.
+    Names match their child loggers too, the most specific entry winning. A
+    record let through after drops carries the number dropped in ``suppressed``.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self.clock = clock
+        self._policies: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lookup(table: Dict[str, float], name: str) -> Tuple[Optional[str], Optional[float]]:
+        while name:
+            if name in table:
+                return name, table[name]
+            name = name.rpartition(".")[0]
+        return None, table.get("")
+
+    def _policy(self, name: str) -> Tuple[Optional[float], Optional[float]]:
+        policy = self._policies.get(name)
+        if policy is None:
+            policy = self._policies[name] = (
+                self._lookup(self.sample_rates, name)[1],
+                self._lookup(self.rate_limits, name)[1],
+            )
+        return policy
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate, rate_limit = self._policy(record.name)
+        if sample_rate is None and rate_limit is None:
+            return True
+        if sample_rate is not None and record.levelno < logging.WARNING and random.random() >= sample_rate:
+            return False
+        if rate_limit is None:
+            return True
+        with self._lock:
+            now = self.clock()
+            tokens, last = self._buckets.get(record.name, (rate_limit, now))
+            tokens = min(rate_limit, tokens + (now - last) * rate_limit)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now)
+                self._suppressed[record.name] = self._suppressed.get(record.name, 0) + 1
+                return False
+            self._buckets[record.name] = (tokens - 1, now)
+            suppressed = self._suppressed.pop(record.name, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
 
 def setup_enhanced_logging():
+    """Route every record through a queue to stream and file handlers on a background thread"""
+    global _listener
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(settings.LOG_LEVEL)
+    if _listener is not None:
+        return logger
 
-    logHandler = logging.StreamHandler()
     formatter = jsonlogger.JsonFormatter(
         '%(asctime)s %(levelname)s %(name)s %(message)s %(extra)s'
     )
+    logHandler = logging.StreamHandler()
     logHandler.setFormatter(formatter)
-    logger.addHandler(logHandler)
-
-    file_handler = logging.FileHandler('app.log')
+    file_handler = logging.FileHandler(settings.LOG_FILE)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMITS))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, logHandler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
     return logger
 
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 class LoggerMixin:
     @property
     def logger(self):
@@ -28,38 +133,54 @@ class LoggerMixin:
             self._logger = logging.getLogger(self.__class__.__name__)
         return self._logger
 
-def log_async_function(func):
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        frame = inspect.currentframe()
-        class_name = frame.f_back.f_locals.get('self').__class__.__name__ if frame.f_back and 'self' in frame.f_back.f_locals else ''
-        
-        logger.info(f"Entering {class_name}.{func.__name__}")
-        try:
-            result = await func(*args, **kwargs)
-            logger.info(f"Exiting {class_name}.{func.__name__}")
+def instrument(func=None, *, enabled: Optional[bool] = None):
+    """Log entry, exit with duration and errors of a sync or async function at DEBUG.
+
+    With ``LOG_INSTRUMENTATION`` off (the default) the function is returned
+    undecorated, so instrumented code costs nothing. When on, the wrapper
+    only times and formats entry and exit lines while its logger has DEBUG
+    enabled; errors are always logged.
+    """
+    if func is None:
+        return lambda f: instrument(f, enabled=enabled)
+    if not (settings.LOG_INSTRUMENTATION if enabled is None else enabled):
+        return func
+
+    logger = logging.getLogger(func.__module__)
+    name = func.__qualname__
+
+    def log_error(e: Exception) -> None:
+        logger.error(f"Error in {name}: {e}", exc_info=True)
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug(f"Entering {name}")
+                started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                log_error(e)
+                raise
+            if debug:
+                logger.debug(f"Exiting {name} after {(time.perf_counter() - started) * 1000:.2f}ms")
             return result
-        except Exception as e:
-            logger.error(f"Error in {class_name}.{func.__name__}: {str(e)}", exc_info=True)
-            raise
-            
-    return wrapper
+        return async_wrapper
 
-def log_function(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        logger = logging.getLogger(func.__module__)
-        frame = inspect.currentframe()
-        class_name = frame.f_back.f_locals.get('self').__class__.__name__ if frame.f_back and 'self' in frame.f_back.f_locals else ''
-        
-        logger.info(f"Entering {class_name}.{func.__name__}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"Entering {name}")
+            started = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            logger.info(f"Exiting {class_name}.{func.__name__}")
-            return result
         except Exception as e:
-            logger.error(f"Error in {class_name}.{func.__name__}: {str(e)}", exc_info=True)
+            log_error(e)
             raise
-            
-    return wrapper
\ No newline at end of file
+        if debug:
+            logger.debug(f"Exiting {name} after {(time.perf_counter() - started) * 1000:.2f}ms")
+        return result
+    return wrapper
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing_extensions import Literal
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 class Settings(BaseSettings):
     DEBUG: bool = False
@@ -14,6 +14,15 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "locallm"
     POSTGRES_PASSWORD: str = "localdev"
     DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Write-behind batching of message inserts
+    DB_WRITE_BEHIND_ENABLED: bool = False
+    DB_WRITE_BATCH_SIZE: int = 50
+    DB_WRITE_FLUSH_INTERVAL: float = 0.25
+    DB_WRITE_MAX_RETRIES: int = 3
+    # Rows per server-side cursor fetch on export and per COPY chunk on import
+    TRANSFER_BATCH_SIZE: int = 1000
     
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
@@ -23,9 +32,132 @@ class Settings(BaseSettings):
     JAEGER_AGENT_PORT: int = 6831
     HONEYCOMB_API_KEY: Optional[str] = None
     HONEYCOMB_DATASET: Optional[str] = None
+    # Span exporter; only the selected one is imported
+    TELEMETRY_EXPORTER: Literal["otlp", "jaeger", "none"] = "otlp"
+    # Trace outgoing calls made with the requests library
+    TELEMETRY_INSTRUMENT_REQUESTS: bool = False
+    # Trace sampling: record a fraction of requests, export a head sample plus slow or failed traces
+    TRACE_RECORD_RATE: float = 1.0
+    TRACE_HEAD_SAMPLE_RATE: float = 0.01
+    TRACE_SLOW_THRESHOLD: float = 2.0
+    TRACE_MAX_BUFFERED_TRACES: int = 2048
+    TRACE_MAX_SPANS_PER_TRACE: int = 256
+    # Metrics: "prometheus" serves a scrape endpoint on METRICS_PORT, "otlp" pushes to the collector
+    METRICS_EXPORTER: Literal["prometheus", "otlp", "none"] = "prometheus"
+    METRICS_PORT: int = 8001
+    METRICS_EXPORT_INTERVAL: float = 15.0
     MAX_WORKERS: int = 4
+
+    # On-demand sampling profiler; the admin endpoints stay closed while PROFILING_TOKEN is unset
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_INTERVAL: float = 0.005
+    PROFILING_MAX_SECONDS: float = 60.0
+    PROFILING_MAX_REQUESTS: int = 100
+    PROFILING_OUTPUT_DIR: Optional[str] = None
+
+    # Event loop lag monitor; a loop more than LOOP_LAG_THRESHOLD seconds late waking
+    # the monitor task counts as a stall and logs the loop thread's stack
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.05
+    LOOP_LAG_THRESHOLD: float = 0.1
+    LOOP_STALL_CAPTURE_INTERVAL: float = 30.0
+    # asyncio debug mode: names every coroutine step slower than the threshold; development only
+    LOOP_MONITOR_DEBUG: bool = False
+
+    # Capture of anonymised request shapes for replay with src.cli.replay
+    CAPTURE_ENABLED: bool = False
+    CAPTURE_FILE: str = "traffic.ndjson"
+    CAPTURE_SAMPLE_RATE: float = 1.0
+    CAPTURE_MAX_BYTES: int = 64 * 1024 * 1024
+    CAPTURE_BACKUPS: int = 5
+    CAPTURE_MAX_BODY_BYTES: int = 1024 * 1024
+    # Adds a keyed hash of each prompt so repeats can be told apart; set CAPTURE_SALT to compare across restarts
+    CAPTURE_HASH_PROMPTS: bool = False
+    CAPTURE_SALT: str = ""
+
+    # Frontend pages are rendered once per template and context; disable while editing templates
+    PAGE_CACHE_ENABLED: bool = True
+    STATIC_DIR: str = "websrc/static"
+    # Fingerprinted asset URLs change with their content, so they can be cached indefinitely
+    STATIC_IMMUTABLE_MAX_AGE: int = 365 * 24 * 3600
+
+    # Logging; records are formatted and written by a background listener
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "app.log"
+    # Fraction of sub-WARNING records kept, by logger name
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+    # Records per second allowed, by logger name
+    LOG_RATE_LIMITS: Dict[str, float] = {}
+    # Entry/exit DEBUG lines from @instrument; decided at import time
+    LOG_INSTRUMENTATION: bool = False
     CACHE_TTL: int = 300
 
+    # Model routing: ordered rules, first match wins, MODEL_NAME is the fallback
+    MODEL_ROUTING_ENABLED: bool = False
+    MODEL_ROUTING_RULES: List[Dict[str, Any]] = []
+    MODEL_ROUTING_CONFIDENCE_THRESHOLD: float = 0.5
+
+    TOKENIZER_CACHE_SIZE: int = 4096
+
+    # Maximum number of stored messages considered when assembling a prompt
+    CONTEXT_HISTORY_LIMIT: int = 200
+
+    # Redis cache of the newest messages of active conversations; a size below
+    # CONTEXT_HISTORY_LIMIT sends long conversations to the database on every read
+    CONVERSATION_CACHE_ENABLED: bool = True
+    CONVERSATION_CACHE_SIZE: int = 200
+    CONVERSATION_CACHE_TTL: int = 1800
+
+    # Background summarization of old turns in long conversations
+    COMPACTION_ENABLED: bool = False
+    COMPACTION_MODEL: str = "gpt-neo-125m"
+    COMPACTION_TOKEN_THRESHOLD: int = 1536
+    COMPACTION_KEEP_RECENT: int = 8
+    COMPACTION_SUMMARY_MAX_LENGTH: int = 256
+    COMPACTION_INTERVAL: int = 60
+    COMPACTION_BATCH_SIZE: int = 10
+
+    # Archival of idle conversations
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_IDLE_DAYS: int = 30
+    ARCHIVE_INTERVAL: int = 3600
+    ARCHIVE_BATCH_SIZE: int = 100
+    ARCHIVE_COMPRESSION_LEVEL: int = 3
+
+    # API key authentication; without it anonymous requests act as DEFAULT_USER_ID
+    AUTH_ENABLED: bool = False
+    DEFAULT_USER_ID: int = 1
+    USER_CONTEXT_CACHE_SIZE: int = 1024
+    USER_CONTEXT_CACHE_TTL: int = 300
+    USER_CONTEXT_NEGATIVE_TTL: int = 30
+    USER_CONTEXT_CHANNEL: str = "user_context:invalidate"
+    # Bulk transfer and usage reporting; those endpoints stay closed while ADMIN_TOKEN is unset
+    ADMIN_TOKEN: Optional[str] = None
+
+    # Embeddings for semantic search over messages
+    EMBEDDING_MODEL: str = "hashing"
+    EMBEDDING_DIM: int = 256
+    SEARCH_ENABLED: bool = False
+    SEARCH_EMBEDDING_BATCH_SIZE: int = 256
+    SEARCH_EMBEDDING_INTERVAL: float = 5.0
+    SEARCH_RESCAN_WINDOW: int = 1000
+    SEARCH_ANN_THRESHOLD: int = 20000
+    SEARCH_NPROBE: int = 8
+    SEARCH_MAX_LOADED_USERS: int = 64
+
+    # Near-duplicate prompt cache in front of text generation
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_SIZE: int = 10000
+    SEMANTIC_CACHE_TTL: int = 3600
+    SEMANTIC_CACHE_SAMPLE_RATE: float = 0.01
+
+    # Model preload at startup; /health/ready fails until it finishes
+    WARMUP_ENABLED: bool = True
+    WARMUP_MODELS: List[str] = []
+    # Warm-up generations as [prompt tokens, max length]
+    WARMUP_SHAPES: List[List[int]] = [[32, 32], [512, 128], [1536, 256]]
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.DATABASE_URL = f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -34,5 +166,6 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+        extra = "ignore"
 
 settings = Settings()
\ No newline at end of file
@@ -1,6 +1,5 @@
 import logging
 from fastapi import FastAPI, Depends
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
@@ -8,14 +7,19 @@ from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 import os
 
 from websrc.config.settings import Settings
-from websrc.api.middleware.telemetry import setup_telemetry
-from websrc.api.routes import configuration, frontend, generation, health, conversations
+from websrc.api.middleware.telemetry import setup_metrics, setup_telemetry
+from websrc.api.middleware.profiling import ProfilingMiddleware
+from websrc.api.routes import configuration, frontend, generation, health, conversations, tokenization, transfer, users, chat, profiling
 from websrc.api.middleware.error_handlers import base_app_error_handler
 from websrc.api.exceptions.exceptions import BaseAppError
-from websrc.config.logging_config import setup_enhanced_logging
+from websrc.config.logging_config import setup_enhanced_logging, shutdown_logging
+from websrc.api.utility.startup import startup_timer
+from websrc.api.utility.static_assets import PrecompressedStaticFiles, static_assets
 from src.services.container import container
+from src.services.profiler import profiler
 from src.models.database import Base
-from src.db.session import engine
+from src.db import session as db
+from websrc.config.settings import settings
 
 # Initialize logging first
 logger = setup_enhanced_logging()
@@ -36,6 +40,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(ProfilingMiddleware)
+if settings.CAPTURE_ENABLED:
+    from websrc.api.middleware.capture import TrafficCaptureMiddleware
+    app.add_middleware(TrafficCaptureMiddleware, recorder=container.traffic_recorder)
 
 # Setup telemetry with app instance
 setup_telemetry(app)
@@ -46,18 +54,65 @@ app.include_router(frontend.router, tags=["Frontend"])
 app.include_router(generation.router, tags=["Generation"], dependencies=[Depends(container.get_llm_generate_service)])
 app.include_router(health.router, tags=["Health"])
 app.include_router(conversations.router, tags=["Conversations"], dependencies=[Depends(container.get_db_service)])
+app.include_router(tokenization.router, tags=["Tokenization"])
+app.include_router(transfer.router, tags=["Transfer"])
+app.include_router(users.router, tags=["Users"])
+app.include_router(chat.router, tags=["Chat"])
+app.include_router(profiling.router, tags=["Profiling"])
 
 # Register error handlers
 app.add_exception_handler(BaseAppError, base_app_error_handler)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="websrc/static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory=settings.STATIC_DIR, manifest=static_assets), name="static")
 
 # Initialize templates
 templates = Jinja2Templates(directory="websrc/templates")
 
 @app.on_event("startup")
 async def startup():
+    # The metrics endpoint binds a port, so it is started here rather than at import
+    with startup_timer.phase("setup_metrics"):
+        setup_metrics()
+
     # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    with startup_timer.phase("create_tables"):
+        async with db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Load models in the background so liveness probes pass while /health/ready holds traffic back
+    with startup_timer.phase("schedule_warmup"):
+        if settings.WARMUP_ENABLED:
+            container.warmup.start()
+        else:
+            container.warmup.skip()
+
+    with startup_timer.phase("start_background_jobs"):
+        if settings.LOOP_MONITOR_ENABLED:
+            container.loop_monitor.start()
+        container.user_context_resolver.start()
+        if settings.COMPACTION_ENABLED:
+            container.compactor.start()
+        if settings.ARCHIVE_ENABLED:
+            container.archiver.start()
+        if settings.SEARCH_ENABLED:
+            container.search_index.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await container.warmup.stop()
+    if settings.COMPACTION_ENABLED:
+        await container.compactor.stop()
+    if settings.ARCHIVE_ENABLED:
+        await container.archiver.stop()
+    if settings.SEARCH_ENABLED:
+        await container.search_index.stop()
+    await container.user_context_resolver.stop()
+    await container.loop_monitor.stop()
+    profiler.stop()
+    # Flush buffered message writes before the pool goes away
+    await container.db_service.close()
+    await db.dispose()
+    if settings.CAPTURE_ENABLED:
+        container.traffic_recorder.close()
+    shutdown_logging()
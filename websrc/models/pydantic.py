@@ -6,7 +6,7 @@ import os
 from enum import Enum
 from fastapi import Form
 from pydantic import BaseModel, Field, field_validator, validator
-from typing import Literal
+from typing import Any, Dict, List, Literal, Optional
 from src.models.enum import TextModelName, ImageModelName
 
 # Pydantic Models
@@ -21,14 +21,25 @@ class ModelConfig(BaseModel):
     @field_validator('model_name')
     def validate_model_name(cls, v, info):
         model_type = info.data.get('model_type')
-        if model_type == "text" and v not in TextModelName.__members__:
+        if model_type == "text" and v not in TextModelName.list():
             raise ValueError(f"Invalid text model name: {v}")
-        if model_type == "image" and v not in ImageModelName.__members__:
+        if model_type == "image" and v not in ImageModelName.list():
             raise ValueError(f"Invalid image model name: {v}")
         return v
 
 class TextGenerationRequest(BaseModel):
     prompt: str = Field(..., description="Text prompt for generation")
+    max_length: int = Field(1000, description="Maximum number of tokens to generate")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Sampling parameters")
+    tenant: Optional[str] = Field(None, description="Tenant the request is billed to")
+    cacheable: bool = Field(
+        True,
+        description="Whether the semantic cache may answer; off for prompts built from conversation history"
+    )
+    model_parameters: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per-model defaults for whichever model serves the request; `parameters` takes precedence"
+    )
     
     model_config = {
         'protected_namespaces': ()
@@ -55,4 +66,19 @@ class ImageGenerationRequest(BaseModel):
                 raise ValueError("Resolution dimensions must be positive")
             return v
         except ValueError:
-            raise ValueError("Resolution must be in format WxH (e.g. 512x512)")
\ No newline at end of file
+            raise ValueError("Resolution must be in format WxH (e.g. 512x512)")
+
+class TokenizeRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, description="Texts to tokenize in one batch")
+    model_name: Optional[str] = Field(None, description="Text model whose tokenizer to use")
+    prefix: Optional[str] = Field(None, description="Shared prefix, e.g. a system prompt, prepended to every text")
+
+    model_config = {
+        'protected_namespaces': ()
+    }
+
+    @field_validator('model_name')
+    def validate_model_name(cls, v):
+        if v is not None and v not in TextModelName.list():
+            raise ValueError(f"Invalid text model name: {v}")
+        return v
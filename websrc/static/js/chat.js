@@ -1,9 +1,11 @@
-function chat() {
+function chat(options = {}) {
     return {
         messages: [],
         newMessage: '',
         isLoading: false,
         error: null,
+        socket: null,
+        pending: null,
         
         async initializeChat() {
             this.messages = [
@@ -20,6 +22,81 @@ function chat() {
                     this.scrollToBottom();
                 });
             });
+
+            try {
+                await this.connect();
+            } catch (error) {
+                // Without a socket every turn falls back to a form POST
+                console.warn('Chat socket unavailable:', error);
+            }
+        },
+
+        async connect() {
+            const response = await fetch('/conversations/', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    title: options.title || 'Chat',
+                    model_type: 'text',
+                    model_name: options.modelName || 'gpt-neo-125m'
+                })
+            });
+            if (!response.ok) throw new Error('Failed to create conversation');
+            const { id } = await response.json();
+
+            const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+            const socket = new WebSocket(`${scheme}://${window.location.host}/ws/conversations/${id}`);
+            socket.onmessage = (event) => this.handleFrame(JSON.parse(event.data));
+            socket.onclose = () => {
+                this.socket = null;
+                if (this.pending) this.finishReply({ error: true });
+            };
+            await new Promise((resolve, reject) => {
+                socket.onopen = resolve;
+                socket.onerror = reject;
+            });
+            this.socket = socket;
+        },
+
+        handleFrame(frame) {
+            if (frame.type === 'token' && this.pending) {
+                this.updateBotMessage(this.pending, { content: this.pending.content + frame.text, loading: false });
+            } else if (frame.type === 'end') {
+                this.finishReply({});
+            } else if (frame.type === 'error') {
+                console.error('Chat error:', frame.detail);
+                if (this.pending) this.finishReply({ error: true });
+            }
+        },
+
+        updateBotMessage(botMessage, changes) {
+            const index = this.messages.findIndex(m => m.id === botMessage.id);
+            if (index !== -1) {
+                this.messages[index] = { ...this.messages[index], ...changes };
+                this.pending = this.pending && this.messages[index];
+            }
+        },
+
+        finishReply({ error = false }) {
+            if (!this.pending) return;
+            if (error) {
+                this.updateBotMessage(this.pending, {
+                    content: this.pending.content || 'Failed to generate response. Please try again.',
+                    loading: false,
+                    error: !this.pending.content
+                });
+            } else {
+                this.updateBotMessage(this.pending, { loading: false });
+            }
+            this.pending = null;
+            this.isLoading = false;
+            this.scrollToBottom();
+        },
+
+        cancelReply() {
+            if (this.socket && this.pending) {
+                this.socket.send(JSON.stringify({ type: 'cancel' }));
+            }
         },
         
         async sendMessage() {
@@ -46,38 +123,36 @@ function chat() {
                 timestamp: new Date()
             };
             this.messages.push(botMessage);
+
+            if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+                // Tokens arrive through handleFrame
+                this.pending = botMessage;
+                this.socket.send(JSON.stringify({ type: 'turn', content: message }));
+                return;
+            }
             
             try {
+                const formData = new FormData();
+                formData.append('prompt', message);
                 const response = await fetch('/htmx/generate/text/', {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ prompt: message })
+                    body: formData
                 });
                 
                 if (!response.ok) throw new Error('Failed to generate response');
                 
-                const data = await response.text();
+                const data = await response.json();
+                if (data.status !== 'success') throw new Error(data.message);
                 
                 // Update bot message with response
-                const index = this.messages.findIndex(m => m.id === botMessage.id);
-                if (index !== -1) {
-                    this.messages[index] = {
-                        ...botMessage,
-                        content: data,
-                        loading: false
-                    };
-                }
+                this.updateBotMessage(botMessage, { content: data.content, loading: false });
             } catch (error) {
                 console.error('Error:', error);
-                const index = this.messages.findIndex(m => m.id === botMessage.id);
-                if (index !== -1) {
-                    this.messages[index] = {
-                        ...botMessage,
-                        content: 'Failed to generate response. Please try again.',
-                        loading: false,
-                        error: true
-                    };
-                }
+                this.updateBotMessage(botMessage, {
+                    content: 'Failed to generate response. Please try again.',
+                    loading: false,
+                    error: true
+                });
             } finally {
                 this.isLoading = false;
                 this.scrollToBottom();
@@ -89,4 +164,4 @@ function chat() {
             container.scrollTop = container.scrollHeight;
         }
     };
-} 
\ No newline at end of file
+}